@@ -0,0 +1,196 @@
+"""
+分级异步日志
+日志记录只把记录放入队列（QueueHandler），由后台线程（QueueListener）写到控制台/文件，
+热点路径不再同步写 stdout；重复的相同消息按时间间隔限流；各子系统可单独设置级别
+
+用法:
+    from app_logging import get_logger
+
+    log = get_logger('scrape')
+    log.debug("表格第一行有 %d 列", len(cells))  # 未开启DEBUG时不格式化
+    log.info("找到 %d 个用户链接", count)
+
+子系统级别也可以通过环境变量设置: HLM_LOG_LEVELS="scrape=DEBUG,okx=WARNING"
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional, Union
+
+
+ROOT_LOGGER = 'hlm'
+LOG_FORMAT = '%(asctime)s %(levelname)-5s [%(subsystem)s] %(message)s'
+DATE_FORMAT = '%H:%M:%S'
+
+_listener = None
+_file_listeners = {}  # {子系统: 独立文件的 QueueListener}
+_setup_lock = threading.Lock()
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    重复消息限流
+
+    同一条消息（logger + 格式化后的内容）在 interval 秒内只输出一次，
+    被省略的次数附加在下一次输出的消息后面；WARNING 以上级别不限流
+    """
+
+    def __init__(self, interval: float = 10.0):
+        super().__init__()
+        self.interval = interval
+        self._last = {}  # {(logger, 消息): (上次输出时间, 省略次数)}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.interval <= 0:
+            return True
+
+        key = (record.name, record.getMessage())
+        now = time.monotonic()
+        with self._lock:
+            last_at, suppressed = self._last.get(key, (None, 0))
+            if last_at is not None and now - last_at < self.interval:
+                self._last[key] = (last_at, suppressed + 1)
+                return False
+            self._last[key] = (now, 0)
+            if len(self._last) > 5000:
+                self._last.clear()
+
+        if suppressed:
+            record.msg = f"{record.msg} (已省略 {suppressed} 条重复)"
+        return True
+
+
+class _SubsystemFilter(logging.Filter):
+    """给记录加上子系统名（logger 名去掉根前缀），供格式化使用"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        prefix = ROOT_LOGGER + '.'
+        record.subsystem = record.name[len(prefix):] if record.name.startswith(prefix) else record.name
+        return True
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    """解析 "scrape=DEBUG,okx=WARNING" 格式"""
+    levels = {}
+    for part in spec.split(','):
+        if '=' in part:
+            name, level = part.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(
+    level: Union[int, str] = logging.INFO,
+    subsystem_levels: Optional[Dict[str, Union[int, str]]] = None,
+    log_file: Optional[str] = None,
+    rate_limit_interval: float = 10.0
+):
+    """
+    初始化日志（重复调用无效，只有第一次生效）
+
+    Args:
+        level: 默认级别
+        subsystem_levels: 子系统级别，如 {'scrape': 'DEBUG'}；环境变量 HLM_LOG_LEVELS 会覆盖
+        log_file: 同时写入的日志文件，None 表示只输出到控制台
+        rate_limit_interval: 重复消息限流间隔（秒），0 表示不限流
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+        handlers = [logging.StreamHandler(sys.stdout)]
+        if log_file:
+            handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+            handler.addFilter(_SubsystemFilter())
+
+        log_queue = queue.Queue(-1)
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter(rate_limit_interval))
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level)
+        root.addHandler(queue_handler)
+        root.propagate = False
+
+        levels = dict(subsystem_levels or {})
+        levels.update(_parse_levels(os.environ.get('HLM_LOG_LEVELS', '')))
+        for subsystem, subsystem_level in levels.items():
+            set_level(subsystem, subsystem_level)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def add_rotating_file(subsystem: str, filename: str, max_bytes: int = 5 * 1024 * 1024, backup_count: int = 5):
+    """
+    把子系统的全部日志（不限流）另外写入滚动文件，同样由后台线程写出
+
+    Args:
+        subsystem: 子系统名
+        filename: 文件路径
+        max_bytes: 单个文件最大字节数
+        backup_count: 保留的历史文件数（filename.1 ... filename.N）
+    """
+    logger = get_logger(subsystem)
+    with _setup_lock:
+        if subsystem in _file_listeners:
+            return
+
+        handler = logging.handlers.RotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)-5s %(message)s', '%Y-%m-%d %H:%M:%S'))
+
+        log_queue = queue.Queue(-1)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        listener = logging.handlers.QueueListener(log_queue, handler)
+        listener.start()
+        _file_listeners[subsystem] = listener
+
+
+def shutdown_logging():
+    """停止后台写日志线程（会先写完队列中的记录）"""
+    global _listener
+    with _setup_lock:
+        for listener in _file_listeners.values():
+            listener.stop()
+        _file_listeners.clear()
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """
+    获取子系统 logger（首次调用时按默认配置初始化日志）
+
+    Args:
+        subsystem: 子系统名，如 scrape / okx / copy
+    """
+    if _listener is None:
+        setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+
+def set_level(subsystem: Optional[str], level: Union[int, str]):
+    """
+    设置子系统级别
+
+    Args:
+        subsystem: 子系统名，None 表示默认级别
+        level: logging 级别或名称（'DEBUG' / 'INFO' ...）
+    """
+    name = ROOT_LOGGER if subsystem is None else f"{ROOT_LOGGER}.{subsystem}"
+    logging.getLogger(name).setLevel(level.upper() if isinstance(level, str) else level)
@@ -0,0 +1,369 @@
+"""
+热点路径基准测试
+用固定种子生成 100/1k/10k 行的合成数据，测量解析、筛选、比对和跟单数量计算的耗时；
+结果可保存为基准 JSON，之后用对比模式检查性能回退（超过阈值时退出码为1，可用于部署前检查）
+
+解析相关的基准默认为冷缓存（每次运行前清空 value_parsers/time_parsers 的解析缓存，测量真实解析代价），
+parse_*_warm 为缓存命中时的耗时
+
+用法:
+    python benchmark_suite.py                              # 运行全部基准
+    python benchmark_suite.py --only parse_amount,filter_new_trades --sizes 100,1000
+    python benchmark_suite.py --save                       # 保存为基准 benchmark_baseline.json
+    python benchmark_suite.py --compare --threshold 1.2    # 与基准对比，变慢超过20%视为回退
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import time_parsers
+import value_parsers
+from hyperliquid_monitor import AutoCopyTrader, HyperliquidMonitor, OKXAPIClient, MAIN_COINS
+
+
+DEFAULT_SIZES = (100, 1000, 10000)
+DEFAULT_BASELINE_FILE = 'benchmark_baseline.json'
+MIN_RUN_TIME = 0.5  # 每项基准至少累计运行的时间（秒）
+MIN_RUNS = 3
+MAX_RUNS = 50
+COINS = ['BTC', 'ETH', 'SOL']
+SEED = 20240101
+
+
+# ==================== 合成数据 ====================
+
+def _money(rng: random.Random) -> str:
+    """页面金额格式: $1.86亿 / $5,231.5万 / $9,876.54"""
+    unit = rng.choice(['亿', '万', ''])
+    if unit == '亿':
+        return f"${rng.uniform(0.5, 9.99):.2f}亿"
+    if unit == '万':
+        return f"${rng.uniform(1, 9999):,.2f}万"
+    return f"${rng.uniform(100, 9999):,.2f}"
+
+
+def make_amounts(rng: random.Random, n: int) -> List[str]:
+    """主表格仓位列，如 "$1.86亿 1747.18 BTC" """
+    return [f"{_money(rng)} {rng.uniform(0.1, 5000):.2f} {rng.choice(COINS)}" for _ in range(n)]
+
+
+def make_open_times(rng: random.Random, n: int, now: datetime) -> List[str]:
+    """主表格开仓时间列 "HH:MM MM-DD"（最近60天）"""
+    return [(now - timedelta(minutes=rng.randint(0, 60 * 24 * 60))).strftime('%H:%M %m-%d') for _ in range(n)]
+
+
+def make_trade_times(rng: random.Random, n: int, now: datetime) -> List[str]:
+    """成交时间 "MM-DD HH:MM:SS"（最近7天）"""
+    return [(now - timedelta(seconds=rng.randint(0, 7 * 86400))).strftime('%m-%d %H:%M:%S') for _ in range(n)]
+
+
+def make_trades(rng: random.Random, n: int, now: datetime) -> List[Dict]:
+    """详情页成交记录（按时间倒序）"""
+    trades = [{
+        '交易哈希': f"0x{rng.getrandbits(256):064x}",
+        '方向': rng.choice(['开多', '平多', '开空', '平空']),
+        '时间': time_str,
+        '盈亏': _money(rng),
+        '代币': rng.choice(COINS),
+        '价格': f"${rng.uniform(100, 100000):,.2f}",
+        '数量': f"{rng.uniform(0.01, 50):.4f}",
+        '手续费': f"${rng.uniform(0.1, 50):.2f}",
+    } for time_str in make_trade_times(rng, n, now)]
+    trades.sort(key=lambda trade: trade['时间'], reverse=True)
+    return trades
+
+
+def make_table_rows(rng: random.Random, n: int, now: datetime) -> List[List[str]]:
+    """主表格（第一行为表头，13列）"""
+    header = ['', '#', '地址', '币种', '方向', '仓位', '未实现盈亏', '开仓价格', '爆仓价格', '保证金', '资金费', '当前价格', '开仓时间']
+    amounts = make_amounts(rng, n)
+    open_times = make_open_times(rng, n, now)
+    rows = [header]
+    for i in range(n):
+        rows.append([
+            '', str(i + 1), f"0x{rng.getrandbits(160):040x}"[:10] + '...', rng.choice(COINS) + '\nUSD',
+            rng.choice(['多', '空']), amounts[i].replace(' ', '\n', 1), f"{rng.uniform(-50, 50):.2f}%",
+            f"${rng.uniform(100, 100000):,.2f}", f"${rng.uniform(100, 100000):,.2f}", _money(rng),
+            _money(rng), f"${rng.uniform(100, 100000):,.2f}", open_times[i],
+        ])
+    return rows
+
+
+def make_positions(rng: random.Random, n: int) -> List[Dict]:
+    """详情页持仓"""
+    return [{
+        '代币': rng.choice(COINS),
+        '方向': rng.choice(['多', '空']),
+        '杠杆': f"{rng.randint(1, 40)}x",
+        '价值': _money(rng),
+        '数量': f"{rng.uniform(0.1, 5000):.2f} {rng.choice(COINS)}",
+    } for _ in range(n)]
+
+
+def make_tickers(rng: random.Random, n: int) -> List[Dict]:
+    """OKX 全量行情（包含全部主流币，其余为非主流产品）"""
+    inst_ids = list(MAIN_COINS[:n]) + [f"ALT{i}-USDT-SWAP" for i in range(max(n - len(MAIN_COINS), 0))]
+    ts = str(int(time.time() * 1000))
+    tickers = []
+    for inst_id in inst_ids:
+        last = rng.uniform(0.01, 100000)
+        tickers.append({
+            'instId': inst_id, 'last': f"{last:.4f}", 'sodUtc8': f"{last * rng.uniform(0.9, 1.1):.4f}",
+            'high24h': f"{last * 1.05:.4f}", 'low24h': f"{last * 0.95:.4f}",
+            'vol24h': f"{rng.uniform(1, 1e6):.2f}", 'volCcy24h': f"{rng.uniform(1e3, 1e9):.2f}", 'ts': ts,
+        })
+    return tickers
+
+
+# ==================== 被测对象 ====================
+
+def make_monitor() -> HyperliquidMonitor:
+    """不创建界面的 HyperliquidMonitor（只用到解析/筛选方法）"""
+    monitor = HyperliquidMonitor.__new__(HyperliquidMonitor)
+    monitor.all_coins = list(COINS)
+    return monitor
+
+
+def make_copy_trader(monitor: HyperliquidMonitor) -> AutoCopyTrader:
+    """不启动线程/浏览器的 AutoCopyTrader（只用到解析/比对/数量计算方法）"""
+    trader = AutoCopyTrader.__new__(AutoCopyTrader)
+    trader.app = monitor
+    trader.followed_traders = {}
+    trader.copy_coin = 'BTC'
+    trader.MIN_BTC_SIZE = 0.0001
+    trader.MAX_MARGIN_RATIO = 0.5
+    return trader
+
+
+# ==================== 基准项 ====================
+
+def clear_parser_caches():
+    """清空数值/时间解析缓存"""
+    value_parsers.clear_cache()
+    time_parsers.clear_cache()
+
+
+def _cold(factory):
+    """冷缓存版本: 每次运行前（不计时）清空解析缓存"""
+    def make(n, rng, now):
+        return factory(n, rng, now), clear_parser_caches
+    return make
+
+
+def _bench_parse_amount(n, rng, now):
+    monitor = make_monitor()
+    values = make_amounts(rng, n)
+    return lambda: [monitor.parse_amount(value) for value in values]
+
+
+def _bench_parse_open_time(n, rng, now):
+    monitor = make_monitor()
+    values = make_open_times(rng, n, now)
+    return lambda: [monitor.parse_open_time(value) for value in values]
+
+
+def _bench_parse_position_value(n, rng, now):
+    trader = make_copy_trader(make_monitor())
+    values = [_money(rng) for _ in range(n)]
+    return lambda: [trader.parse_position_value(value) for value in values]
+
+
+def _bench_parse_trade_time(n, rng, now):
+    trader = make_copy_trader(make_monitor())
+    values = make_trade_times(rng, n, now)
+    return lambda: [trader.parse_trade_time(value) for value in values]
+
+
+def _bench_filter_new_trades(n, rng, now):
+    """本次 n 条成交，其中 10% 是上次之后的新成交"""
+    trader = make_copy_trader(make_monitor())
+    current = make_trades(rng, n, now)
+    last = current[n // 10:]
+    start = now - timedelta(days=30)
+    return lambda: trader.filter_new_trades(current, last, start)
+
+
+def _bench_filter_table_rows(n, rng, now):
+    """主表格筛选（update_display 的筛选/排序部分）: 近7天 + 全部金额"""
+    monitor = make_monitor()
+    tables = [make_table_rows(rng, n, now)]
+    return lambda: monitor.filter_table_rows(tables, ['BTC'], '7', 'all')
+
+
+def _bench_parse_ticker_data(n, rng, now):
+    """两份价格全部不同的行情交替解析（每次都是全量变化）"""
+    client = OKXAPIClient()
+    snapshots = [make_tickers(rng, n), make_tickers(rng, n)]
+    turn = [0]
+
+    def run():
+        turn[0] ^= 1
+        return client.parse_ticker_data(snapshots[turn[0]])
+    return run
+
+
+def _bench_calculate_copy_size(n, rng, now):
+    """n 个信号按持有20个仓位的大户计算跟单数量"""
+    trader = make_copy_trader(make_monitor())
+    trader_data = {'positions': make_positions(rng, 20)}
+    sizes = [rng.uniform(0.01, 50) for _ in range(n)]
+    return lambda: [trader.calculate_copy_size(size, 10000, 'bench', trader_data) for size in sizes]
+
+
+BENCHMARKS = {
+    'parse_amount': _cold(_bench_parse_amount),
+    'parse_open_time': _cold(_bench_parse_open_time),
+    'parse_position_value': _cold(_bench_parse_position_value),
+    'parse_trade_time': _cold(_bench_parse_trade_time),
+    'parse_amount_warm': _bench_parse_amount,
+    'parse_open_time_warm': _bench_parse_open_time,
+    'parse_position_value_warm': _bench_parse_position_value,
+    'parse_trade_time_warm': _bench_parse_trade_time,
+    'filter_new_trades': _cold(_bench_filter_new_trades),
+    'filter_table_rows': _cold(_bench_filter_table_rows),
+    'parse_ticker_data': _bench_parse_ticker_data,
+    'calculate_copy_size': _bench_calculate_copy_size,
+}
+
+
+# ==================== 运行/对比 ====================
+
+def measure(run: Callable, setup: Optional[Callable] = None) -> Dict:
+    """
+    重复运行直到累计 MIN_RUN_TIME 秒（至少 MIN_RUNS 次，最多 MAX_RUNS 次）
+
+    Args:
+        run: 被测函数
+        setup: 每次运行前执行、不计入耗时（如清空缓存）
+
+    Returns:
+        {'runs', 'median', 'min'}（秒/次）
+    """
+    if setup:
+        setup()
+    run()  # 预热（导入等；warm 基准同时填充缓存）
+    durations = []
+    total = 0.0
+    while len(durations) < MAX_RUNS and (len(durations) < MIN_RUNS or total < MIN_RUN_TIME):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - start)
+        total += durations[-1]
+        if durations[-1] > MIN_RUN_TIME * 4:
+            break  # 单次已经很慢（如二次方复杂度），不再重复
+    return {'runs': len(durations), 'median': statistics.median(durations), 'min': min(durations)}
+
+
+def run_suite(names: List[str], sizes: List[int]) -> Dict[str, Dict]:
+    """
+    运行基准
+
+    Returns:
+        {"名称[行数]": {'name', 'size', 'runs', 'median', 'min'}}
+    """
+    results = {}
+    now = datetime.now()
+    with open(os.devnull, 'w') as devnull:
+        for name in names:
+            for size in sizes:
+                rng = random.Random(f"{SEED}-{name}-{size}")
+                bench = BENCHMARKS[name](size, rng, now)
+                run, setup = bench if isinstance(bench, tuple) else (bench, None)
+                # 被测函数中的 print 输出到空设备（仍计入耗时，但不刷屏）
+                with contextlib.redirect_stdout(devnull):
+                    stats = measure(run, setup)
+                results[f"{name}[{size}]"] = dict(stats, name=name, size=size)
+                print(f"{name:<27} {size:>6} 行  中位数 {_fmt_seconds(stats['median']):>9}  "
+                      f"每行 {stats['median'] / size * 1e6:>8.2f}µs  ({stats['runs']} 次)")
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """
+    与基准对比
+
+    Args:
+        results: 本次结果
+        baseline: 基准结果
+        threshold: 回退阈值（本次/基准 中位数比值）
+
+    Returns:
+        回退的基准项列表
+    """
+    regressions = []
+    print(f"\n{'基准项':<30} {'基准':>9} {'本次':>9} {'比值':>7}")
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            print(f"{key:<30} {'-':>9} {_fmt_seconds(result['median']):>9}   (新增)")
+            continue
+        ratio = result['median'] / base['median'] if base['median'] else float('inf')
+        flag = ''
+        if ratio > threshold:
+            flag = '  ✗ 回退'
+            regressions.append(key)
+        elif ratio < 1 / threshold:
+            flag = '  ✓ 提升'
+        print(f"{key:<30} {_fmt_seconds(base['median']):>9} {_fmt_seconds(result['median']):>9} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def _fmt_seconds(value: float) -> str:
+    if value >= 1:
+        return f"{value:.2f}s"
+    if value >= 1e-3:
+        return f"{value * 1e3:.1f}ms"
+    return f"{value * 1e6:.0f}µs"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="热点路径基准测试")
+    parser.add_argument('--only', default='', help=f"逗号分隔的基准项，可选: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help="逗号分隔的数据行数")
+    parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE_FILE, help="保存结果为基准文件")
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE_FILE, help="与基准文件对比")
+    parser.add_argument('--threshold', type=float, default=1.2, help="回退阈值（本次/基准）")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.only.split(',') if name.strip()] or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"未知的基准项: {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    results = run_suite(names, sizes)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'results': results,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n基准已保存: {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\n对比基准: {args.compare} ({baseline.get('created_at', '')}, Python {baseline.get('python', '?')})")
+        regressions = compare(results, baseline.get('results', {}), args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} 项性能回退超过 {args.threshold:.2f}x: {', '.join(regressions)}")
+            raise SystemExit(1)
+        print("\n✓ 没有性能回退")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,549 @@
+"""
+浏览器会话管理
+为跟单引擎维护一个长期运行的 Chrome：每个跟随的大户占用一个标签页，
+之后每次获取数据都在原标签页内刷新并提取，不再反复启动/关闭浏览器
+
+多个大户同时需要刷新时，先并发触发各标签页加载，再逐个收割（MultiTabScraper）
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+
+from page_capture import install_capture_hook
+
+
+# 隐藏webdriver属性
+STEALTH_JS = '''
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+'''
+
+
+def prepare_tab(driver):
+    """
+    给当前标签页注册新文档脚本（隐藏webdriver属性 + 数据捕获钩子）
+
+    CDP的新文档脚本只对当前标签页生效，每个新开的标签页都需要调用一次
+    """
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': STEALTH_JS})
+    install_capture_hook(driver)
+
+
+def create_chrome_driver(headless: bool = True):
+    """
+    创建带反检测配置的 Chrome 实例（无头模式 + 静默日志）
+
+    Args:
+        headless: 是否无头模式
+
+    Returns:
+        webdriver.Chrome 实例
+    """
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+    # 抑制Chrome日志输出
+    chrome_options.add_argument('--log-level=3')
+    chrome_options.add_argument('--silent')
+
+    # 将ChromeDriver日志重定向到null（抑制DevTools日志）
+    service = Service(
+        ChromeDriverManager().install(),
+        log_path=os.devnull if os.name != 'nt' else 'NUL'
+    )
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    prepare_tab(driver)
+    return driver
+
+
+class TraderPageSessionManager:
+    """
+    大户详情页会话管理器
+
+    - 所有大户共享一个 Chrome，每个大户一个标签页
+    - 首次访问打开标签页并等待加载，之后在原标签页内刷新（refresher）再提取（extractor）
+    - 超过 idle_timeout 未使用的标签页会被关闭；标签页总数不超过 max_tabs（关闭最久未使用的）
+    """
+
+    def __init__(
+        self,
+        extractor: Callable,
+        refresher: Optional[Callable] = None,
+        max_tabs: int = 10,
+        idle_timeout: int = 600,
+        headless: bool = True,
+        load_timeout: int = 15
+    ):
+        """
+        初始化会话管理器
+
+        Args:
+            extractor: 数据提取函数 extractor(driver) -> dict
+            refresher: 页面内刷新函数 refresher(driver)，不传则 driver.refresh()
+            max_tabs: 最大标签页数量
+            idle_timeout: 标签页空闲关闭时间（秒）
+            headless: 是否无头模式
+            load_timeout: 等待表格渲染的最长时间（秒）
+        """
+        self.extractor = extractor
+        self.refresher = refresher
+        self.max_tabs = max_tabs
+        self.idle_timeout = idle_timeout
+        self.headless = headless
+        self.load_timeout = load_timeout
+
+        self.driver = None
+        self._anchor_handle = None  # 保留一个空白标签页，关闭所有大户标签页时浏览器不退出
+        self._sessions = {}  # {trader_address: {'handle', 'url', 'opened_at', 'last_used'}}
+        self._lock = threading.RLock()
+
+    @property
+    def tab_count(self) -> int:
+        return len(self._sessions)
+
+    def has_session(self, trader_address: str) -> bool:
+        return trader_address in self._sessions
+
+    def fetch(self, trader_address: str, url: str) -> Optional[Dict]:
+        """
+        获取大户页面数据（首次打开标签页，之后原地刷新）
+
+        Args:
+            trader_address: 大户地址
+            url: 大户详情页URL
+
+        Returns:
+            extractor 返回的数据，失败返回None
+        """
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    return self._fetch_locked(trader_address, url)
+                except WebDriverException as e:
+                    # 浏览器崩溃或标签页失效：重建浏览器后重试一次
+                    print(f"[PageSessions] 浏览器异常，重建会话: {str(e)[:100]}")
+                    self.shutdown()
+                except Exception as e:
+                    print(f"[PageSessions] 获取页面数据失败: {e}")
+                    return None
+            return None
+
+    def _fetch_locked(self, trader_address, url):
+        driver = self._ensure_driver()
+        session = self._sessions.get(trader_address)
+
+        if session is None or session['url'] != url:
+            if session is not None:
+                self._close_session(trader_address)
+            self._evict_if_needed()
+
+            driver.switch_to.window(self._anchor_handle)
+            driver.switch_to.new_window('tab')
+            prepare_tab(driver)
+            driver.get(url)
+            session = {
+                'handle': driver.current_window_handle,
+                'url': url,
+                'opened_at': time.time(),
+                'last_used': time.time()
+            }
+            self._sessions[trader_address] = session
+            print(f"[PageSessions] 新开标签页: {trader_address[:8]}... (共 {len(self._sessions)} 个)")
+        else:
+            driver.switch_to.window(session['handle'])
+            if self.refresher:
+                self.refresher(driver)
+            else:
+                driver.refresh()
+
+        self._wait_for_tables(driver)
+        data = self.extractor(driver)
+        session['last_used'] = time.time()
+        return data
+
+    def fetch_many(self, targets: Dict[str, str],
+                   on_result: Optional[Callable] = None) -> Dict[str, Optional[Dict]]:
+        """
+        批量获取多个大户页面数据：先触发所有标签页加载（不等待），再逐个切换收割
+
+        超过 max_tabs 时分批处理
+
+        Args:
+            targets: {trader_address: url}
+            on_result: 每收割一个标签页立即调用
+                on_result(trader_address, 数据或None, 触发加载时间, 收割完成时间)，失败的大户同样回调
+
+        Returns:
+            {trader_address: 数据或None}
+        """
+        results = {}
+        items = list(targets.items())
+
+        def report(trader_address, data, started_at, ended_at):
+            results[trader_address] = data
+            if on_result is not None:
+                on_result(trader_address, data, started_at, ended_at)
+
+        with self._lock:
+            for start in range(0, len(items), self.max_tabs):
+                batch = items[start:start + self.max_tabs]
+                batch_started_at = time.time()
+                try:
+                    self._fetch_batch_locked(batch, report)
+                except WebDriverException as e:
+                    print(f"[PageSessions] 浏览器异常，重建会话: {str(e)[:100]}")
+                    self.shutdown()
+                except Exception as e:
+                    print(f"[PageSessions] 批量获取页面数据失败: {e}")
+
+                for trader_address, _ in batch:
+                    if trader_address not in results:
+                        report(trader_address, None, batch_started_at, time.time())
+
+        return results
+
+    def _fetch_batch_locked(self, batch, report):
+        driver = self._ensure_driver()
+        batch_addresses = {addr for addr, _ in batch}
+
+        # 1. 触发加载：已有标签页后台重载，新大户以后台标签页打开
+        trigger_start = time.time()
+        triggered_at = {}
+        for trader_address, url in batch:
+            triggered_at[trader_address] = time.time()
+            session = self._sessions.get(trader_address)
+            if session is not None and session['url'] == url:
+                driver.switch_to.window(session['handle'])
+                driver.execute_script("window.__cgPending = true; location.reload();")
+            else:
+                if session is not None:
+                    self._close_session(trader_address)
+                self._evict_if_needed(keep=batch_addresses)
+                self._sessions[trader_address] = {
+                    'handle': self._open_background_tab(url),
+                    'url': url,
+                    'opened_at': time.time(),
+                    'last_used': time.time()
+                }
+        trigger_time = time.time() - trigger_start
+
+        # 2. 逐个收割（其余标签页在此期间继续加载），每收割一个立即回调
+        for trader_address, _ in batch:
+            session = self._sessions[trader_address]
+            driver.switch_to.window(session['handle'])
+            self._wait_for_reload(driver)
+            self._wait_for_tables(driver)
+            try:
+                data = self.extractor(driver)
+            except Exception as e:
+                print(f"[PageSessions] 提取失败 {trader_address[:8]}...: {e}")
+                data = None
+            session['last_used'] = time.time()
+            report(trader_address, data, triggered_at[trader_address], session['last_used'])
+
+        print(f"[PageSessions] 批量获取 {len(batch)} 个大户: 触发 {trigger_time:.1f}s, "
+              f"总耗时 {time.time() - trigger_start:.1f}s")
+
+    def _open_background_tab(self, url):
+        """
+        通过CDP在后台打开空白标签页，注册新文档脚本后再开始导航（不阻塞等待加载）
+
+        Returns:
+            新标签页的窗口句柄
+        """
+        driver = self.driver
+        handles_before = set(driver.window_handles)
+        handle = None
+        try:
+            target = driver.execute_cdp_cmd('Target.createTarget', {'url': 'about:blank', 'background': True})
+            # ChromeDriver的窗口句柄即CDP的targetId
+            if target.get('targetId') in driver.window_handles:
+                handle = target['targetId']
+        except WebDriverException:
+            raise
+        except Exception:
+            pass
+
+        if handle is None:
+            driver.execute_script("window.open('about:blank', '_blank');")
+            new_handles = [h for h in driver.window_handles if h not in handles_before]
+            if not new_handles:
+                raise WebDriverException("无法打开新标签页")
+            handle = new_handles[-1]
+
+        driver.switch_to.window(handle)
+        prepare_tab(driver)
+        driver.execute_script("window.location.href = arguments[0];", url)
+        return handle
+
+    def _wait_for_reload(self, driver):
+        """等待 location.reload() 触发的重新加载完成（重载前设置的标记会随旧文档消失）"""
+        try:
+            WebDriverWait(driver, self.load_timeout).until(
+                lambda d: d.execute_script(
+                    "return !window.__cgPending && document.readyState === 'complete';"
+                )
+            )
+        except WebDriverException:
+            raise
+        except Exception:
+            pass
+
+    def _wait_for_tables(self, driver):
+        """等待Ant Design表格渲染"""
+        try:
+            WebDriverWait(driver, self.load_timeout).until(
+                lambda d: len(d.find_elements(By.CLASS_NAME, "ant-table-row")) > 0
+            )
+        except Exception:
+            # 大户可能确实没有数据，继续提取
+            pass
+
+    def _ensure_driver(self):
+        """确保浏览器已启动"""
+        if self.driver is None:
+            print("[PageSessions] 启动共享浏览器...")
+            self.driver = create_chrome_driver(headless=self.headless)
+            self._anchor_handle = self.driver.current_window_handle
+        return self.driver
+
+    def _evict_if_needed(self, keep=()):
+        """标签页达到上限时关闭最久未使用的（keep 中的大户不关闭）"""
+        while len(self._sessions) >= self.max_tabs:
+            candidates = [addr for addr in self._sessions if addr not in keep]
+            if not candidates:
+                break
+            oldest = min(candidates, key=lambda addr: self._sessions[addr]['last_used'])
+            print(f"[PageSessions] 标签页已达上限({self.max_tabs})，关闭: {oldest[:8]}...")
+            self._close_session(oldest)
+
+    def _close_session(self, trader_address):
+        """关闭单个标签页"""
+        session = self._sessions.pop(trader_address, None)
+        if not session or self.driver is None:
+            return
+        try:
+            self.driver.switch_to.window(session['handle'])
+            self.driver.close()
+        except Exception:
+            pass
+        finally:
+            try:
+                self.driver.switch_to.window(self._anchor_handle)
+            except Exception:
+                pass
+
+    def close_tab(self, trader_address: str):
+        """关闭指定大户的标签页（停止跟随时调用）"""
+        with self._lock:
+            self._close_session(trader_address)
+
+    def close_idle_tabs(self) -> int:
+        """
+        关闭空闲超时的标签页
+
+        Returns:
+            关闭的标签页数量
+        """
+        with self._lock:
+            now = time.time()
+            idle = [addr for addr, session in self._sessions.items()
+                    if now - session['last_used'] >= self.idle_timeout]
+            for addr in idle:
+                self._close_session(addr)
+            if idle:
+                print(f"[PageSessions] 关闭 {len(idle)} 个空闲标签页")
+            return len(idle)
+
+    def shutdown(self):
+        """关闭所有标签页和浏览器"""
+        with self._lock:
+            self._sessions.clear()
+            if self.driver is not None:
+                try:
+                    self.driver.quit()
+                except Exception:
+                    pass
+            self.driver = None
+            self._anchor_handle = None
+
+
+class MultiTabScraper:
+    """
+    多标签页并行抓取调度器
+
+    - 每个浏览器最多 tabs_per_browser 个标签页，每台机器最多 browsers_per_host 个浏览器
+    - 新大户优先放入已启动的浏览器，满了才启动下一个（节省内存）
+    - 同一大户固定在原浏览器中刷新；各浏览器之间并行收割
+    - 对外接口与 TraderPageSessionManager 一致（fetch / close_tab / close_idle_tabs / shutdown）
+    """
+
+    def __init__(
+        self,
+        extractor: Callable,
+        refresher: Optional[Callable] = None,
+        tabs_per_browser: int = 8,
+        browsers_per_host: int = 2,
+        idle_timeout: int = 600,
+        headless: bool = True,
+        load_timeout: int = 15
+    ):
+        """
+        初始化抓取调度器
+
+        Args:
+            extractor: 数据提取函数 extractor(driver) -> dict
+            refresher: 页面内刷新函数（单个大户 fetch 时使用）
+            tabs_per_browser: 每个浏览器的标签页上限
+            browsers_per_host: 浏览器数量上限
+            idle_timeout: 标签页空闲关闭时间（秒）
+            headless: 是否无头模式
+            load_timeout: 等待表格渲染的最长时间（秒）
+        """
+        self.tabs_per_browser = tabs_per_browser
+        self.browsers_per_host = browsers_per_host
+        self.browsers = [
+            TraderPageSessionManager(
+                extractor=extractor,
+                refresher=refresher,
+                max_tabs=tabs_per_browser,
+                idle_timeout=idle_timeout,
+                headless=headless,
+                load_timeout=load_timeout
+            )
+            for _ in range(browsers_per_host)
+        ]
+        self._executor = ThreadPoolExecutor(max_workers=browsers_per_host,
+                                            thread_name_prefix='tab-scraper')
+
+    @property
+    def max_tabs(self) -> int:
+        return self.tabs_per_browser * self.browsers_per_host
+
+    @property
+    def tab_count(self) -> int:
+        return sum(browser.tab_count for browser in self.browsers)
+
+    def _assign(self, trader_addresses):
+        """
+        把大户分配到浏览器
+
+        Returns:
+            {浏览器索引: [trader_address, ...]}
+        """
+        loads = [browser.tab_count for browser in self.browsers]
+        groups = {}
+
+        for trader_address in trader_addresses:
+            index = next((i for i, browser in enumerate(self.browsers)
+                          if browser.has_session(trader_address)), None)
+            if index is None:
+                # 优先填满靠前的浏览器，全部满了再放到最空闲的浏览器（触发LRU淘汰）
+                index = next((i for i, load in enumerate(loads) if load < self.tabs_per_browser),
+                             loads.index(min(loads)))
+                loads[index] += 1
+            groups.setdefault(index, []).append(trader_address)
+
+        return groups
+
+    def fetch(self, trader_address: str, url: str) -> Optional[Dict]:
+        """获取单个大户页面数据"""
+        index = next(iter(self._assign([trader_address])))
+        return self.browsers[index].fetch(trader_address, url)
+
+    def fetch_many(self, targets: Dict[str, str]) -> Dict[str, Optional[Dict]]:
+        """
+        并行获取多个大户页面数据
+
+        Args:
+            targets: {trader_address: url}
+
+        Returns:
+            {trader_address: 数据或None}
+        """
+        return {trader_address: data for trader_address, data, _, _ in self.iter_fetch(targets)}
+
+    def iter_fetch(self, targets: Dict[str, str]) -> Iterator[Tuple[str, Optional[Dict], float, float]]:
+        """
+        并行获取多个大户页面数据，按收割顺序逐个产出：先加载完的大户不等待其他标签页
+
+        Args:
+            targets: {trader_address: url}
+
+        Yields:
+            (trader_address, 数据或None, 开始抓取时间, 收割完成时间)，每个大户恰好一次
+        """
+        if not targets:
+            return
+
+        harvested = queue.SimpleQueue()
+        groups = self._assign(list(targets))
+        futures = [
+            self._executor.submit(self.browsers[index].fetch_many,
+                                  {addr: targets[addr] for addr in addresses},
+                                  lambda *result: harvested.put(result))
+            for index, addresses in groups.items()
+        ]
+
+        reported = set()
+        while len(reported) < len(targets):
+            try:
+                result = harvested.get(timeout=0.5)
+            except queue.Empty:
+                # 回调在任务结束前放入队列：全部结束且队列为空时不会再有结果
+                if all(future.done() for future in futures) and harvested.empty():
+                    break
+                continue
+            reported.add(result[0])
+            yield result
+
+        for future in futures:
+            if future.done() and future.exception() is not None:
+                print(f"[TabScraper] 浏览器抓取失败: {future.exception()}")
+
+        now = time.time()
+        for trader_address in targets:
+            if trader_address not in reported:
+                yield trader_address, None, now, now
+
+    def close_tab(self, trader_address: str):
+        """关闭指定大户的标签页"""
+        for browser in self.browsers:
+            if browser.has_session(trader_address):
+                browser.close_tab(trader_address)
+
+    def close_idle_tabs(self) -> int:
+        """关闭空闲标签页；除第一个外，没有标签页的浏览器直接退出以释放内存"""
+        closed = 0
+        for index, browser in enumerate(self.browsers):
+            closed += browser.close_idle_tabs()
+            if index > 0 and browser.tab_count == 0 and browser.driver is not None:
+                print(f"[TabScraper] 浏览器 #{index + 1} 已无标签页，退出")
+                browser.shutdown()
+        return closed
+
+    def shutdown(self):
+        """关闭所有浏览器"""
+        for browser in self.browsers:
+            browser.shutdown()
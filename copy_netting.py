@@ -0,0 +1,137 @@
+"""
+跟单净额合并
+同一轮（一次批量抓取）中各大户的市价跟单信号按产品合并，只发送净额一笔订单；
+归因账本记录每笔净额订单由哪些大户的信号组成，以及各大户累计归因的持仓
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+
+def signed_size(signal: Dict) -> float:
+    """信号的带符号数量（多为正，空为负）"""
+    return signal['size'] if signal['direction'] == '多' else -signal['size']
+
+
+class NetOrder:
+    """一轮中同一产品的净额订单"""
+
+    def __init__(self, coin: str, members: List[Dict]):
+        """
+        Args:
+            coin: 币种
+            members: 组成该订单的市价信号（已计算 size）
+        """
+        self.coin = coin
+        self.members = members
+        self.net_size = sum(signed_size(signal) for signal in members)
+
+    @property
+    def direction(self) -> str:
+        return '多' if self.net_size > 0 else '空'
+
+    @property
+    def size(self) -> float:
+        return abs(self.net_size)
+
+    @property
+    def gross_size(self) -> float:
+        return sum(signal['size'] for signal in self.members)
+
+    def traders(self) -> List[str]:
+        return sorted({signal['trader'] for signal in self.members})
+
+
+def net_signals(signals: List[Dict], min_size: float) -> Tuple[List[NetOrder], List[NetOrder], List[Dict]]:
+    """
+    按币种合并市价信号
+
+    Args:
+        signals: 本轮已计算数量的信号
+        min_size: 最小下单数量，净额低于该值时不下单（各大户的信号在内部相互抵消）
+
+    Returns:
+        (需要下单的净额订单, 内部抵消的订单, 其他类型信号（限价/止盈止损，原样执行）)
+    """
+    groups = {}  # {coin: [signal]}，保持信号到达顺序
+    others = []
+    for signal in signals:
+        if signal['kind'] == 'market':
+            groups.setdefault(signal['coin'], []).append(signal)
+        else:
+            others.append(signal)
+
+    orders, crossed = [], []
+    for coin, members in groups.items():
+        order = NetOrder(coin, members)
+        (orders if order.size >= min_size else crossed).append(order)
+    return orders, crossed, others
+
+
+class AttributionLedger:
+    """
+    净额订单归因账本
+
+    - record(): 记录一笔净额订单（或内部抵消）的组成
+    - exposures(): 各大户累计归因的持仓 {大户: {币种: 带符号数量}}
+    - 最近 history 条记录保存在内存中，供界面/调试查看
+    """
+
+    def __init__(self, history: int = 500):
+        self._entries = deque(maxlen=history)
+        self._exposures = {}  # {trader: {coin: signed size}}
+        self._lock = threading.Lock()
+        self.orders_saved = 0  # 合并后少发送的订单数
+
+    def record(self, order: NetOrder, order_id: Optional[str], ok: bool, sent: bool = True):
+        """
+        记录一笔净额订单
+
+        Args:
+            order: 净额订单
+            order_id: OKX订单ID，未下单或下单失败时为None
+            ok: 是否成功（内部抵消视为成功）
+            sent: 是否发送了订单（内部抵消为False）
+        """
+        with self._lock:
+            self.orders_saved += len(order.members) - (1 if sent else 0)
+            for signal in order.members:
+                self._entries.append({
+                    'at': time.time(),
+                    'trader': signal['trader'],
+                    'coin': order.coin,
+                    'size': signed_size(signal),
+                    'net_size': order.net_size,
+                    'order_id': order_id,
+                    'ok': ok,
+                })
+                if ok:
+                    coins = self._exposures.setdefault(signal['trader'], {})
+                    coins[order.coin] = coins.get(order.coin, 0.0) + signed_size(signal)
+
+    def add_exposure(self, trader: str, coin: str, size: float):
+        """直接累加归因持仓（初始跟单等不经过净额合并的成交）"""
+        with self._lock:
+            coins = self._exposures.setdefault(trader, {})
+            coins[coin] = coins.get(coin, 0.0) + size
+
+    def exposures(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {trader: dict(coins) for trader, coins in self._exposures.items()}
+
+    def load(self, exposures: Dict[str, Dict[str, float]]):
+        """从状态文件恢复归因持仓"""
+        with self._lock:
+            self._exposures = {trader: dict(coins) for trader, coins in (exposures or {}).items()}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._exposures.clear()
+            self.orders_saved = 0
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        with self._lock:
+            return list(self._entries)[-limit:]
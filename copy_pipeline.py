@@ -0,0 +1,233 @@
+"""
+跟单流水线
+把 抓取 → 比对 → 生成信号 → 计算数量 → 下单 → 汇报 拆成独立阶段，
+阶段之间用有界队列连接，每个阶段有自己的工作线程：
+慢的阶段（如页面抓取）不会阻塞其他大户信号的下单，队列满时上游等待（背压）
+"""
+
+import queue
+import threading
+import time
+import types
+from typing import Any, Callable, Dict, List, Optional
+
+
+class PipelineStage:
+    """流水线中的单个阶段"""
+
+    def __init__(self, name: str, handler: Callable, workers: int = 1, queue_size: int = 100,
+                 batch: bool = False):
+        """
+        初始化阶段
+
+        Args:
+            name: 阶段名称
+            handler: 处理函数 handler(item)，返回 None（不向下游传递）、单个结果、结果列表，
+                或生成器（每产出一个结果立即传给下游，不等处理完）
+            workers: 工作线程数
+            queue_size: 输入队列容量（满时上游阻塞）
+            batch: 批量阶段，handler 收到队列中已在等待的全部任务列表（不等待新任务到达）
+        """
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.batch = batch
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.next_stage = None
+
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.in_flight = 0
+        self._stats_lock = threading.Lock()
+
+    def stats(self) -> Dict[str, Any]:
+        """阶段统计"""
+        with self._stats_lock:
+            return {
+                'stage': self.name,
+                'queued': self.queue.qsize(),
+                'capacity': self.queue.maxsize,
+                'in_flight': self.in_flight,
+                'processed': self.processed,
+                'errors': self.errors,
+                'avg_ms': self.busy_seconds / self.processed * 1000 if self.processed else 0.0,
+            }
+
+
+class CopyPipeline:
+    """
+    多阶段流水线
+
+    用法:
+        pipeline = CopyPipeline()
+        pipeline.add_stage('fetch', fetch_handler, workers=2, queue_size=4)
+        pipeline.add_stage('diff', diff_handler)
+        pipeline.start()
+        pipeline.submit(item)
+    """
+
+    POLL_TIMEOUT = 0.5  # 工作线程检查停止标志的间隔（秒）
+
+    def __init__(self, name: str = 'CopyPipeline'):
+        self.name = name
+        self.stages = []  # type: List[PipelineStage]
+        self._threads = []
+        self._stop_event = threading.Event()
+        self.is_running = False
+
+    def add_stage(self, name: str, handler: Callable, workers: int = 1, queue_size: int = 100,
+                  batch: bool = False) -> PipelineStage:
+        """
+        追加一个阶段（上一个阶段的输出进入该阶段）
+
+        Returns:
+            新建的阶段
+        """
+        stage = PipelineStage(name, handler, workers, queue_size, batch)
+        if self.stages:
+            self.stages[-1].next_stage = stage
+        self.stages.append(stage)
+        return stage
+
+    def stage(self, name: str) -> Optional[PipelineStage]:
+        return next((stage for stage in self.stages if stage.name == name), None)
+
+    # ==================== 启停 ====================
+
+    def start(self):
+        """启动所有阶段的工作线程"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._threads = []
+        for stage in self.stages:
+            for index in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(stage,),
+                    name=f"{self.name}-{stage.name}-{index + 1}",
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+        self.is_running = True
+        print(f"[{self.name}] 已启动: " + " → ".join(f"{s.name}×{s.workers}" for s in self.stages))
+
+    def stop(self, timeout: float = 5.0):
+        """
+        停止流水线（丢弃尚未处理的队列内容）
+
+        Args:
+            timeout: 等待工作线程退出的总时间（秒）
+        """
+        if not self.is_running:
+            return
+        self._stop_event.set()
+        deadline = time.time() + timeout
+        for thread in self._threads:
+            thread.join(max(deadline - time.time(), 0))
+        for stage in self.stages:
+            self._drain(stage)
+        self._threads = []
+        self.is_running = False
+        print(f"[{self.name}] 已停止")
+
+    # ==================== 提交与处理 ====================
+
+    def submit(self, item, block: bool = False, timeout: Optional[float] = None) -> bool:
+        """
+        提交任务到第一个阶段
+
+        Args:
+            item: 任务
+            block: 队列满时是否等待
+            timeout: 等待时间（秒）
+
+        Returns:
+            是否提交成功（非阻塞模式下队列满返回False）
+        """
+        try:
+            self.stages[0].queue.put(item, block=block, timeout=timeout)
+            return True
+        except queue.Full:
+            return False
+
+    def is_saturated(self, stage_name: Optional[str] = None) -> bool:
+        """指定阶段（默认第一个）的输入队列是否已满"""
+        stage = self.stage(stage_name) if stage_name else self.stages[0]
+        return stage is not None and stage.queue.full()
+
+    def pending(self) -> int:
+        """所有阶段排队+处理中的任务数"""
+        return sum(stage.queue.qsize() + stage.in_flight for stage in self.stages)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [stage.stats() for stage in self.stages]
+
+    def _put_downstream(self, stage: PipelineStage, output) -> bool:
+        """放入下游队列；下游满时阻塞等待（背压），停止时放弃"""
+        while not self._stop_event.is_set():
+            try:
+                stage.queue.put(output, timeout=self.POLL_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _drain(self, stage: PipelineStage) -> list:
+        """取出队列中已在等待的全部任务（不阻塞）"""
+        items = []
+        while True:
+            try:
+                items.append(stage.queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def _emit(self, stage: PipelineStage, outputs):
+        """生成器阶段：每产出一个结果立即放入下游队列"""
+        for output in outputs:
+            if output is None or stage.next_stage is None:
+                continue
+            if not self._put_downstream(stage.next_stage, output):
+                outputs.close()
+                return
+
+    def _worker(self, stage: PipelineStage):
+        while not self._stop_event.is_set():
+            try:
+                item = stage.queue.get(timeout=self.POLL_TIMEOUT)
+            except queue.Empty:
+                continue
+            if stage.batch:
+                item = [item] + self._drain(stage)
+
+            with stage._stats_lock:
+                stage.in_flight += 1
+            started = time.perf_counter()
+            try:
+                result = stage.handler(item)
+                if isinstance(result, types.GeneratorType):
+                    self._emit(stage, result)
+                    result = None
+                failed = False
+            except Exception as e:
+                result = None
+                failed = True
+                print(f"[{self.name}] 阶段 {stage.name} 处理失败: {e}")
+                import traceback
+                traceback.print_exc()
+
+            with stage._stats_lock:
+                stage.in_flight -= 1
+                stage.processed += 1
+                stage.busy_seconds += time.perf_counter() - started
+                if failed:
+                    stage.errors += 1
+
+            if result is None or stage.next_stage is None:
+                continue
+            outputs = result if isinstance(result, list) else [result]
+            for output in outputs:
+                if not self._put_downstream(stage.next_stage, output):
+                    break
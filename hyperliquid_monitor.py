@@ -17,6 +17,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 import time
 import json
+import logging
 import re
 import webbrowser
 import matplotlib
@@ -29,6 +30,24 @@ import requests
 import numpy as np
 import squarify  # 用于树状图（热力图）
 from okx_trader import OKXTrader  # OKX交易模块
+from okx_simulator import SimulatedOKXExchange, SimulatedOKXTrader  # 本地模拟OKX交易所
+from okx_instruments import InstrumentMetaCache  # OKX产品元数据缓存
+from okx_account import BalanceSnapshot  # OKX账户余额快照
+from okx_market import TickerBook, OKXTickerStream, InstrumentIndex, TickerParser  # OKX行情推送/解析
+from browser_sessions import MultiTabScraper  # 跟单大户页面会话（多标签页并行抓取）
+from page_capture import install_capture_hook, extract_captured_tables, tpsl_kind  # 页面XHR数据捕获
+from page_replay import save_snapshot  # 页面快照录制（离线回放）
+from poll_scheduler import TraderPollScheduler  # 大户自适应轮询调度
+from copy_pipeline import CopyPipeline  # 跟单流水线
+from latency_tracer import LatencyTracer  # 跟单延迟追踪
+from copy_netting import AttributionLedger, net_signals  # 跟单净额合并
+from value_parsers import parse_number, parse_column  # 页面数值解析（预编译/缓存）
+from time_parsers import TimeBatch  # 页面时间解析（跨年/缓存/epoch）
+from scrape_diff import TableDiffer, row_identity  # 主表格增量比对
+from ui_dispatcher import UIDispatcher  # 工作线程 -> Tk线程的界面更新队列
+from refresh_jobs import RefreshJobs, JobCancelled  # 刷新任务 single-flight / 取消 / 超时
+from profiling import profiler  # 子系统耗时统计
+from app_logging import get_logger, set_level as set_log_level, add_rotating_file  # 分级异步日志
 from language_config import get_language_manager  # 语言管理器
 
 # 配置matplotlib中文字体（全局设置）
@@ -37,6 +56,24 @@ plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
 import warnings
 warnings.filterwarnings('ignore', category=UserWarning, module='matplotlib')
 
+# 热点路径日志（异步写出，DEBUG 未开启时不格式化）
+scrape_log = get_logger('scrape')
+okx_log = get_logger('okx')
+copy_log = get_logger('copy')
+message_log = get_logger('messages')
+
+# Coinglass 站点地址（离线测试时指向 page_replay 回放服务，如 HLM_COINGLASS_BASE_URL=http://127.0.0.1:8765）
+COINGLASS_BASE_URL = os.environ.get('HLM_COINGLASS_BASE_URL', 'https://www.coinglass.com').rstrip('/')
+# 设置后把打开的列表页/详情页录制为回放快照（快照目录）
+SNAPSHOT_RECORD_DIR = os.environ.get('HLM_RECORD_SNAPSHOTS', '')
+
+# 消息提醒面板
+MESSAGE_PANEL_MAX_LINES = 500  # 面板保留的消息条数
+MESSAGE_PANEL_TRIM_BATCH = 100  # 超出上限这么多条后再批量删除
+MESSAGE_COALESCE_SECONDS = 60  # 该时间内连续的相同消息合并为一行
+MESSAGE_LOG_FILE = 'messages.log'  # 完整消息历史（滚动文件）
+MESSAGE_LOG_LEVELS = {'error': logging.ERROR, 'warning': logging.WARNING}
+
 
 # ==================== 深色主题配色方案 ====================
 # DeFi/FinTech 专业深色主题（类似 Debank/Zerion）
@@ -102,6 +139,9 @@ MAIN_COINS = [
     'CRV-USDT-SWAP', 'MKR-USDT-SWAP'
 ]
 
+# 主流币索引（frozenset成员判断 + 排名字典，避免每次刷新线性查找）
+MAIN_COINS_INDEX = InstrumentIndex(MAIN_COINS)
+
 
 # ==================== OKX API 客户端类 ====================
 class OKXAPIClient:
@@ -114,6 +154,9 @@ class OKXAPIClient:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
 
+        # 增量行情解析器（复用未变化产品的解析结果）
+        self.ticker_parser = TickerParser(MAIN_COINS_INDEX)
+
     def get_tickers(self, inst_type="SWAP"):
         """
         获取所有行情数据
@@ -175,57 +218,9 @@ class OKXAPIClient:
         Returns:
             list: 格式化后的数据列表（按市值从高到低）
         """
-        # 第1步：只保留主流币
-        main_tickers = [t for t in tickers if t.get('instId', '') in MAIN_COINS]
-
-        # 第2步：创建字典，方便后续按顺序提取
-        ticker_dict = {t.get('instId'): t for t in main_tickers}
-
-        # 第3步：按主流币列表顺序处理数据（即按市值排序）
-        parsed_data = []
-
-        for inst_id in MAIN_COINS[:top_n]:  # 只取前top_n个主流币
-            if inst_id not in ticker_dict:
-                continue  # 如果该币种数据不存在，跳过
-
-            ticker = ticker_dict[inst_id]
-
-            try:
-                # 提取币种名称（如 BTC-USDT-SWAP -> BTC）
-                symbol = inst_id.split('-')[0] if '-' in inst_id else inst_id
-
-                # 解析数据
-                last_price = float(ticker.get('last', 0))
-                sod_utc8 = float(ticker.get('sodUtc8', 0))  # UTC+8 0点开盘价
-
-                # 计算24H涨跌幅: (当前价 - 开盘价) / 开盘价 * 100
-                if sod_utc8 > 0:
-                    change_24h = (last_price - sod_utc8) / sod_utc8 * 100
-                else:
-                    change_24h = 0
-
-                high_24h = float(ticker.get('high24h', 0))
-                low_24h = float(ticker.get('low24h', 0))
-                vol_24h = float(ticker.get('vol24h', 0))  # 币的数量
-                vol_ccy_24h = float(ticker.get('volCcy24h', 0))  # USDT金额
-
-                parsed_data.append({
-                    'symbol': symbol,
-                    'inst_id': inst_id,
-                    'price': last_price,
-                    'change': change_24h,
-                    'high': high_24h,
-                    'low': low_24h,
-                    'volume': vol_24h,
-                    'volume_usd': vol_ccy_24h,
-                    'timestamp': ticker.get('ts', ''),
-                    'market_cap_rank': MAIN_COINS.index(inst_id) + 1  # 市值排名
-                })
-            except Exception as e:
-                continue
-
-        # 返回数据（已经按市值顺序）
-        return parsed_data
+        # 只保留主流币（O(1)成员判断），只重新解析 ts/last 变化的产品，
+        # 结果已按主流币列表顺序（即市值）排序
+        return self.ticker_parser.parse(tickers, top_n=top_n)
 
 
 class HyperliquidMonitor:
@@ -235,19 +230,35 @@ class HyperliquidMonitor:
         self.root.geometry("1850x900")  # 增加宽度以完整显示所有信息（包括地址提示）
         self.root.configure(bg=COLORS['bg_primary'])  # 深黑背景
 
+        # 界面更新调度（工作线程不直接操作控件，由Tk主循环每50ms排空）
+        self.ui = UIDispatcher(self.root, interval_ms=50)
+
         # 语言管理器
         self.lang = get_language_manager()
 
         # 数据存储
         self.data = {}
-        self.is_loading = False
+
+        # 后台刷新任务（同名任务同时只运行一个，新请求加入或取代进行中的任务）
+        self.refresh_jobs = RefreshJobs()
+        self.MAIN_SCRAPE_TIMEOUT = 180  # 主页面抓取超时（秒）
+        self.OKX_REFRESH_TIMEOUT = 30  # OKX行情/持仓/委托刷新超时（秒）
+
+        # 主表格增量状态: 抓取快照比对 + 表格中已显示的行 {行key: item id / 显示值}
+        self.table_differ = TableDiffer()
+        self.tree_items = {}
+        self.tree_values = {}
+        self.tree_order = []
+        self.tree_amounts = {}  # {行key: 仓位金额}，tree_order 按金额从大到小排列
+        self.table_listeners = []  # listener(新显示的大户地址列表, 触发本次显示的抓取任务令牌或None)
 
         # 币种选择变量（单选模式）
         self.all_coins = ['BTC', 'ETH', 'SOL']
         self.selected_coin = tk.StringVar(value='BTC')  # 默认选择BTC
 
-        # 调试模式（显示浏览器窗口）
+        # 调试模式（显示浏览器窗口，并输出抓取/跟单/OKX的DEBUG日志）
         self.debug_mode = tk.BooleanVar(value=False)
+        self.debug_mode.trace_add('write', lambda *_: self.apply_debug_log_level())
 
         # 时间筛选变量（最近多少天）
         self.time_filter = tk.StringVar(value="7")  # all, 1, 3, 7, 31 (默认7天用于测试)
@@ -259,8 +270,17 @@ class HyperliquidMonitor:
         self.okx_client = OKXAPIClient()
         self.okx_data = []
         self.okx_auto_refresh = tk.BooleanVar(value=False)
-        self.okx_refresh_interval = 10000  # 10秒刷新一次
-        self.okx_is_loading = False
+        self.okx_refresh_interval = 10000  # 10秒刷新一次（REST轮询/推送断线时的兜底）
+
+        # OKX 行情推送（WebSocket 增量行情簿）
+        self.okx_ticker_book = TickerBook()
+        self.okx_ticker_stream = None
+        self.okx_rendered_version = -1  # 已渲染到表格的行情簿版本
+        self.okx_stream_render_interval = 500  # 推送模式下的UI渲染间隔（毫秒）
+        self.okx_render_after_id = None  # 下一次渲染的 after id（同时只保留一个渲染循环）
+        self.okx_heatmap_redraw_interval = 5  # 推送模式下热力图最短重绘间隔（秒）
+        self.okx_heatmap_last_draw = 0
+        self.okx_last_rest_refresh = 0
 
         # 用户详情实时监控相关变量
         self.user_detail_driver = None  # 保持浏览器会话
@@ -298,6 +318,7 @@ class HyperliquidMonitor:
             'is_demo': True  # 默认使用模拟盘
         }
         self.okx_config_file = 'okx_config.json'  # 配置文件路径
+        self._okx_positions_signature = None  # 上次刷新的持仓快照（用于检测成交）
         self.load_okx_config()  # 加载配置
 
         # 创建界面
@@ -448,6 +469,23 @@ class HyperliquidMonitor:
         )
         self.auto_copy_btn.pack(side=tk.LEFT, padx=10)
 
+        # 性能统计按钮
+        self.profiler_btn = tk.Button(
+            control_frame,
+            text="⏱️ 性能",
+            command=self.show_profiler_window,
+            bg=COLORS['bg_tertiary'],
+            fg=COLORS['text_primary'],
+            font=FONTS['body_bold'],
+            activebackground=COLORS['bg_hover'],
+            relief=tk.FLAT,
+            bd=0,
+            padx=20,
+            pady=12,
+            cursor='hand2'
+        )
+        self.profiler_btn.pack(side=tk.LEFT, padx=10)
+
         # 调试模式复选框
         debug_cb = tk.Checkbutton(
             control_frame,
@@ -811,6 +849,11 @@ class HyperliquidMonitor:
         self.message_text.tag_config('error', foreground=COLORS['loss'])
         self.message_text.tag_config('info', foreground=COLORS['text_secondary'])
 
+        # 面板只保留最近的消息，完整历史写入滚动日志文件
+        self.message_line_count = 0
+        self.last_message = None  # {'key': (msg_type, message), 'count', 'at'}，用于合并连续重复消息
+        add_rotating_file('messages', MESSAGE_LOG_FILE)
+
         # 底部信息栏
         info_frame = tk.Frame(self.root, bg=COLORS['bg_secondary'], height=30)
         info_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
@@ -826,29 +869,56 @@ class HyperliquidMonitor:
         self.info_label.pack(side=tk.LEFT, padx=10)
 
     def refresh_data(self):
-        """刷新数据（在新线程中运行）"""
-        if self.is_loading:
-            messagebox.showwarning("提示", "正在加载数据，请稍候...")
-            return
+        """
+        刷新数据（在新线程中抓取，避免界面卡顿）
 
-        # 在新线程中执行，避免界面卡顿
-        thread = threading.Thread(target=self.fetch_data)
-        thread.daemon = True
-        thread.start()
+        手动刷新、主界面定时刷新和跟单定时刷新共用一个抓取任务：
+        正在以相同条件抓取时加入进行中的任务，筛选条件变化时取代旧任务
+
+        Returns:
+            本次刷新对应的抓取任务令牌（加入时为进行中任务的令牌）
+        """
+        # 在Tk线程读取筛选条件
+        selected_coins = self.get_selected_coins()
+        headless = not self.debug_mode.get()
+
+        in_flight = self.refresh_jobs.running('main_scrape')
+        token = self.refresh_jobs.submit(
+            'main_scrape', self.fetch_data, selected_coins, headless,
+            key=(tuple(selected_coins), headless), timeout=self.MAIN_SCRAPE_TIMEOUT
+        )
+        if token is in_flight:
+            scrape_log.info("已有抓取任务进行中，本次刷新等待其结果")
+            return token
 
-    def fetch_data(self):
-        """获取网页数据"""
-        self.is_loading = True
         self.update_status("正在获取数据...")
         self.refresh_btn.config(state=tk.DISABLED)
+        # 超时时工作线程可能仍阻塞，不等它结束就恢复按钮
+        token.on_cancel(lambda: self.ui.post(self.finish_fetch, token))
+        return token
 
+    @profiler.timed('scrape')
+    def fetch_data(self, token, selected_coins, headless=True):
+        """
+        获取网页数据（工作线程，由 refresh_jobs 调度）
+
+        不直接操作控件：状态、表格和弹窗都通过 self.ui 交给Tk线程。
+        任务被取代或超时后关闭浏览器并放弃本次结果
+
+        Args:
+            token: 任务取消令牌
+            selected_coins: 选中的币种（由Tk线程读取后传入）
+            headless: 是否使用无头浏览器
+        """
         driver = None
+        # 本次抓取的结果先放在局部字典，确认未被取消后才在Tk线程替换 self.data（见 apply_scrape）
+        data = {'user_links': dict(self.data.get('user_links', {}))}
         try:
             # 配置 Chrome 选项（反检测配置）
             chrome_options = Options()
 
             # 如果不是调试模式，使用无头模式
-            if not self.debug_mode.get():
+            if headless:
                 chrome_options.add_argument('--headless=new')  # 使用新版headless模式
 
             # 基础配置
@@ -870,6 +940,8 @@ class HyperliquidMonitor:
             self.update_status("正在启动浏览器...")
             service = Service(ChromeDriverManager().install())
             driver = webdriver.Chrome(service=service, options=chrome_options)
+            token.on_cancel(driver.quit)  # 取消时关闭浏览器，阻塞中的页面操作立即返回
+            token.check()
 
             # 通过JavaScript隐藏webdriver属性
             driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
@@ -891,15 +963,15 @@ class HyperliquidMonitor:
 
             # 访问页面
             self.update_status("正在访问页面...")
-            url = "https://www.coinglass.com/zh/hyperliquid"
+            url = f"{COINGLASS_BASE_URL}/zh/hyperliquid"
             driver.get(url)
 
             # 等待页面加载
             self.update_status("正在等待页面加载...")
-            time.sleep(5)  # 等待动态内容加载
+            token.wait(5)  # 等待动态内容加载
+            token.check()
 
             # 应用币种筛选
-            selected_coins = self.get_selected_coins()
             if selected_coins and len(selected_coins) < len(self.all_coins):
                 self.update_status("正在应用币种筛选...")
                 self.apply_coin_filter_on_page(driver, selected_coins)
@@ -910,26 +982,29 @@ class HyperliquidMonitor:
             # 尝试获取页面标题
             try:
                 title = driver.title
-                self.data['title'] = title
+                data['title'] = title
             except:
-                self.data['title'] = "Hyperliquid"
+                data['title'] = "Hyperliquid"
 
             # 尝试获取可见文本
             try:
                 body = driver.find_element(By.TAG_NAME, 'body')
                 visible_text = body.text
-                self.data['visible_text'] = visible_text
+                data['visible_text'] = visible_text
             except Exception as e:
-                self.data['visible_text'] = f"无法获取文本: {str(e)}"
+                data['visible_text'] = f"无法获取文本: {str(e)}"
 
             # 尝试查找表格数据
             try:
+                token.check()
                 self.update_status("正在解析表格数据...")
 
+                if SNAPSHOT_RECORD_DIR:
+                    save_snapshot(driver, SNAPSHOT_RECORD_DIR)
+
                 # 先尝试直接查找所有包含用户地址的链接
-                print("\n===== 查找用户详情链接 =====")
                 all_links = driver.find_elements(By.TAG_NAME, 'a')
-                print(f"页面上总共有 {len(all_links)} 个链接")
+                scrape_log.debug("查找用户详情链接: 页面上总共有 %d 个链接", len(all_links))
 
                 user_link_count = 0
                 # 放宽链接验证规则 - 只要包含hyperliquid和完整地址即可
@@ -942,37 +1017,36 @@ class HyperliquidMonitor:
                         match = valid_link_pattern.search(href)
                         if match:
                             full_address = match.group(1)
-                            print(f"找到有效用户链接: {text[:30]} -> {href}")
+                            scrape_log.debug("找到有效用户链接: %s -> %s", text[:30], href)
                             if text:  # 如果链接有文本
-                                self.data.setdefault('user_links', {})[text] = href
+                                data.setdefault('user_links', {})[text] = href
                                 user_link_count += 1
-                            if user_link_count >= 5:  # 打印前5个
-                                print("...")
+                            if user_link_count >= 5:  # 只记录前5个
                                 break
                         else:
-                            if user_link_count < 3:  # 只在前期打印无效链接
-                                print(f"跳过无效链接格式: {href}")
+                            if user_link_count < 3:  # 只在前期记录无效链接
+                                scrape_log.debug("跳过无效链接格式: %s", href)
 
                 tables = driver.find_elements(By.TAG_NAME, 'table')
-                self.data['tables_count'] = len(tables)
-                self.data['tables_data'] = []
-                if 'user_links' not in self.data:
-                    self.data['user_links'] = {}  # 存储用户地址链接
+                data['tables_count'] = len(tables)
+                data['tables_data'] = []
+                if 'user_links' not in data:
+                    data['user_links'] = {}  # 存储用户地址链接
 
                 for idx, table in enumerate(tables):
+                    token.check()
                     try:
                         rows = table.find_elements(By.TAG_NAME, 'tr')
                         table_data = []
 
-                        # 调试：打印第一行数据看结构
-                        if idx == 0 and len(rows) > 0:
+                        # 调试：记录第一行数据看结构（每个单元格都要一次浏览器往返，只在DEBUG时执行）
+                        if idx == 0 and len(rows) > 0 and scrape_log.isEnabledFor(logging.DEBUG):
                             first_row = rows[0]
                             first_cells = first_row.find_elements(By.TAG_NAME, 'td')
                             if not first_cells:
                                 first_cells = first_row.find_elements(By.TAG_NAME, 'th')
-                            print(f"\n表格第一行有 {len(first_cells)} 列:")
-                            for i, cell in enumerate(first_cells):
-                                print(f"  列{i}: {cell.text[:30]}")
+                            scrape_log.debug("表格第一行有 %d 列: %s", len(first_cells),
+                                             ", ".join(f"列{i}={cell.text[:30]}" for i, cell in enumerate(first_cells)))
 
                         for row_idx, row in enumerate(rows):
                             cells = row.find_elements(By.TAG_NAME, 'td')
@@ -995,49 +1069,155 @@ class HyperliquidMonitor:
                                             match = valid_link_pattern.search(href)
                                             if match:
                                                 # 存储：简写地址 -> 完整URL
-                                                self.data['user_links'][cell_text] = href
-                                                if row_idx <= 3:  # 只打印前3行
-                                                    print(f"[列{col_idx}] 提取到用户链接: {cell_text} -> {href}")
+                                                data['user_links'][cell_text] = href
+                                                if row_idx <= 3:  # 只记录前3行
+                                                    scrape_log.debug("[列%d] 提取到用户链接: %s -> %s", col_idx, cell_text, href)
                                     except:
                                         pass  # 这个单元格没有链接
 
                             if row_data:
                                 table_data.append(row_data)
                         if table_data:
-                            self.data['tables_data'].append(table_data)
+                            data['tables_data'].append(table_data)
                     except:
                         continue
+            except JobCancelled:
+                raise
             except Exception as e:
-                self.data['tables_data'] = []
-                self.data['user_links'] = {}
-                self.data['error'] = f"表格解析错误: {str(e)}"
+                if token.cancelled:
+                    # 取消时浏览器已被关闭，这里的异常来自中断的页面操作，不是解析错误
+                    raise JobCancelled(f"{token.name}: {token.reason}")
+                data['tables_data'] = []
+                data['user_links'] = {}
+                data['error'] = f"表格解析错误: {str(e)}"
 
             # 获取时间戳
-            self.data['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            data['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-            # 更新界面
-            self.update_display()
-            self.update_status(f"数据更新成功 - {self.data['timestamp']}")
+            # 提交结果并更新界面（Tk线程）
+            token.check()
+            self.ui.post(self.apply_scrape, token, data)
+
+        except JobCancelled:
+            raise
 
         except Exception as e:
-            error_msg = f"获取数据失败: {str(e)}"
-            self.update_status(error_msg)
-            messagebox.showerror("错误", error_msg)
+            if token.cancelled:
+                # 浏览器已被取消回调关闭，异常来自中断的页面操作
+                scrape_log.info("抓取任务已取消（%s）", token.reason)
+            else:
+                error_msg = f"获取数据失败: {str(e)}"
+                self.update_status(error_msg)
+                self.ui.post(messagebox.showerror, "错误", error_msg)
 
         finally:
-            if driver:
+            if driver and not token.cancelled:
                 driver.quit()
-            self.is_loading = False
-            self.refresh_btn.config(state=tk.NORMAL)
+            # 排在界面更新之后执行
+            self.ui.post(self.finish_fetch, token)
+
+    def apply_scrape(self, token, data):
+        """
+        提交一次抓取的结果（Tk线程）
+
+        在Tk线程做最后一次取消检查后才替换 self.data 并与上一次快照比对，
+        被取代/超时的抓取不会覆盖新数据，也不会打乱增量比对的快照
+
+        Args:
+            token: 抓取任务令牌
+            data: 抓取结果
+        """
+        if token.cancelled:
+            return
+        # 与上一次抓取比对，下游只处理变化的行
+        delta = self.table_differ.update(data.get('tables_data', []))
+        self.data = data
+        self.update_display(token, delta)
+        self.update_status(f"数据更新成功 - {data['timestamp']}")
+
+    def finish_fetch(self, token):
+        """抓取结束（Tk线程）：恢复刷新按钮，更新最后刷新时间"""
+        in_flight = self.refresh_jobs.running('main_scrape')
+        if in_flight is not None and in_flight is not token:
+            return  # 已被新的抓取任务取代，由新任务收尾
+        self.refresh_btn.config(state=tk.NORMAL)
+        if token.cancelled:
+            if token.reason == 'timeout':
+                self.update_status(f"获取数据超时（{self.MAIN_SCRAPE_TIMEOUT}秒），已取消")
+            return
+
+        self.main_last_update_time = datetime.now()
+        update_text = f"最后更新: {self.main_last_update_time.strftime('%H:%M:%S')}"
+        self.main_update_time_label.config(text=update_text)
 
-            # 更新最后刷新时间
-            self.main_last_update_time = datetime.now()
-            update_text = f"最后更新: {self.main_last_update_time.strftime('%H:%M:%S')}"
-            self.main_update_time_label.config(text=update_text)
+    def update_display(self, fetch_token=None, delta=None):
+        """
+        更新显示的数据
+
+        抓取后按 delta 只同步变化的行，没有变化时不重建文本区域；
+        筛选条件变化等本地重绘（delta 为None）按全部行重新筛选
+
+        Args:
+            fetch_token: 本次显示对应的抓取任务令牌（筛选条件变化等本地重绘时为None）
+            delta: 本次抓取相对上一次的表格变化（scrape_diff.TableDelta）
+        """
+        if delta is None or delta or delta.initial:
+            self.update_text_area()
+
+        # 更新表格（如果有合适的数据）
+        selected_coins = self.get_selected_coins()
+
+        # 获取筛选条件
+        time_filter_value = self.time_filter.get()
+        amount_filter_value = self.amount_filter.get()
+
+        if delta is None:
+            total_rows, rows_to_display = self.filter_table_rows(
+                self.data.get('tables_data'), selected_coins, time_filter_value, amount_filter_value
+            )
+            # 按行key增量同步到表格（只增删/更新变化的行）
+            inserted_keys = self.sync_tree(rows_to_display)
+        else:
+            total_rows = len(self.table_differ.rows)
+            inserted_keys = self.sync_tree_delta(delta, selected_coins, time_filter_value, amount_filter_value)
+            scrape_log.info("表格增量: %s, 表格新显示 %d 行", delta.summary(), len(inserted_keys))
+        filtered_rows = len(self.tree_order)
+
+        # 通知本次新出现在表格中的大户地址（跟单引擎据此发现新大户）
+        new_addresses = list(dict.fromkeys(str(self.tree_values[key][1]).strip() for key in inserted_keys))
+        for listener in list(self.table_listeners):
+            try:
+                listener(new_addresses, fetch_token)
+            except Exception as e:
+                scrape_log.error("表格变化通知失败: %s", e)
+
+        # 更新信息栏
+        table_count = len(self.data.get('tables_data', []))
+        selected_count = len(selected_coins)
+        filter_info = f"时间:{time_filter_value}天" if time_filter_value != 'all' else "时间:全部"
+        if amount_filter_value == '5000w':
+            filter_info += " | 金额:>5000万"
+        elif amount_filter_value == '1y':
+            filter_info += " | 金额:>1亿"
+        else:
+            filter_info += " | 金额:全部"
+
+        self.info_label.config(
+            text=f"最后更新: {self.data.get('timestamp', 'N/A')} | 总数据: {total_rows} | 已筛选: {filtered_rows} | {filter_info}"
+        )
 
-    def update_display(self):
-        """更新显示的数据"""
-        # 更新文本区域
+        # 调试：打印提取到的链接
+        user_links = self.data.get('user_links', {})
+        print(f"\n========== 用户链接调试信息 ==========")
+        print(f"总共提取到 {len(user_links)} 个用户链接:")
+        for addr, url in list(user_links.items())[:5]:  # 只打印前5个
+            print(f"  {addr} -> {url}")
+        if len(user_links) > 5:
+            print(f"  ... 还有 {len(user_links) - 5} 个链接")
+        print("=" * 40 + "\n")
+
+    def update_text_area(self):
+        """重建原始数据文本区域（页面内容和全部表格行）"""
         self.text_area.delete(1.0, tk.END)
 
         display_text = f"=" * 80 + "\n"
@@ -1078,129 +1258,240 @@ class HyperliquidMonitor:
 
         self.text_area.insert(1.0, display_text)
 
-        # 更新表格（如果有合适的数据）
-        self.tree.delete(*self.tree.get_children())
-        selected_coins = self.get_selected_coins()
-        total_rows = 0
-        filtered_rows = 0
+    def filter_table_rows(self, tables_data, selected_coins, time_filter_value, amount_filter_value):
+        """
+        按币种/仓位金额/开仓时间筛选主表格数据
 
-        # 获取筛选条件
-        time_filter_value = self.time_filter.get()
-        amount_filter_value = self.amount_filter.get()
+        Args:
+            tables_data: 页面表格数据（每个表格第一行为表头）
+            selected_coins: 选中的币种列表
+            time_filter_value: 时间筛选（'all' 或天数）
+            amount_filter_value: 金额筛选（'all' / '5000w' / '1y'）
 
+        Returns:
+            (数据总行数, 按金额从大到小排序的 [(金额, 显示行, 行key)])
+            行key 为 (地址, 币种, 序号)，与 scrape_diff 的快照 key 一致
+        """
         # 首先收集所有符合条件的行（用于排序）
+        total_rows = 0
         rows_to_display = []
+        time_batch = TimeBatch()  # 本轮所有行共用一个参考时间
+        key_counts = {}  # {(地址, 币种): 已出现次数}
 
-        if self.data.get('tables_data'):
-            for table in self.data['tables_data']:
+        if tables_data:
+            for table in tables_data:
                 # 第一行通常是表头，从第二行开始是数据
-                for row_idx, row in enumerate(table[1:], start=1):
+                for row in table[1:]:
                     if len(row) >= 3:  # 确保有足够的列
                         total_rows += 1
 
-                        # 表格列索引（根据网页HTML结构）:
-                        # 0: 空（复选框）
-                        # 1: 排名 (#)
-                        # 2: 用户地址
-                        # 3: 币种
-                        # 4: 方向（多/空）
-                        # 5: 仓位
-                        # 6: 未实现盈亏(%)
-                        # 7: 开仓价格
-                        # 8: 爆仓价格
-                        # 9: 保证金
-                        # 10: 资金费
-                        # 11: 当前价格
-                        # 12: 开仓时间
-
-                        # 获取币种列（索引3）
-                        coin_symbol = ''
-                        if len(row) > 3:
-                            coin_text = str(row[3]).strip().upper()
-                            # 尝试匹配币种
-                            for coin in self.all_coins:
-                                if coin in coin_text:
-                                    coin_symbol = coin
-                                    break
-
-                        # 币种筛选
-                        if selected_coins and coin_symbol not in selected_coins and coin_symbol != '':
-                            continue
+                        identity = row_identity(row) or ('', '')
+                        occurrence = key_counts.get(identity, 0)
+                        key_counts[identity] = occurrence + 1
 
-                        # 提取仓位金额和开仓时间用于筛选
-                        position_amount_str = row[5] if len(row) > 5 else ''
-                        open_time_str = row[12] if len(row) > 12 else ''
+                        matched = self.filter_row(row, selected_coins, time_filter_value, amount_filter_value,
+                                                  time_batch)
+                        if matched is not None:
+                            # 保存行数据和金额（用于排序）
+                            rows_to_display.append(matched + (identity + (occurrence,),))
 
-                        # 解析金额（美元）
-                        position_amount = self.parse_amount(position_amount_str)
+        # 按金额从大到小排序
+        rows_to_display.sort(key=lambda x: x[0], reverse=True)
 
-                        # 解析开仓时间（距今天数）
-                        days_ago = self.parse_open_time(open_time_str)
+        return total_rows, rows_to_display
 
-                        # 应用仓位金额筛选
-                        if amount_filter_value == '5000w':
-                            if position_amount < 50000000:  # 5000万
-                                continue
-                        elif amount_filter_value == '1y':
-                            if position_amount < 100000000:  # 1亿
-                                continue
+    def filter_row(self, row, selected_coins, time_filter_value, amount_filter_value, time_batch):
+        """
+        筛选单行并转换为显示行
 
-                        # 应用时间筛选
-                        if time_filter_value != 'all':
-                            max_days = int(time_filter_value)
-                            if days_ago > max_days:
-                                continue
+        Args:
+            row: 页面表格行
+            time_batch: 共用参考时间的 TimeBatch
+
+        Returns:
+            (金额, 显示行)，不符合筛选条件时返回None
+        """
+        # 表格列索引（根据网页HTML结构）:
+        # 0: 空（复选框）
+        # 1: 排名 (#)
+        # 2: 用户地址
+        # 3: 币种
+        # 4: 方向（多/空）
+        # 5: 仓位
+        # 6: 未实现盈亏(%)
+        # 7: 开仓价格
+        # 8: 爆仓价格
+        # 9: 保证金
+        # 10: 资金费
+        # 11: 当前价格
+        # 12: 开仓时间
+
+        # 获取币种列（索引3）
+        coin_symbol = ''
+        if len(row) > 3:
+            coin_text = str(row[3]).strip().upper()
+            # 尝试匹配币种
+            for coin in self.all_coins:
+                if coin in coin_text:
+                    coin_symbol = coin
+                    break
 
-                        # 提取需要的12列数据（跳过第0列的空列）
-                        display_row = []
-                        for i in range(1, 14):  # 索引1到13，共12列
-                            if i < len(row):
-                                cell_value = row[i]
-                                # 将换行符替换为空格，保持所有信息在一行显示
-                                if isinstance(cell_value, str):
-                                    cell_value = cell_value.replace('\n', ' ')
-                                display_row.append(cell_value)
-                            else:
-                                display_row.append('')
-
-                        # 保存行数据和金额（用于排序）
-                        rows_to_display.append((position_amount, display_row))
+        # 币种筛选
+        if selected_coins and coin_symbol not in selected_coins and coin_symbol != '':
+            return None
 
-        # 按金额从大到小排序
-        rows_to_display.sort(key=lambda x: x[0], reverse=True)
+        # 提取仓位金额和开仓时间用于筛选
+        position_amount_str = row[5] if len(row) > 5 else ''
+        open_time_str = row[12] if len(row) > 12 else ''
 
-        # 插入排序后的数据到表格
-        for amount, display_row in rows_to_display:
-            self.tree.insert('', tk.END, values=display_row)
-            filtered_rows += 1
+        # 解析金额（美元）
+        position_amount = self.parse_amount(position_amount_str)
 
-        # 更新信息栏
-        table_count = len(self.data.get('tables_data', []))
-        selected_count = len(selected_coins)
-        filter_info = f"时间:{time_filter_value}天" if time_filter_value != 'all' else "时间:全部"
+        # 解析开仓时间（距今天数）
+        days_ago = self.parse_open_time(open_time_str, time_batch)
+
+        # 应用仓位金额筛选
         if amount_filter_value == '5000w':
-            filter_info += " | 金额:>5000万"
+            if position_amount < 50000000:  # 5000万
+                return None
         elif amount_filter_value == '1y':
-            filter_info += " | 金额:>1亿"
-        else:
-            filter_info += " | 金额:全部"
+            if position_amount < 100000000:  # 1亿
+                return None
 
-        self.info_label.config(
-            text=f"最后更新: {self.data.get('timestamp', 'N/A')} | 总数据: {total_rows} | 已筛选: {filtered_rows} | {filter_info}"
-        )
+        # 应用时间筛选
+        if time_filter_value != 'all':
+            max_days = int(time_filter_value)
+            if days_ago > max_days:
+                return None
 
-        # 调试：打印提取到的链接
-        user_links = self.data.get('user_links', {})
-        print(f"\n========== 用户链接调试信息 ==========")
-        print(f"总共提取到 {len(user_links)} 个用户链接:")
-        for addr, url in list(user_links.items())[:5]:  # 只打印前5个
-            print(f"  {addr} -> {url}")
-        if len(user_links) > 5:
-            print(f"  ... 还有 {len(user_links) - 5} 个链接")
-        print("=" * 40 + "\n")
+        # 提取需要的12列数据（跳过第0列的空列）
+        display_row = []
+        for i in range(1, 14):  # 索引1到13，共12列
+            if i < len(row):
+                cell_value = row[i]
+                # 将换行符替换为空格，保持所有信息在一行显示
+                if isinstance(cell_value, str):
+                    cell_value = cell_value.replace('\n', ' ')
+                display_row.append(cell_value)
+            else:
+                display_row.append('')
+
+        return position_amount, display_row
+
+    def sync_tree(self, rows_to_display):
+        """
+        按行key把筛选结果增量同步到主表格
+
+        只删除不再显示的行、插入新行、更新内容变化的行，顺序变化的行移动到新位置；
+        行没有变化时不产生任何Tk调用
+
+        Args:
+            rows_to_display: filter_table_rows 返回的 [(金额, 显示行, 行key)]（已排序）
+
+        Returns:
+            本次新插入的行key列表
+        """
+        wanted = {key for _, _, key in rows_to_display}
+        for key in [key for key in self.tree_items if key not in wanted]:
+            self.tree.delete(self.tree_items.pop(key))
+            self.tree_values.pop(key, None)
+            self.tree_amounts.pop(key, None)
+        order = [key for key in self.tree_order if key in wanted]
+
+        inserted = []
+        for index, (amount, display_row, key) in enumerate(rows_to_display):
+            self.tree_amounts[key] = amount
+            values = tuple(display_row)
+            item = self.tree_items.get(key)
+            if item is None:
+                self.tree_items[key] = self.tree.insert('', index, values=values)
+                order.insert(index, key)
+                inserted.append(key)
+            else:
+                if self.tree_values.get(key) != values:
+                    self.tree.item(item, values=values)
+                if order[index] != key:
+                    self.tree.move(item, '', index)
+                    order.remove(key)
+                    order.insert(index, key)
+            self.tree_values[key] = values
+
+        self.tree_order = order
+        return inserted
+
+    def sync_tree_delta(self, delta, selected_coins, time_filter_value, amount_filter_value):
+        """
+        只按本次抓取的变化同步主表格：移除消失的行，新增/变化的行重新筛选后插入或更新，
+        按金额二分查找位置；未变化的行不再筛选也不产生Tk调用
+
+        Args:
+            delta: scrape_diff.TableDelta
+
+        Returns:
+            本次新插入的行key列表
+        """
+        for key in delta.removed:
+            self.remove_tree_row(key)
+
+        time_batch = TimeBatch()
+        inserted = []
+        for rows in (delta.added, delta.changed):
+            for key, row in rows.items():
+                matched = self.filter_row(row, selected_coins, time_filter_value, amount_filter_value, time_batch)
+                if matched is None:
+                    self.remove_tree_row(key)
+                    continue
+
+                amount, display_row = matched
+                values = tuple(display_row)
+                item = self.tree_items.get(key)
+                if item is not None and self.tree_amounts[key] != amount:
+                    self.tree_order.remove(key)  # 金额变化，重新定位
+                elif item is not None:
+                    if self.tree_values[key] != values:
+                        self.tree.item(item, values=values)
+                        self.tree_values[key] = values
+                    continue
+
+                index = self.tree_insert_index(amount)
+                if item is None:
+                    self.tree_items[key] = self.tree.insert('', index, values=values)
+                    inserted.append(key)
+                else:
+                    self.tree.item(item, values=values)
+                    self.tree.move(item, '', index)
+                self.tree_order.insert(index, key)
+                self.tree_values[key] = values
+                self.tree_amounts[key] = amount
+
+        return inserted
+
+    def tree_insert_index(self, amount):
+        """按金额从大到小，新行在 tree_order 中的位置（同金额排在已有行之后）"""
+        low, high = 0, len(self.tree_order)
+        while low < high:
+            middle = (low + high) // 2
+            if self.tree_amounts[self.tree_order[middle]] >= amount:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def remove_tree_row(self, key):
+        """从主表格移除一行（不在表格中时忽略）"""
+        item = self.tree_items.pop(key, None)
+        if item is None:
+            return
+        self.tree.delete(item)
+        self.tree_order.remove(key)
+        self.tree_values.pop(key, None)
+        self.tree_amounts.pop(key, None)
 
     def update_status(self, message):
-        """更新状态栏"""
+        """更新状态栏（工作线程调用时转到Tk线程，连续的状态更新只显示最新一条）"""
+        if not self.ui.is_ui_thread():
+            self.ui.post_latest('status', self.status_label.config, text=message)
+            return
         self.status_label.config(text=message)
         self.root.update_idletasks()
 
@@ -1212,6 +1503,11 @@ class HyperliquidMonitor:
             message: 消息内容
             msg_type: 消息类型 ('success', 'warning', 'error', 'info')
         """
+        # 工作线程（如跟单流水线）调用时转到Tk线程执行
+        if not self.ui.is_ui_thread():
+            self.ui.post(self.add_message, message, msg_type)
+            return
+
         try:
             timestamp = datetime.now().strftime('%H:%M:%S')
 
@@ -1224,18 +1520,39 @@ class HyperliquidMonitor:
             }
             icon = icons.get(msg_type, 'ℹ️')
 
-            # 格式化消息
-            formatted_msg = f"[{timestamp}] {icon} {message}\n"
+            # 完整历史写入日志文件（同时输出到控制台，异步写出）
+            message_log.log(MESSAGE_LOG_LEVELS.get(msg_type, logging.INFO), "%s %s", icon, message)
+
+            # 面板按"一条消息一行"合并/裁剪：异常文本（如Selenium堆栈）中的换行折叠为一行
+            message = ' ⏎ '.join(line.strip() for line in str(message).splitlines() if line.strip())
+
+            now = time.time()
+            key = (msg_type, message)
+            last = self.last_message
+            repeated = last is not None and last['key'] == key and now - last['at'] <= MESSAGE_COALESCE_SECONDS
 
-            # 添加到消息面板
             self.message_text.config(state=tk.NORMAL)
+            if repeated:
+                # 连续重复的消息只更新最后一行的时间和次数
+                last['count'] += 1
+                last['at'] = now
+                self.message_text.delete('end-2l linestart', 'end-1c')
+                formatted_msg = f"[{timestamp}] {icon} {message} (×{last['count']})\n"
+            else:
+                self.last_message = {'key': key, 'count': 1, 'at': now}
+                self.message_line_count += 1
+                formatted_msg = f"[{timestamp}] {icon} {message}\n"
             self.message_text.insert(tk.END, formatted_msg, msg_type)
+
+            # 超出上限时一次删除一批最早的消息（避免每条消息都删除一行）
+            if self.message_line_count > MESSAGE_PANEL_MAX_LINES + MESSAGE_PANEL_TRIM_BATCH:
+                excess = self.message_line_count - MESSAGE_PANEL_MAX_LINES
+                self.message_text.delete('1.0', f'{excess + 1}.0')
+                self.message_line_count -= excess
+
             self.message_text.see(tk.END)  # 滚动到最后
             self.message_text.config(state=tk.DISABLED)
 
-            # 同时打印到控制台
-            print(f"[Message] {formatted_msg.strip()}")
-
         except Exception as e:
             print(f"[Error] Failed to add message: {e}")
 
@@ -1260,72 +1577,19 @@ class HyperliquidMonitor:
         解析仓位金额字符串，转换为美元数值
         例如: "$1.86亿 1747.18 BTC" -> 186000000
         """
-        try:
-            if not amount_str or not isinstance(amount_str, str):
-                return 0
-
-            # 提取金额部分（$符号后的数字和单位）
-            # 匹配模式: $数字.数字 + 单位（万或亿）
-            match = re.search(r'\$([0-9.]+)(万|亿)?', amount_str)
-            if not match:
-                return 0
-
-            number = float(match.group(1))
-            unit = match.group(2)
-
-            # 转换为美元
-            if unit == '亿':
-                return number * 100000000
-            elif unit == '万':
-                return number * 10000
-            else:
-                return number
-
-        except Exception as e:
-            return 0
+        return parse_number(amount_str, default=0)
 
-    def parse_open_time(self, time_str):
+    def parse_open_time(self, time_str, batch=None):
         """
         解析开仓时间字符串，计算距离现在的天数
         例如: "08:18 05-09" -> 计算距今天数
-        """
-        try:
-            if not time_str or not isinstance(time_str, str):
-                return 999  # 返回一个很大的数表示无效
-
-            # 提取时间和日期部分
-            # 格式: "HH:MM MM-DD"
-            match = re.search(r'(\d{2}):(\d{2})\s+(\d{2})-(\d{2})', time_str)
-            if not match:
-                return 999
-
-            hour = int(match.group(1))
-            minute = int(match.group(2))
-            month = int(match.group(3))
-            day = int(match.group(4))
-
-            # 获取当前时间
-            now = datetime.now()
-            current_year = now.year
-
-            # 尝试构建日期（假设是今年）
-            try:
-                open_date = datetime(current_year, month, day, hour, minute)
-            except ValueError:
-                # 日期无效
-                return 999
-
-            # 如果开仓日期在未来，说明是去年的
-            if open_date > now:
-                open_date = datetime(current_year - 1, month, day, hour, minute)
-
-            # 计算天数差
-            days_diff = (now - open_date).days
-
-            return days_diff
 
-        except Exception as e:
-            return 999
+        Args:
+            time_str: 开仓时间
+            batch: 本轮共用的 TimeBatch（批量筛选时传入，避免每行取当前时间）
+        """
+        batch = batch or TimeBatch()
+        return batch.days_ago(batch.open_time(time_str))
 
     def apply_coin_filter_on_page(self, driver, selected_coins):
         """在网页上应用币种筛选"""
@@ -1489,6 +1753,7 @@ class HyperliquidMonitor:
         except Exception as e:
             messagebox.showerror("错误", f"操作失败: {str(e)}")
 
+    @profiler.timed('scrape')
     def fetch_user_details(self, url, user_address):
         """爬取用户详情页数据并显示可视化"""
         driver = None
@@ -1509,7 +1774,7 @@ class HyperliquidMonitor:
             if not url.startswith('http'):
                 log(f"⚠ 警告: URL格式不正确，尝试补全...")
                 if url.startswith('/'):
-                    url = 'https://www.coinglass.com' + url
+                    url = COINGLASS_BASE_URL + url
                     log(f"补全后的URL: {url}")
                 else:
                     log(f"✗ 错误: 无法处理的URL格式")
@@ -1557,9 +1822,12 @@ class HyperliquidMonitor:
                 '''
             })
 
+            # 捕获页面的XHR数据（刷新时无需逐个点击标签页）
+            install_capture_hook(driver)
+
             # 先访问首页建立session（模拟真实用户行为）
             log("先访问首页建立session...")
-            driver.get("https://www.coinglass.com/zh/hyperliquid")
+            driver.get(f"{COINGLASS_BASE_URL}/zh/hyperliquid")
             time.sleep(3)  # 等待首页加载
             log("✓ Session已建立")
 
@@ -1621,9 +1889,9 @@ class HyperliquidMonitor:
 
                         # 尝试不同的URL格式
                         alt_urls = [
-                            f"https://www.coinglass.com/hyperliquid/{full_address}",  # 无zh
-                            f"https://www.coinglass.com/zh/pro/futures/hyperliquid/{full_address}",  # 添加pro/futures
-                            f"https://www.coinglass.com/pro/futures/hyperliquid/{full_address}",
+                            f"{COINGLASS_BASE_URL}/hyperliquid/{full_address}",  # 无zh
+                            f"{COINGLASS_BASE_URL}/zh/pro/futures/hyperliquid/{full_address}",  # 添加pro/futures
+                            f"{COINGLASS_BASE_URL}/pro/futures/hyperliquid/{full_address}",
                         ]
 
                 # 尝试每个备选URL
@@ -1673,7 +1941,7 @@ class HyperliquidMonitor:
                         'debug_log': debug_log
                     }
                     # 在主线程中显示
-                    self.root.after(0, lambda: self.show_user_details_window(user_details_404))
+                    self.ui.post(lambda: self.show_user_details_window(user_details_404))
                     return
 
             # 等待页面完全加载（Ant Design动态渲染）
@@ -1747,6 +2015,9 @@ class HyperliquidMonitor:
                 except Exception as e:
                     log(f"保存HTML失败: {str(e)}")
 
+                if SNAPSHOT_RECORD_DIR:
+                    save_snapshot(driver, SNAPSHOT_RECORD_DIR)
+
                 # 获取页面文本内容，用于调试
                 body_text = driver.find_element(By.TAG_NAME, 'body').text
                 log(f"✓ 页面已加载，文本长度: {len(body_text)}")
@@ -2147,10 +2418,10 @@ class HyperliquidMonitor:
                 log("✓ 浏览器会话已保存，用于实时数据更新")
 
             # 在主线程中显示详情窗口（Tkinter不是线程安全的）
-            self.root.after(0, lambda: self.show_user_details_window(user_details))
+            self.ui.post(lambda: self.show_user_details_window(user_details))
 
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("错误", f"爬取详情失败: {str(e)}"))
+            self.ui.post(lambda: messagebox.showerror("错误", f"爬取详情失败: {str(e)}"))
             # 如果出错，关闭浏览器
             if driver:
                 try:
@@ -2158,7 +2429,7 @@ class HyperliquidMonitor:
                 except:
                     pass
         finally:
-            self.root.after(0, lambda: self.update_status("详情爬取完成"))
+            self.ui.post(lambda: self.update_status("详情爬取完成"))
 
     def smart_refresh_page_data(self, driver):
         """
@@ -2269,9 +2540,13 @@ class HyperliquidMonitor:
         time.sleep(5)
         return True
 
+    @profiler.timed('scrape')
     def extract_table_data(self, driver):
         """
         提取所有表格数据（持仓、交易、委托、充值提现）
+
+        优先使用页面捕获的XHR数据（无需切换标签页），
+        捕获中没有识别到的数据再回退到逐个点击标签页抓取
         """
         table_data = {
             'positions': [],
@@ -2282,7 +2557,10 @@ class HyperliquidMonitor:
         }
 
         try:
-            print("开始提取表格数据...")
+            scrape_log.debug("开始提取表格数据")
+
+            if SNAPSHOT_RECORD_DIR:
+                save_snapshot(driver, SNAPSHOT_RECORD_DIR)
 
             # 定义标签页配置
             tabs_config = [
@@ -2292,10 +2570,20 @@ class HyperliquidMonitor:
                 {'name': '充值 & 提现', 'data_key': 'deposits_withdrawals'},
             ]
 
+            # 1. 捕获数据路径
+            captured = extract_captured_tables(driver)
+            for data_key, rows in captured.items():
+                if data_key == 'deposits_withdrawals':
+                    for record in rows:
+                        target = 'deposits' if record.get('类型') == '充值' else 'withdrawals'
+                        table_data[target].append(record)
+                else:
+                    table_data[data_key] = rows
+
             def click_tab(tab_name):
                 """点击指定名称的标签页"""
                 try:
-                    print(f"尝试点击标签页: {tab_name}")
+                    scrape_log.debug("尝试点击标签页: %s", tab_name)
 
                     # 查找所有Tab按钮
                     tab_buttons = driver.find_elements(By.CSS_SELECTOR, "button[role='tab'].MuiTab-root")
@@ -2308,28 +2596,34 @@ class HyperliquidMonitor:
 
                         if search_text in clean_text or clean_text in search_text:
                             driver.execute_script("arguments[0].click();", tab_btn)
-                            print(f"✓ 已点击标签页: {tab_name}")
+                            scrape_log.debug("已点击标签页: %s", tab_name)
                             time.sleep(0.5)
                             return True
 
                     return False
 
                 except Exception as e:
-                    print(f"✗ 点击标签页异常: {str(e)}")
+                    scrape_log.warning("点击标签页 %s 异常: %s", tab_name, e)
                     return False
 
+            # 2. 点击标签页路径（只处理捕获中没有的数据）
             for tab_config in tabs_config:
                 tab_name = tab_config['name']
+                if tab_config['data_key'] in captured:
+                    scrape_log.debug("%s: 使用捕获数据, 跳过点击", tab_name)
+                    continue
+
+                tab_start = time.perf_counter()
 
                 # 点击标签页
                 if not click_tab(tab_name):
-                    print(f"⚠ 跳过标签页: {tab_name}")
+                    scrape_log.info("跳过标签页: %s", tab_name)
                     continue
 
                 # 提取当前标签页的数据
                 all_rows = driver.find_elements(By.CLASS_NAME, "ant-table-row")
                 visible_rows = [row for row in all_rows if row.get_attribute('aria-hidden') != 'true']
-                print(f"  {tab_name} 标签页找到 {len(visible_rows)} 行数据")
+                scrape_log.debug("%s 标签页找到 %d 行数据", tab_name, len(visible_rows))
 
                 for row_idx, row in enumerate(visible_rows):
                     try:
@@ -2390,13 +2684,17 @@ class HyperliquidMonitor:
                                     table_data['deposits'].append(record)
 
                     except Exception as e:
-                        print(f"  处理 {tab_name} 第 {row_idx + 1} 行时出错: {str(e)}")
+                        scrape_log.warning("处理 %s 第 %d 行时出错: %s", tab_name, row_idx + 1, e)
                         continue
 
-            print(f"✓ 表格数据提取完成: {len(table_data['positions'])} 个持仓, {len(table_data['trades'])} 条交易, {len(table_data['open_orders'])} 个委托, {len(table_data['deposits'])} 条充值, {len(table_data['withdrawals'])} 条提现")
+                scrape_log.debug("%s: 点击抓取耗时 %.0fms", tab_name, (time.perf_counter() - tab_start) * 1000)
+
+            scrape_log.info("表格数据提取完成: %d 个持仓, %d 条交易, %d 个委托, %d 条充值, %d 条提现",
+                            len(table_data['positions']), len(table_data['trades']), len(table_data['open_orders']),
+                            len(table_data['deposits']), len(table_data['withdrawals']))
 
         except Exception as e:
-            print(f"✗ 提取表格数据失败: {str(e)}")
+            scrape_log.error("提取表格数据失败: %s", e)
 
         return table_data
 
@@ -2566,7 +2864,7 @@ class HyperliquidMonitor:
 
         # 如果窗口还在，更新UI
         if updated_data and self.user_detail_window and self.user_detail_window.winfo_exists():
-            self.root.after(0, lambda: self.update_user_details_ui(updated_data))
+            self.ui.post(lambda: self.update_user_details_ui(updated_data))
 
         # 继续下一次刷新
         if self.user_detail_auto_refresh.get():
@@ -2776,13 +3074,13 @@ class HyperliquidMonitor:
                 updated_data = self.refresh_user_details_data_from_page()
                 if updated_data:
                     # 更新窗口显示（需要重建窗口）
-                    self.root.after(0, lambda: self.rebuild_detail_window(updated_data))
-                    self.root.after(0, lambda: messagebox.showinfo(
+                    self.ui.post(lambda: self.rebuild_detail_window(updated_data))
+                    self.ui.post(lambda: messagebox.showinfo(
                         self.lang.get_text('msg_update_title'),
                         self.lang.get_text('msg_update_success')
                     ))
                 else:
-                    self.root.after(0, lambda: messagebox.showerror(
+                    self.ui.post(lambda: messagebox.showerror(
                         self.lang.get_text('msg_update_failed_title'),
                         self.lang.get_text('msg_update_failed')
                     ))
@@ -3993,6 +4291,27 @@ class HyperliquidMonitor:
         )
         self.last_refresh_label.pack()
 
+        # 跟单延迟（检测→确认 P50/P90）
+        latency_stat = tk.Frame(stats_row, bg=COLORS['bg_secondary'], relief=tk.FLAT, bd=1)
+        latency_stat.pack(side=tk.LEFT, padx=15, pady=5, ipadx=10, ipady=5)
+
+        tk.Label(
+            latency_stat,
+            text="延迟 P50/P90",
+            font=FONTS['small'],
+            bg=COLORS['bg_secondary'],
+            fg=COLORS['text_secondary']
+        ).pack()
+
+        self.copy_latency_label = tk.Label(
+            latency_stat,
+            text="--",
+            font=FONTS['body_bold'],
+            bg=COLORS['bg_secondary'],
+            fg=COLORS['text_primary']
+        )
+        self.copy_latency_label.pack()
+
         # 监控大户列表
         list_frame = tk.LabelFrame(
             left_frame,
@@ -4110,6 +4429,31 @@ class HyperliquidMonitor:
         self.my_copy_text.insert('1.0', '等待跟单数据...')
         self.my_copy_text.config(state=tk.DISABLED)
 
+        # 跟单延迟分位数
+        latency_frame = tk.LabelFrame(
+            right_frame,
+            text="⏱️ 跟单延迟",
+            font=FONTS['heading'],
+            bg=COLORS['bg_secondary'],
+            fg=COLORS['text_primary'],
+            height=180
+        )
+        latency_frame.pack(fill=tk.X, padx=5, pady=5)
+        latency_frame.pack_propagate(False)
+
+        self.latency_text = tk.Text(
+            latency_frame,
+            font=FONTS['number'],
+            bg=COLORS['bg_tertiary'],
+            fg=COLORS['text_primary'],
+            relief=tk.FLAT,
+            padx=10,
+            pady=5
+        )
+        self.latency_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.latency_text.insert('1.0', '暂无跟单事件')
+        self.latency_text.config(state=tk.DISABLED)
+
         # 记录当前选中的大户地址（用于自动更新详情）
         self.selected_trader_address = None
 
@@ -4364,6 +4708,9 @@ class HyperliquidMonitor:
                     refresh_time = self.auto_copy_trader.last_refresh_time.strftime('%H:%M:%S')
                     self.last_refresh_label.config(text=refresh_time)
 
+                # 跟单延迟
+                self.update_latency_display()
+
                 # 更新监控列表
                 self.monitor_tree.delete(*self.monitor_tree.get_children())
 
@@ -4419,6 +4766,22 @@ class HyperliquidMonitor:
         # 每2秒更新一次
         self.root.after(2000, self.update_monitor_display)
 
+    def update_latency_display(self):
+        """更新跟单延迟统计（检测→确认 P50/P90 + 分段分位数表）"""
+        tracer = self.auto_copy_trader.latency
+        stats = tracer.percentiles()
+
+        detect_to_ack = stats.get('detect_to_ack')
+        if detect_to_ack:
+            self.copy_latency_label.config(
+                text=f"{detect_to_ack['p50'] / 1000:.1f}s / {detect_to_ack['p90'] / 1000:.1f}s"
+            )
+
+        self.latency_text.config(state=tk.NORMAL)
+        self.latency_text.delete('1.0', tk.END)
+        self.latency_text.insert('1.0', '\n'.join(tracer.summary_lines()))
+        self.latency_text.config(state=tk.DISABLED)
+
     def _update_status_label_recursive(self, widget, text, color):
         """递归查找并更新状态标签"""
         try:
@@ -4433,50 +4796,63 @@ class HyperliquidMonitor:
             pass
 
     def refresh_okx_data(self):
-        """刷新 OKX 数据表格"""
-        if self.okx_is_loading:
-            messagebox.showwarning("提示", "正在加载数据，请稍候...")
-            return
-
-        thread = threading.Thread(target=self._fetch_okx_data)
-        thread.daemon = True
-        thread.start()
+        """刷新 OKX 数据表格（正在获取时加入进行中的任务）"""
+        self.refresh_jobs.submit('okx_tickers', self._fetch_okx_data, timeout=self.OKX_REFRESH_TIMEOUT)
 
-    def _fetch_okx_data(self):
+    @profiler.timed('okx')
+    def _fetch_okx_data(self, token):
         """后台获取 OKX 数据"""
-        self.okx_is_loading = True
-        self.root.after(0, lambda: self.okx_status_label.config(text="正在获取数据..."))
-        self.root.after(0, lambda: self.okx_refresh_btn.config(state=tk.DISABLED))
+        self.ui.post(lambda: self.okx_status_label.config(text="正在获取数据..."))
+        self.ui.post(lambda: self.okx_refresh_btn.config(state=tk.DISABLED))
 
         try:
             # 获取行情数据
             tickers = self.okx_client.get_tickers("SWAP")
+            token.check()
+            self.okx_last_rest_refresh = time.time()
             if tickers:
                 # 解析数据
                 self.okx_data = self.okx_client.parse_ticker_data(tickers, filter_usdt=True, top_n=50)
 
+                # 用REST全量数据为推送行情簿打底（只保留主流币）
+                self.okx_ticker_book.update(
+                    [t for t in tickers if t.get('instId', '') in MAIN_COINS_INDEX.members]
+                )
+                self.okx_rendered_version = self.okx_ticker_book.version
+
                 # 更新UI（必须在主线程）
-                self.root.after(0, self._update_okx_table)
-                self.root.after(0, lambda: self.okx_status_label.config(
+                self.ui.post(self._update_okx_table)
+                self.ui.post(lambda: self.okx_status_label.config(
                     text=f"更新成功 - {datetime.now().strftime('%H:%M:%S')}"
                 ))
             else:
-                self.root.after(0, lambda: self.okx_status_label.config(text="获取数据失败"))
-                self.root.after(0, lambda: messagebox.showerror("错误", "无法获取 OKX 数据"))
+                self.ui.post(lambda: self.okx_status_label.config(text="获取数据失败"))
+                self.ui.post(lambda: messagebox.showerror("错误", "无法获取 OKX 数据"))
+
+        except JobCancelled:
+            if token.reason == 'timeout':
+                self.ui.post(lambda: self.okx_status_label.config(text="获取数据超时"))
 
         except Exception as e:
-            self.root.after(0, lambda: self.okx_status_label.config(text=f"错误: {str(e)}"))
-            self.root.after(0, lambda: messagebox.showerror("错误", f"获取数据失败:\n{str(e)}"))
+            self.ui.post(lambda: self.okx_status_label.config(text=f"错误: {str(e)}"))
+            self.ui.post(lambda: messagebox.showerror("错误", f"获取数据失败:\n{str(e)}"))
 
         finally:
-            self.okx_is_loading = False
-            self.root.after(0, lambda: self.okx_refresh_btn.config(state=tk.NORMAL))
+            self.ui.post(lambda: self.okx_refresh_btn.config(state=tk.NORMAL))
 
     def _update_okx_table(self):
-        """更新 OKX 数据表格（主线程）"""
-        # 清空表格
-        for item in self.okx_tree.get_children():
-            self.okx_tree.delete(item)
+        """更新 OKX 数据表格（主线程，行集合不变时原地更新，避免推送模式下闪烁）"""
+        # 配置颜色
+        self.okx_tree.tag_configure('up', foreground='#00ff88')
+        self.okx_tree.tag_configure('down', foreground='#ff4444')
+
+        existing_ids = self.okx_tree.get_children()
+        new_ids = tuple(data['inst_id'] for data in self.okx_data)
+        in_place = existing_ids == new_ids
+
+        if not in_place:
+            # 行集合变化：清空表格后重建
+            self.okx_tree.delete(*existing_ids)
 
         # 填充数据
         for idx, data in enumerate(self.okx_data, 1):
@@ -4488,9 +4864,9 @@ class HyperliquidMonitor:
             low = f"${data['low']:,.4f}" if data['low'] < 100 else f"${data['low']:,.2f}"
             volume = f"${data['volume_usd']:,.0f}"
 
-            # 插入数据，使用tag标记涨跌
+            # 使用tag标记涨跌，产品ID作为iid便于原地更新
             tag = 'up' if change >= 0 else 'down'
-            self.okx_tree.insert('', tk.END, values=(
+            values = (
                 idx,
                 data['symbol'],
                 price,
@@ -4498,11 +4874,11 @@ class HyperliquidMonitor:
                 high,
                 low,
                 volume
-            ), tags=(tag,))
-
-        # 配置颜色
-        self.okx_tree.tag_configure('up', foreground='#00ff88')
-        self.okx_tree.tag_configure('down', foreground='#ff4444')
+            )
+            if in_place:
+                self.okx_tree.item(data['inst_id'], values=values, tags=(tag,))
+            else:
+                self.okx_tree.insert('', tk.END, iid=data['inst_id'], values=values, tags=(tag,))
 
     def refresh_okx_heatmap(self):
         """刷新热力图"""
@@ -4561,27 +4937,35 @@ class HyperliquidMonitor:
         self.okx_heatmap_ax.axis('off')
         self.okx_heatmap_fig.tight_layout()
         self.okx_heatmap_canvas.draw()
+        self.okx_heatmap_last_draw = time.time()
 
     # ==================== OKX 持仓管理相关方法 ====================
 
-    def refresh_okx_positions(self):
-        """刷新OKX持仓"""
-        if not self.okx_trader or not self.okx_config.get('api_key'):
+    def refresh_okx_positions(self, supersede=True):
+        """
+        刷新OKX持仓
+
+        Args:
+            supersede: 是否取代进行中的刷新（手动刷新/下单后需要最新数据；定时刷新传False，加入进行中的任务）
+        """
+        if not self.okx_configured():
             messagebox.showwarning("提示", "请先配置OKX API密钥")
             return
 
+        # 检查状态标签是否存在
+        if hasattr(self, 'okx_positions_status_label'):
+            self.okx_positions_status_label.config(
+                text="正在获取持仓...",
+                fg=COLORS['info']
+            )
+
         # 在新线程中获取持仓
-        def fetch_positions():
+        @profiler.timed('okx', 'refresh_okx_positions')
+        def fetch_positions(token):
             try:
-                # 检查状态标签是否存在
-                if hasattr(self, 'okx_positions_status_label'):
-                    self.okx_positions_status_label.config(
-                        text="正在获取持仓...",
-                        fg=COLORS['info']
-                    )
-
                 # 获取持仓数据
                 result = self.okx_trader.get_positions(inst_type="SWAP")
+                token.check()  # 已被新的刷新取代或超时，丢弃结果
 
                 if result.get('code') == '0':
                     positions = result.get('data', [])
@@ -4595,31 +4979,42 @@ class HyperliquidMonitor:
                         pos_side = pos.get('posSide', 'net')
                         print(f"  [{idx+1}] {inst_id}: pos={pos_qty}, posSide={pos_side}")
 
+                    # 持仓变化（成交）后让跟单余额快照失效，下一次读取时刷新
+                    positions_signature = tuple(sorted(
+                        (p.get('instId', ''), p.get('posSide', ''), p.get('pos', '')) for p in active_positions
+                    ))
+                    if positions_signature != self._okx_positions_signature:
+                        self._okx_positions_signature = positions_signature
+                        if self.auto_copy_trader:
+                            self.auto_copy_trader.balance.invalidate()
+
                     # 在主线程更新UI
-                    self.root.after(0, lambda: self.update_positions_table(positions))
+                    self.ui.post(lambda: self.update_positions_table(positions))
                 else:
                     error_msg = result.get('msg', '获取失败')
                     print(f"[OKX] Failed to fetch positions: {error_msg}")
                     if hasattr(self, 'okx_positions_status_label'):
-                        self.root.after(0, lambda: self.okx_positions_status_label.config(
+                        self.ui.post(lambda: self.okx_positions_status_label.config(
                             text=f"❌ {error_msg}",
                             fg=COLORS['loss']
                         ))
 
+            except JobCancelled:
+                raise
+
             except Exception as e:
                 error_msg = str(e)
                 print(f"[OKX Positions] Exception: {error_msg}")
                 import traceback
                 traceback.print_exc()
                 if hasattr(self, 'okx_positions_status_label'):
-                    self.root.after(0, lambda msg=error_msg: self.okx_positions_status_label.config(
+                    self.ui.post(lambda msg=error_msg: self.okx_positions_status_label.config(
                         text=f"❌ 异常: {msg}",
                         fg=COLORS['loss']
                     ))
 
-        thread = threading.Thread(target=fetch_positions)
-        thread.daemon = True
-        thread.start()
+        self.refresh_jobs.submit('okx_positions', fetch_positions, supersede=supersede,
+                                 timeout=self.OKX_REFRESH_TIMEOUT)
 
     def update_positions_table(self, positions):
         """更新持仓表格"""
@@ -4754,8 +5149,8 @@ class HyperliquidMonitor:
         if not self.okx_positions_auto_refresh.get():
             return
 
-        # 刷新持仓
-        self.refresh_okx_positions()
+        # 刷新持仓（上一次还没完成时加入，不再另起线程）
+        self.refresh_okx_positions(supersede=False)
 
         # 2秒后继续刷新（实时更新）
         if self.okx_positions_auto_refresh.get():
@@ -4851,7 +5246,7 @@ class HyperliquidMonitor:
 
     def close_all_positions(self):
         """全部平仓"""
-        if not self.okx_trader or not self.okx_config.get('api_key'):
+        if not self.okx_configured():
             messagebox.showwarning("提示", "请先配置OKX API密钥")
             return
 
@@ -4957,7 +5352,7 @@ class HyperliquidMonitor:
     def show_set_tpsl_window(self):
         """显示设置止盈止损窗口"""
         try:
-            if not self.okx_trader or not self.okx_config.get('api_key'):
+            if not self.okx_configured():
                 messagebox.showwarning("提示", "请先配置OKX API密钥")
                 return
 
@@ -5314,13 +5709,18 @@ class HyperliquidMonitor:
 
     # ==================== OKX 委托单管理相关方法 ====================
 
-    def refresh_okx_orders(self):
-        """刷新OKX委托单"""
+    def refresh_okx_orders(self, supersede=True):
+        """
+        刷新OKX委托单
+
+        Args:
+            supersede: 是否取代进行中的刷新（手动刷新/撤单后需要最新数据；定时刷新传False，加入进行中的任务）
+        """
         if not self.okx_trader:
             messagebox.showerror("错误", "OKX交易未配置！")
             return
 
-        print("[OKX Orders] Refreshing orders...")
+        okx_log.debug("刷新委托单")
         if hasattr(self, 'okx_orders_status_label'):
             self.okx_orders_status_label.config(
                 text="正在刷新...",
@@ -5328,30 +5728,27 @@ class HyperliquidMonitor:
             )
 
         # 在后台线程中获取数据
-        def fetch_orders():
+        @profiler.timed('okx', 'refresh_okx_orders')
+        def fetch_orders(token):
             try:
                 # 获取普通委托单
                 pending_result = self.okx_trader.get_pending_orders(inst_type="SWAP")
+                token.check()
                 pending_orders = pending_result.get('data', []) if pending_result.get('code') == '0' else []
-                print(f"[OKX Orders] Pending orders result: code={pending_result.get('code')}, count={len(pending_orders)}")
+                okx_log.debug("普通委托: code=%s, count=%d", pending_result.get('code'), len(pending_orders))
 
                 # 获取策略委托单（止盈止损等）
-                print("[OKX Orders] Fetching algo orders...")
                 algo_result = self.okx_trader.get_algo_orders(inst_type="SWAP")
+                token.check()  # 已被新的刷新取代或超时，丢弃结果
                 algo_orders = algo_result.get('data', []) if algo_result.get('code') == '0' else []
-                print(f"[OKX Orders] Algo orders result: code={algo_result.get('code')}, count={len(algo_orders)}")
+                request_count = 1 + algo_result.get('requests', 0)  # 普通委托1次 + 策略委托
+                okx_log.debug("策略委托: code=%s, count=%d, requests=%d",
+                              algo_result.get('code'), len(algo_orders), request_count)
 
-                # 如果API调用失败，打印错误信息
                 if algo_result.get('code') != '0':
-                    print(f"[OKX Orders] Algo orders API failed: {algo_result.get('msg', 'Unknown error')}")
-                elif len(algo_orders) == 0:
-                    print(f"[OKX Orders] No algo orders found")
-
-                # 调试：打印策略委托单的详细信息
-                if algo_orders:
-                    print(f"[OKX Orders] First algo order sample:")
-                    import pprint
-                    pprint.pprint(algo_orders[0])
+                    okx_log.warning("获取策略委托失败: %s", algo_result.get('msg', 'Unknown error'))
+                elif algo_orders:
+                    okx_log.debug("策略委托样例: %s", algo_orders[0])
 
                 # 合并所有委托单
                 all_orders = []
@@ -5371,24 +5768,30 @@ class HyperliquidMonitor:
                     })
 
                 # 在主线程中更新UI
-                self.root.after(0, lambda: self.update_orders_table(all_orders))
+                self.ui.post(lambda: self.update_orders_table(all_orders, request_count))
+
+            except JobCancelled:
+                raise
 
             except Exception as e:
-                print(f"[OKX Orders] Error: {e}")
-                import traceback
-                traceback.print_exc()
+                okx_log.exception("刷新委托单失败: %s", e)
                 if hasattr(self, 'okx_orders_status_label'):
-                    self.root.after(0, lambda: self.okx_orders_status_label.config(
+                    self.ui.post(lambda: self.okx_orders_status_label.config(
                         text=f"刷新失败: {str(e)}",
                         fg=COLORS['loss']
                     ))
 
-        thread = threading.Thread(target=fetch_orders)
-        thread.daemon = True
-        thread.start()
+        self.refresh_jobs.submit('okx_orders', fetch_orders, supersede=supersede,
+                                 timeout=self.OKX_REFRESH_TIMEOUT)
+
+    def update_orders_table(self, orders, request_count=None):
+        """
+        更新委托单表格
 
-    def update_orders_table(self, orders):
-        """更新委托单表格"""
+        Args:
+            orders: 委托单列表
+            request_count: 本次刷新消耗的API请求次数（可选，显示在状态栏）
+        """
         # 保存当前选中的委托单（用于刷新后恢复选中状态）
         selected_order_id = None
         selected_items = self.okx_orders_tree.selection()
@@ -5573,8 +5976,11 @@ class HyperliquidMonitor:
 
         # 更新状态
         if hasattr(self, 'okx_orders_status_label'):
+            status_text = f"✓ 共 {len(orders)} 个委托 | 更新时间: {datetime.now().strftime('%H:%M:%S')}"
+            if request_count is not None:
+                status_text += f" | 请求: {request_count}次"
             self.okx_orders_status_label.config(
-                text=f"✓ 共 {len(orders)} 个委托 | 更新时间: {datetime.now().strftime('%H:%M:%S')}",
+                text=status_text,
                 fg=COLORS['success']
             )
 
@@ -5712,28 +6118,97 @@ class HyperliquidMonitor:
         if not self.okx_orders_auto_refresh.get():
             return
 
-        # 刷新委托单
-        self.refresh_okx_orders()
+        # 刷新委托单（上一次还没完成时加入，不再另起线程）
+        self.refresh_okx_orders(supersede=False)
 
         # 2秒后继续刷新（实时更新）
         if self.okx_orders_auto_refresh.get():
             self.root.after(2000, self.start_okx_orders_auto_refresh)
 
     def toggle_okx_auto_refresh(self):
-        """切换自动刷新"""
+        """切换自动刷新（优先使用WebSocket推送，未安装websocket-client时回退到REST轮询）"""
         if self.okx_auto_refresh.get():
-            self.start_okx_auto_refresh()
+            if OKXTickerStream.is_available():
+                self.start_okx_ticker_stream()
+            else:
+                self.start_okx_auto_refresh()
         else:
             # 停止自动刷新（下次调用时不会继续）
-            pass
+            self.stop_okx_ticker_stream()
 
     def start_okx_auto_refresh(self):
-        """启动自动刷新"""
+        """启动自动刷新（REST轮询）"""
         if self.okx_auto_refresh.get():
             self.refresh_okx_data()
             # 递归调用
             self.root.after(self.okx_refresh_interval, self.start_okx_auto_refresh)
 
+    def start_okx_ticker_stream(self):
+        """启动OKX行情推送，并开始按固定间隔从行情簿渲染"""
+        if self.okx_ticker_stream is None:
+            self.okx_ticker_stream = OKXTickerStream(MAIN_COINS, book=self.okx_ticker_book)
+
+        if not self.okx_ticker_stream.start():
+            # 启动失败，回退到REST轮询
+            self.start_okx_auto_refresh()
+            return
+
+        # 先用一次REST全量数据打底，推送到达前表格不为空
+        self.refresh_okx_data()
+
+        self.okx_status_label.config(text="实时推送已开启")
+        self._render_okx_ticker_book()
+
+    def stop_okx_ticker_stream(self):
+        """停止OKX行情推送"""
+        self._cancel_okx_render()
+        if self.okx_ticker_stream is not None:
+            self.okx_ticker_stream.stop()
+            self.okx_ticker_stream = None
+            self.okx_status_label.config(text="实时推送已关闭")
+
+    def _cancel_okx_render(self):
+        """取消已安排的行情簿渲染"""
+        if self.okx_render_after_id is not None:
+            try:
+                self.root.after_cancel(self.okx_render_after_id)
+            except Exception:
+                pass
+            self.okx_render_after_id = None
+
+    def _render_okx_ticker_book(self):
+        """推送模式下定时把行情簿渲染到表格和热力图（主线程）"""
+        # 重新开启推送时直接调用本方法：先取消旧循环的下一次渲染，避免两个循环并存
+        self._cancel_okx_render()
+        if not self.okx_auto_refresh.get() or self.okx_ticker_stream is None:
+            return
+
+        try:
+            book = self.okx_ticker_book
+            if book.version != self.okx_rendered_version and len(book):
+                self.okx_rendered_version = book.version
+                self.okx_data = self.okx_client.parse_ticker_data(book.snapshot(), filter_usdt=True, top_n=50)
+                self._update_okx_table()
+                self.okx_status_label.config(
+                    text=f"实时推送 - {datetime.fromtimestamp(book.last_update).strftime('%H:%M:%S')}"
+                )
+
+                # 热力图重绘开销大，单独限速
+                if time.time() - self.okx_heatmap_last_draw >= self.okx_heatmap_redraw_interval:
+                    self._draw_okx_heatmap()
+
+            # 推送断线期间，按原轮询间隔用REST兜底
+            if not self.okx_ticker_stream.connected:
+                self.okx_status_label.config(text="推送重连中...")
+                elapsed_ms = (time.time() - self.okx_last_rest_refresh) * 1000
+                if elapsed_ms >= self.okx_refresh_interval:
+                    self.refresh_okx_data()
+
+        except Exception as e:
+            print(f"[OKX WS] 渲染行情失败: {e}")
+
+        self.okx_render_after_id = self.root.after(self.okx_stream_render_interval, self._render_okx_ticker_book)
+
     # ==================== 主界面自动刷新功能 ====================
 
     def toggle_main_auto_refresh(self):
@@ -5752,13 +6227,8 @@ class HyperliquidMonitor:
         print(f"===== 主界面自动刷新 =====")
         print(f"当前时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
-        # 执行刷新（在新线程中）
-        if not self.is_loading:
-            thread = threading.Thread(target=self.fetch_data)
-            thread.daemon = True
-            thread.start()
-        else:
-            print("⚠️ 正在加载数据，跳过本次刷新")
+        # 执行刷新（在新线程中，正在抓取时加入进行中的任务）
+        self.refresh_data()
 
         # 继续下一次刷新（15分钟后）
         if self.main_auto_refresh.get():
@@ -5770,6 +6240,7 @@ class HyperliquidMonitor:
 
     def load_okx_config(self):
         """从文件加载OKX配置"""
+        self.okx_simulator = False
         try:
             with open(self.okx_config_file, 'r', encoding='utf-8') as f:
                 config = json.load(f)
@@ -5788,6 +6259,16 @@ class HyperliquidMonitor:
         except Exception as e:
             print(f"[OKX] Failed to load config: {e}")
 
+        # 离线测试/压测: 使用本地模拟交易所（环境变量 HLM_OKX_SIMULATOR=1 或配置 "simulator": true）
+        if os.environ.get('HLM_OKX_SIMULATOR') == '1' or self.okx_config.get('simulator'):
+            self.okx_trader = SimulatedOKXTrader(SimulatedOKXExchange(latency=(0.05, 0.15)))
+            self.okx_simulator = True
+            print("[OKX] Using local simulated exchange")
+
+    def okx_configured(self):
+        """是否可以调用OKX交易接口（已配置API密钥，或使用本地模拟交易所）"""
+        return self.okx_trader is not None and (self.okx_simulator or bool(self.okx_config.get('api_key')))
+
     def save_okx_config(self):
         """保存OKX配置到文件"""
         try:
@@ -5799,6 +6280,109 @@ class HyperliquidMonitor:
             print(f"[OKX] Failed to save config: {e}")
             return False
 
+    def apply_debug_log_level(self):
+        """按调试模式开关热点路径子系统的DEBUG日志（关闭时恢复默认级别）"""
+        level = logging.DEBUG if self.debug_mode.get() else logging.NOTSET
+        for subsystem in ('scrape', 'copy', 'okx', 'okx_api'):
+            set_log_level(subsystem, level)
+
+    def show_profiler_window(self):
+        """显示各子系统耗时统计窗口（最近N分钟的抓取/OKX/跟单耗时，可开关cProfile）"""
+        window = tk.Toplevel(self.root)
+        window.title("性能统计")
+        window.geometry("900x600")
+        window.configure(bg=COLORS['bg_primary'])
+
+        main_frame = tk.Frame(window, bg=COLORS['bg_primary'])
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+
+        # 工具栏
+        toolbar = tk.Frame(main_frame, bg=COLORS['bg_primary'])
+        toolbar.pack(fill=tk.X, pady=(0, 10))
+
+        tk.Label(
+            toolbar,
+            text="统计窗口(分钟):",
+            font=FONTS['body'],
+            bg=COLORS['bg_primary'],
+            fg=COLORS['text_secondary']
+        ).pack(side=tk.LEFT)
+
+        window_minutes = tk.StringVar(value='10')
+        ttk.Combobox(
+            toolbar,
+            textvariable=window_minutes,
+            values=['1', '5', '10', '30', '60'],
+            width=5,
+            state='readonly'
+        ).pack(side=tk.LEFT, padx=(5, 15))
+
+        report_text = scrolledtext.ScrolledText(
+            main_frame,
+            font=FONTS['number'],
+            bg=COLORS['bg_secondary'],
+            fg=COLORS['text_primary'],
+            insertbackground=COLORS['text_primary'],
+            relief=tk.FLAT,
+            wrap=tk.NONE
+        )
+        report_text.pack(fill=tk.BOTH, expand=True)
+
+        def show_text(text):
+            report_text.config(state=tk.NORMAL)
+            report_text.delete('1.0', tk.END)
+            report_text.insert(tk.END, text)
+            report_text.config(state=tk.DISABLED)
+
+        def refresh():
+            show_text(profiler.report(int(window_minutes.get()) * 60))
+
+        def reset():
+            profiler.reset()
+            refresh()
+
+        def dump_to_log():
+            report = profiler.report(int(window_minutes.get()) * 60)
+            print(f"[Profiler]\n{report}")
+            self.add_message(f"性能统计已输出到日志（最近 {window_minutes.get()} 分钟）", "info")
+
+        def toggle_cprofile():
+            if profiler.cprofile_running:
+                output_file = f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof"
+                stats = profiler.stop_cprofile(output_file)
+                cprofile_btn.config(text="开始 cProfile")
+                show_text(stats)
+                self.add_message(f"cProfile 已停止，统计数据已保存到 {output_file}", "info")
+            else:
+                profiler.start_cprofile()
+                cprofile_btn.config(text="停止 cProfile")
+                refresh()
+
+        button_style = dict(
+            bg=COLORS['bg_tertiary'],
+            fg=COLORS['text_primary'],
+            font=FONTS['body'],
+            activebackground=COLORS['bg_hover'],
+            relief=tk.FLAT,
+            bd=0,
+            padx=12,
+            pady=6,
+            cursor='hand2'
+        )
+        tk.Button(toolbar, text="🔄 刷新", command=refresh, **button_style).pack(side=tk.LEFT, padx=5)
+        tk.Button(toolbar, text="清空", command=reset, **button_style).pack(side=tk.LEFT, padx=5)
+        tk.Button(toolbar, text="输出到日志", command=dump_to_log, **button_style).pack(side=tk.LEFT, padx=5)
+        cprofile_btn = tk.Button(
+            toolbar,
+            text="停止 cProfile" if profiler.cprofile_running else "开始 cProfile",
+            command=toggle_cprofile,
+            **button_style
+        )
+        cprofile_btn.pack(side=tk.LEFT, padx=5)
+
+        window_minutes.trace_add('write', lambda *_: refresh())
+        refresh()
+
     def show_okx_config_window(self):
         """显示OKX API配置窗口"""
         config_window = tk.Toplevel(self.root)
@@ -5997,14 +6581,18 @@ class HyperliquidMonitor:
             self.okx_config['is_demo'] = is_demo_var.get()
 
             if self.save_okx_config():
-                # 重新创建交易客户端
-                self.okx_trader = OKXTrader(
-                    api_key=self.okx_config['api_key'],
-                    secret_key=self.okx_config['secret_key'],
-                    passphrase=self.okx_config['passphrase'],
-                    is_demo=self.okx_config['is_demo']
-                )
-                messagebox.showinfo("成功", "OKX配置已保存！")
+                if self.okx_simulator:
+                    # 模拟交易所模式下不替换交易客户端，密钥在关闭模拟模式后生效
+                    messagebox.showinfo("成功", "OKX配置已保存！\n\n当前使用本地模拟交易所，关闭模拟模式后生效")
+                else:
+                    # 重新创建交易客户端
+                    self.okx_trader = OKXTrader(
+                        api_key=self.okx_config['api_key'],
+                        secret_key=self.okx_config['secret_key'],
+                        passphrase=self.okx_config['passphrase'],
+                        is_demo=self.okx_config['is_demo']
+                    )
+                    messagebox.showinfo("成功", "OKX配置已保存！")
                 config_window.destroy()
             else:
                 messagebox.showerror("错误", "保存配置失败")
@@ -6144,7 +6732,7 @@ class HyperliquidMonitor:
 
     def show_okx_trading_window(self):
         """显示OKX手动交易窗口"""
-        if not self.okx_trader or not self.okx_config.get('api_key'):
+        if not self.okx_configured():
             messagebox.showwarning("提示", "请先配置OKX API密钥")
             self.show_okx_config_window()
             return
@@ -6864,14 +7452,28 @@ class AutoCopyTrader:
 
         # 跟单状态
         self.is_running = False
+        self._awaiting_refresh = None  # 定时刷新的抓取任务令牌，该次抓取显示后检查新大户
         self.followed_traders = {}  # {trader_address: TraderInfo}
 
         # 最小交易数量
         self.MIN_BTC_SIZE = 0.0001
 
+        # 产品元数据不可用时的合约面值（1张 = ? 个币）
+        self.FALLBACK_CONTRACT_SIZES = {
+            'BTC': 0.01,
+            'ETH': 0.1,
+            'SOL': 1.0,
+        }
+
         # 保证金使用限制
         self.MAX_MARGIN_RATIO = 0.5  # 单个订单最多50%
 
+        # 跟单默认杠杆倍数
+        self.DEFAULT_LEVERAGE = 10
+
+        # 余额快照有效期（秒），期间的跟单事件直接使用内存中的余额
+        self.BALANCE_TTL = 5
+
         # 刷新间隔
         self.MONITOR_INTERVAL = 10 * 1000  # 10秒（毫秒）
         self.DATA_CACHE_INTERVAL = 60  # 数据缓存时间：60秒
@@ -6887,6 +7489,29 @@ class AutoCopyTrader:
         # {trader_address: {'data': trader_data, 'timestamp': datetime}}
         self.trader_data_cache = {}
 
+        # 大户轮询调度：按活跃度/持仓规模自适应间隔，全局限制每分钟抓取次数
+        self.MIN_POLL_INTERVAL = 10  # 最短轮询间隔（秒）
+        self.MAX_POLL_INTERVAL = 5 * 60  # 最长轮询间隔（秒）
+        self.MAX_SCRAPES_PER_MINUTE = 30  # 全局抓取预算
+        self.poll_scheduler = TraderPollScheduler(
+            base_interval=self.DATA_CACHE_INTERVAL,
+            min_interval=self.MIN_POLL_INTERVAL,
+            max_interval=self.MAX_POLL_INTERVAL,
+            max_scrapes_per_minute=self.MAX_SCRAPES_PER_MINUTE
+        )
+
+        # 大户页面会话：每个大户一个标签页，原地刷新；多个大户并发加载、逐个收割
+        self.TABS_PER_BROWSER = 8  # 每个浏览器的标签页上限（约束浏览器内存）
+        self.BROWSERS_PER_HOST = 2  # 浏览器数量上限
+        self.TRADER_TAB_IDLE_TIMEOUT = 10 * 60  # 标签页空闲10分钟后关闭
+        self.page_sessions = MultiTabScraper(
+            extractor=app.extract_table_data,
+            refresher=app.smart_refresh_page_data,
+            tabs_per_browser=self.TABS_PER_BROWSER,
+            browsers_per_host=self.BROWSERS_PER_HOST,
+            idle_timeout=self.TRADER_TAB_IDLE_TIMEOUT
+        )
+
         # 状态持久化文件
         self.state_file = 'auto_copy_state.json'
 
@@ -6896,6 +7521,32 @@ class AutoCopyTrader:
         # 跟单成功计数
         self.successful_copies = 0
 
+        # 产品元数据缓存（合约面值/下单精度/价格精度），首次下单时加载
+        self.instruments = InstrumentMetaCache(self.okx_trader)
+
+        # 账户余额快照（短TTL + 本地预占刚下单的保证金）
+        self.balance = BalanceSnapshot(self.okx_trader, ttl=self.BALANCE_TTL)
+
+        # 当前跟单币种：主循环每次在Tk线程读取，流水线工作线程只使用这个快照
+        self.copy_coin = app.selected_coin.get()
+
+        # 状态文件写锁（主线程和下单线程都会保存状态）
+        self._state_lock = threading.Lock()
+
+        # 跟单延迟追踪（大户成交 → OKX确认，分段分位数 + CSV）
+        self.latency = LatencyTracer('copy_latency.csv')
+
+        # 净额订单归因账本（每轮各大户的市价信号按产品合并为一笔净额订单）
+        self.ledger = AttributionLedger()
+
+        # 跟单流水线：抓取 → 比对 → 信号 → 数量 → 下单 → 汇报
+        self._inflight_traders = set()  # 已提交抓取、尚未比对完成的大户
+        self._inflight_lock = threading.Lock()
+        self.pipeline = self.build_pipeline()
+
+        # 批量开始跟随（首次启动/发现新大户）在后台线程执行，同一时间只有一批
+        self._bootstrapping = False
+
         # 启动时加载上次的状态
         self.load_state()
 
@@ -6966,6 +7617,8 @@ class AutoCopyTrader:
                             'active': info.get('active', True)
                         }
 
+                    self.ledger.load(state.get('attribution', {}))
+
                     self.app.add_message(
                         f"✅ 已恢复 {len(self.followed_traders)} 个大户的跟单状态",
                         "success"
@@ -6987,17 +7640,22 @@ class AutoCopyTrader:
 
     def save_state(self):
         """保存当前跟单状态到文件"""
+        with self._state_lock:
+            self._save_state_locked()
+
+    def _save_state_locked(self):
         try:
             # 准备要保存的数据
             state = {
                 'last_session_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'processed_orders': list(self.processed_orders),
                 'successful_copies': self.successful_copies,
-                'followed_traders': {}
+                'followed_traders': {},
+                'attribution': self.ledger.exposures()  # 各大户累计归因的跟单持仓
             }
 
             # 保存跟随大户的信息（转换datetime为字符串）
-            for addr, info in self.followed_traders.items():
+            for addr, info in list(self.followed_traders.items()):
                 state['followed_traders'][addr] = {
                     'start_time_str': info.get('start_time_str', ''),
                     'positions': info.get('positions', []),
@@ -7023,6 +7681,7 @@ class AutoCopyTrader:
             self.processed_orders.clear()
             self.followed_traders.clear()
             self.successful_copies = 0
+            self.ledger.clear()
 
             # 删除文件
             if os.path.exists(self.state_file):
@@ -7044,6 +7703,14 @@ class AutoCopyTrader:
         print("[AutoCopyTrader] 启动自动跟单")
         print(f"[AutoCopyTrader] 将每15分钟自动刷新数据，寻找新的大单")
 
+        # 启动跟单流水线工作线程
+        self.pipeline.start()
+
+        # 订阅主表格变化（定时刷新后据此发现新大户）
+        self._awaiting_refresh = None
+        if self.on_table_delta not in self.app.table_listeners:
+            self.app.table_listeners.append(self.on_table_delta)
+
         # 开始主循环（仅在首次运行时筛选大户）
         self.main_loop()
 
@@ -7051,10 +7718,22 @@ class AutoCopyTrader:
         """停止自动跟单"""
         self.is_running = False
         self.initialized = False  # 重置初始化标志，下次启动时重新筛选
+        self._awaiting_refresh = None
+        if self.on_table_delta in self.app.table_listeners:
+            self.app.table_listeners.remove(self.on_table_delta)
+
+        # 停止流水线（丢弃未处理的任务），下次启动时所有大户重新立即轮询
+        self.pipeline.stop()
+        with self._inflight_lock:
+            self._inflight_traders.clear()
+        self.poll_scheduler.sync([])
 
         # 停止前保存状态
         self.save_state()
 
+        # 关闭大户页面会话（共享浏览器）
+        self.page_sessions.shutdown()
+
         self.app.add_message("⏹️ 自动跟单已停止", "info")
         print("[AutoCopyTrader] 停止自动跟单")
 
@@ -7063,6 +7742,9 @@ class AutoCopyTrader:
         if not self.is_running:
             return
 
+        # 在Tk线程读取当前币种，供流水线工作线程使用
+        self.copy_coin = self.app.selected_coin.get()
+
         try:
             # 首次运行：筛选表格中的大户并开始跟单
             if not self.initialized:
@@ -7074,10 +7756,8 @@ class AutoCopyTrader:
                 else:
                     self.app.add_message(f"找到 {len(traders)} 个符合条件的大户", "info")
 
-                    # 2. 为每个大户创建跟单任务
-                    for trader_address in traders:
-                        if trader_address not in self.followed_traders:
-                            self.start_following_trader(trader_address)
+                    # 2. 后台并行抓取所有大户，统一分配后批量下单
+                    self.start_bootstrap(traders)
 
                 # 标记为已初始化
                 self.initialized = True
@@ -7090,16 +7770,14 @@ class AutoCopyTrader:
                 print(f"[AutoCopyTrader] ⏰ 已过15分钟，自动刷新数据寻找新大单...")
                 self.app.add_message("🔄 15分钟定时刷新：正在寻找新的大单...", "info")
 
-                # 刷新Hyperliquid数据
-                self.app.refresh_data()
+                # 刷新Hyperliquid数据（正在抓取时返回进行中的任务）
+                # 该次抓取的结果显示后由 on_table_delta 检查新大户
+                self._awaiting_refresh = self.app.refresh_data()
 
                 # 更新刷新时间
                 self.last_refresh_time = now
 
-                # 等待3秒让数据加载完成，然后检查新大户
-                self.app.root.after(3000, self.check_new_traders)
-
-            # 监控已跟随的大户（每次循环都执行）
+            # 监控已跟随的大户（每次循环都执行，只提交任务，不阻塞界面）
             self.monitor_all_traders()
 
         except Exception as e:
@@ -7116,7 +7794,7 @@ class AutoCopyTrader:
         """
         从当前表格中获取符合条件的大户
 
-        注意：这个方法直接读取Treeview中已经过筛选的数据
+        注意：这个方法读取Treeview中已经过筛选的数据（update_display 维护的行镜像，不逐行调用Tk）
         用户需要先：
         1. 在界面上选择币种（BTC/ETH/SOL）
         2. 选择时间筛选（7天）
@@ -7131,11 +7809,11 @@ class AutoCopyTrader:
             # 获取当前Treeview中显示的所有行
             traders = []
 
-            # 遍历Treeview中的所有项
-            for item in self.app.tree.get_children():
+            # 按表格显示顺序遍历所有行
+            for key in self.app.tree_order:
                 try:
                     # 获取行的值
-                    values = self.app.tree.item(item)['values']
+                    values = self.app.tree_values[key]
 
                     # Treeview的列（参考update_display中的结构）:
                     # 0: 排名 (#)
@@ -7172,9 +7850,31 @@ class AutoCopyTrader:
             traceback.print_exc()
             return []
 
+    def on_table_delta(self, new_addresses, fetch_token):
+        """
+        主表格更新回调（Tk线程）：定时刷新请求的那次抓取显示后检查新大户
+
+        筛选条件变化等本地重绘（fetch_token 为None）和其他抓取的显示不消耗等待标记；
+        请求的抓取被条件变化后的新抓取取代时，以新抓取的结果为准
+
+        Args:
+            new_addresses: 本次新出现在表格中的大户地址
+            fetch_token: 本次显示对应的抓取任务令牌
+        """
+        awaited = self._awaiting_refresh
+        if not self.is_running or awaited is None or fetch_token is None:
+            return
+        if fetch_token is not awaited and fetch_token.started_at < awaited.started_at:
+            return
+        self._awaiting_refresh = None
+        self.check_new_traders()
+
     def check_new_traders(self):
         """
-        检查是否有新的大户出现，并自动开始跟单
+        检查表格中是否有尚未跟随的大户，并自动开始跟单
+
+        与整张表格比较（而不只是本次新出现的行）：上次初始化失败或因批量初始化繁忙
+        被跳过的大户仍在表格中时，会在下一次定时刷新后重试
         """
         try:
             if not self.is_running:
@@ -7190,9 +7890,8 @@ class AutoCopyTrader:
                 print(f"[AutoCopyTrader] 🆕 发现 {len(new_traders)} 个新大户!")
                 self.app.add_message(f"🆕 发现 {len(new_traders)} 个新大户，开始跟单...", "success")
 
-                # 为每个新大户创建跟单任务
-                for trader_address in new_traders:
-                    self.start_following_trader(trader_address)
+                # 后台批量跟随新大户
+                self.start_bootstrap(new_traders)
             else:
                 print(f"[AutoCopyTrader] ✓ 没有发现新的大户")
                 self.app.add_message("✓ 15分钟刷新完成，暂无新大户", "info")
@@ -7202,60 +7901,21 @@ class AutoCopyTrader:
             import traceback
             traceback.print_exc()
 
-    def is_within_days(self, time_str, days):
+    def is_within_days(self, time_str, days, batch=None):
         """
         判断时间是否在指定天数内
 
         Args:
             time_str: 时间字符串，如 "03:12 10-16"
             days: 天数
+            batch: 共用的 TimeBatch，不传则以当前时间为参考
 
         Returns:
             bool: 是否在指定天数内
         """
-        try:
-            from datetime import datetime, timedelta
-
-            # 解析时间字符串 "03:12 10-16"
-            # 假设格式为 "HH:MM MM-DD"
-            parts = time_str.strip().split()
-            if len(parts) < 2:
-                return False
-
-            time_part = parts[0]  # "03:12"
-            date_part = parts[1]  # "10-16"
-
-            # 当前年份
-            current_year = datetime.now().year
-
-            # 解析月-日
-            month_day = date_part.split('-')
-            if len(month_day) != 2:
-                return False
-
-            month = int(month_day[0])
-            day = int(month_day[1])
-
-            # 解析时-分
-            hour_min = time_part.split(':')
-            if len(hour_min) != 2:
-                return False
-
-            hour = int(hour_min[0])
-            minute = int(hour_min[1])
-
-            # 构建完整时间
-            trade_time = datetime(current_year, month, day, hour, minute)
-
-            # 计算时间差
-            now = datetime.now()
-            delta = now - trade_time
-
-            return delta.days <= days
-
-        except Exception as e:
-            print(f"[AutoCopyTrader] 解析时间失败: {time_str}, 错误: {e}")
-            return False
+        batch = batch or TimeBatch()
+        opened_at = batch.open_time(time_str)
+        return opened_at is not None and batch.days_ago(opened_at) <= days
 
     def parse_amount(self, amount_str):
         """
@@ -7269,340 +7929,345 @@ class AutoCopyTrader:
         """
         return self.app.parse_amount(amount_str)
 
-    def start_following_trader(self, trader_address):
+    def start_bootstrap(self, trader_addresses):
         """
-        开始跟随一个大户
+        在后台线程批量开始跟随大户（不阻塞界面）
 
         Args:
-            trader_address: 大户地址
+            trader_addresses: 大户地址列表（已跟随的会被忽略）
         """
-        try:
-            self.app.add_message(f"📌 开始跟随大户: {trader_address[:8]}...", "info")
-            print(f"[AutoCopyTrader] 开始跟随: {trader_address}")
+        trader_addresses = [addr for addr in trader_addresses if addr not in self.followed_traders]
+        if not trader_addresses:
+            return
+        if self._bootstrapping:
+            print("[AutoCopyTrader] 上一批大户仍在初始化，稍后再试")
+            return
+
+        self._bootstrapping = True
+        thread = threading.Thread(
+            target=self.bootstrap_traders,
+            args=(trader_addresses, self.copy_coin),
+            name='CopyBootstrap',
+            daemon=True
+        )
+        thread.start()
 
-            # 1. 记录开始时间戳（非常重要！）
+    @profiler.timed('copy')
+    def bootstrap_traders(self, trader_addresses, coin):
+        """
+        批量开始跟随大户（后台线程）
+
+        1. 统一的开始时间戳，只读取一次余额快照
+        2. 多标签页并行抓取所有大户页面
+        3. 按同一份余额统一分配跟单数量，同一产品合并为一笔净订单
+        4. 批量下单
+        5. 回到Tk线程登记跟单信息，只保存一次状态
+
+        Args:
+            trader_addresses: 大户地址列表
+            coin: 跟单币种
+        """
+        new_traders = {}
+        try:
+            self.app.add_message(f"📌 批量开始跟随 {len(trader_addresses)} 个大户...", "info")
             start_timestamp = datetime.now()
 
-            # 2. 获取OKX账户可用保证金
+            # 1. 余额快照
             available_margin = self.get_available_margin()
             if not available_margin:
                 self.app.add_message("⚠️ 无法获取OKX账户余额", "error")
                 return
-
             self.app.add_message(f"💰 可用保证金: ${available_margin:.2f}", "info")
 
-            # 3. 获取大户当前持仓
-            trader_data = self.get_trader_data(trader_address)
-            if not trader_data:
-                self.app.add_message("⚠️ 无法获取大户数据", "error")
-                return
+            # 2. 并行抓取
+            fetch_start = time.perf_counter()
+            targets = {}
+            for trader_address in trader_addresses:
+                url = self.get_trader_url(trader_address)
+                if url:
+                    targets[trader_address] = url
+            results = self.page_sessions.fetch_many(targets)
+
+            trader_data_map = {}
+            for trader_address in trader_addresses:
+                trader_data = results.get(trader_address)
+                if not trader_data:
+                    self.app.add_message(f"⚠️ 无法获取大户数据: {trader_address[:8]}...", "error")
+                    continue
+                trader_data_map[trader_address] = trader_data
+                self.trader_data_cache[trader_address] = {'data': trader_data, 'timestamp': datetime.now()}
 
-            # 4. 计算并执行跟单
-            self.copy_trader_positions(trader_address, trader_data, available_margin)
-
-            # 5. 保存跟单信息
-            self.followed_traders[trader_address] = {
-                'start_timestamp': start_timestamp,
-                'start_time_str': start_timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                'positions': trader_data.get('positions', []),
-                'last_trades': trader_data.get('trades', []),
-                'margin_used': 0,  # 已使用的保证金
-                'active': True
-            }
+            copy_log.info("批量抓取 %d/%d 个大户, 耗时 %.1fs",
+                          len(trader_data_map), len(trader_addresses), time.perf_counter() - fetch_start)
 
-            # 6. 保存状态到文件
-            self.save_state()
+            if not self.is_running:
+                return
 
-            self.app.add_message(f"✅ 跟单任务已创建: {trader_address[:8]}...", "success")
+            # 3. 统一分配 + 4. 批量下单
+            plans = self.plan_bootstrap_orders(trader_data_map, available_margin, coin)
+            if plans:
+                self.place_bootstrap_orders(plans)
+            elif trader_data_map:
+                self.app.add_message(f"大户当前无 {coin} 持仓，等待新交易", "info")
+
+            for trader_address, trader_data in trader_data_map.items():
+                new_traders[trader_address] = {
+                    'start_timestamp': start_timestamp,
+                    'start_time_str': start_timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                    'positions': trader_data.get('positions', []),
+                    'last_trades': trader_data.get('trades', []),
+                    'margin_used': 0,  # 已使用的保证金
+                    'active': True
+                }
 
         except Exception as e:
-            self.app.add_message(f"创建跟单任务失败: {str(e)}", "error")
-            print(f"[AutoCopyTrader] 开始跟随失败: {e}")
+            self.app.add_message(f"批量创建跟单任务失败: {str(e)}", "error")
+            print(f"[AutoCopyTrader] 批量开始跟随失败: {e}")
             import traceback
             traceback.print_exc()
 
-    def get_available_margin(self):
+        finally:
+            # 5. 登记与保存放回Tk线程（主循环在Tk线程遍历 followed_traders）
+            self.app.ui.post(self.finish_bootstrap, new_traders)
+
+    def finish_bootstrap(self, new_traders):
         """
-        获取OKX账户可用保证金
+        登记批量跟随的大户并保存一次状态（Tk线程）
 
-        Returns:
-            float: 可用保证金（美元）
+        Args:
+            new_traders: {大户地址: 跟单信息}
         """
-        try:
-            result = self.okx_trader.get_account_balance()
-            if result.get('code') == '0' and result.get('data'):
-                balance_data = result['data'][0]
-                details = balance_data.get('details', [{}])[0]
-                available = details.get('availEq', '0')
-                return float(available)
-            return None
-        except Exception as e:
-            print(f"[AutoCopyTrader] 获取账户余额失败: {e}")
-            return None
+        self._bootstrapping = False
+        if not new_traders:
+            return
+
+        self.followed_traders.update(new_traders)
+        self.save_state()
+        self.app.add_message(f"✅ 跟单任务已创建: {len(new_traders)} 个大户", "success")
 
-    def get_trader_data(self, trader_address):
+    def plan_bootstrap_orders(self, trader_data_map, available_margin, coin):
         """
-        获取大户的详细数据（持仓、委托、交易历史）
-        使用缓存机制，避免频繁启动浏览器
+        按同一份余额快照计算所有大户的初始跟单数量
+
+        每个有该币种持仓的大户平分 可用保证金×MAX_MARGIN_RATIO，
+        大户内部按持仓数量等比例缩放（与 calculate_copy_size 相同），
+        同一产品上各大户的多空数量合并为一笔净订单
 
         Args:
-            trader_address: 大户地址（简写）
+            trader_data_map: {大户地址: 大户数据}
+            available_margin: 可用保证金（美元）
+            coin: 跟单币种
 
         Returns:
-            dict: 包含positions, open_orders, trades的字典
+            list: [{'inst_id', 'side', 'size', 'contracts', 'traders': {大户地址: 带符号数量}}]
         """
-        try:
-            # 1. 检查缓存
-            now = datetime.now()
-            cache = self.trader_data_cache.get(trader_address)
+        holdings = {}  # {大户地址: ([(inst_id, 带符号数量)], 持仓总价值)}
+        for trader_address, trader_data in trader_data_map.items():
+            positions = [pos for pos in trader_data.get('positions', []) if pos.get('代币', '') == coin]
+            sizes = []
+            for pos in positions:
+                size = self.parse_size(pos.get('数量', ''))
+                if size:
+                    signed_size = size if pos.get('方向', '') == '多' else -size
+                    sizes.append((f"{coin}-USDT-SWAP", signed_size))
+            total_value = sum(parse_column([pos.get('价值', '') for pos in positions], default=0))
+            if sizes and total_value > 0:
+                holdings[trader_address] = (sizes, total_value)
+
+        if not holdings:
+            return []
 
-            if cache:
-                cached_time = cache['timestamp']
-                elapsed = (now - cached_time).total_seconds()
+        margin_per_trader = available_margin * self.MAX_MARGIN_RATIO / len(holdings)
+        net_sizes = {}  # {inst_id: 净数量}
+        contributions = {}  # {inst_id: {大户地址: 带符号数量}}
+        for trader_address, (sizes, total_value) in holdings.items():
+            ratio = margin_per_trader / total_value
+            for inst_id, signed_size in sizes:
+                my_size = signed_size * ratio
+                net_sizes[inst_id] = net_sizes.get(inst_id, 0) + my_size
+                traders = contributions.setdefault(inst_id, {})
+                traders[trader_address] = traders.get(trader_address, 0) + my_size
+
+        print(f"[AutoCopyTrader] 统一分配: {len(holdings)} 个大户, 每个大户保证金 ${margin_per_trader:,.2f}")
+
+        plans = []
+        for inst_id, net_size in net_sizes.items():
+            if abs(net_size) < 1e-12:
+                self.app.add_message(f"{inst_id} 大户多空相互抵消，不下单", "info")
+                continue
+            size = abs(net_size)
+            if size < self.MIN_BTC_SIZE:
+                self.app.add_message(f"⚠️ 计算的数量({size:.4f})低于最小值({self.MIN_BTC_SIZE})", "warning")
+                size = self.MIN_BTC_SIZE
+            plans.append({
+                'inst_id': inst_id,
+                'side': 'buy' if net_size > 0 else 'sell',
+                'size': size,
+                'contracts': self.to_contracts(inst_id, size),
+                'traders': contributions[inst_id],
+            })
+        return plans
 
-                # 如果缓存还在有效期内（60秒），直接返回缓存数据
-                if elapsed < self.DATA_CACHE_INTERVAL:
-                    print(f"[AutoCopyTrader] 使用缓存数据: {trader_address[:8]}... (缓存时间: {elapsed:.0f}秒前)")
-                    return cache['data']
-                else:
-                    print(f"[AutoCopyTrader] 缓存已过期: {trader_address[:8]}... ({elapsed:.0f}秒前), 重新获取数据")
-
-            # 2. 缓存不存在或已过期，需要重新获取
-            # 从user_links中获取完整URL
-            user_links = self.app.data.get('user_links', {})
-            url = user_links.get(trader_address)
-
-            if not url:
-                print(f"[AutoCopyTrader] 未找到用户链接: {trader_address}")
-                # 尝试构建URL
-                # 如果是完整地址（40位）
-                if len(trader_address.replace('0x', '')) == 40:
-                    url = f"https://www.coinglass.com/zh/hyperliquid/{trader_address}"
-                else:
-                    return None
+    def place_bootstrap_orders(self, plans):
+        """
+        批量下初始跟单的市价单（不保存状态，由 finish_bootstrap 统一保存）
 
-            print(f"[AutoCopyTrader] 启动浏览器获取用户详情: {trader_address[:8]}...")
-            print(f"[AutoCopyTrader] URL: {url}")
+        Args:
+            plans: plan_bootstrap_orders 的返回值
+        """
+        # 每个产品只设置一次杠杆
+        for inst_id in {plan['inst_id'] for plan in plans}:
+            try:
+                leverage_result = self.okx_trader.set_leverage(
+                    inst_id=inst_id,
+                    lever=str(self.DEFAULT_LEVERAGE),
+                    mgn_mode="cross"
+                )
+                if leverage_result.get('code') != '0':
+                    print(f"[AutoCopyTrader] 设置杠杆失败: {leverage_result.get('msg', '未知错误')}")
+            except Exception as e:
+                print(f"[AutoCopyTrader] 设置杠杆异常: {e}")
 
-            # 3. 使用fetch_user_details_sync方法获取数据
-            user_data = self.fetch_user_details_sync(url, trader_address)
+        for plan in plans:
+            self.app.add_message(
+                f"📤 下单: {plan['side'].upper()} {plan['size']:.6f} {plan['inst_id'].split('-')[0]} "
+                f"({plan['contracts']}张, {len(plan['traders'])} 个大户合并)", "info"
+            )
 
-            # 4. 更新缓存
-            if user_data:
-                self.trader_data_cache[trader_address] = {
-                    'data': user_data,
-                    'timestamp': now
-                }
-                print(f"[AutoCopyTrader] 数据已缓存: {trader_address[:8]}...")
+        result = self.okx_trader.place_batch_orders([
+            {
+                'instId': plan['inst_id'],
+                'tdMode': 'cross',
+                'side': plan['side'],
+                'ordType': 'market',
+                'sz': plan['contracts'],
+            }
+            for plan in plans
+        ])
+
+        for plan, item in zip(plans, result.get('data', [])):
+            if item.get('sCode') == '0':
+                order_id = item.get('ordId', 'N/A')
+                self.processed_orders.add(order_id)
+                self.reserve_order_margin(plan['inst_id'], plan['contracts'])
+                self.successful_copies += 1
+                coin = plan['inst_id'].split('-')[0]
+                for trader_address, size in plan['traders'].items():
+                    self.ledger.add_exposure(trader_address, coin, size)
+                self.app.add_message(f"✅ 下单成功! 订单ID: {order_id}", "success")
+            else:
+                self.app.add_message(f"❌ 下单失败: {plan['inst_id']} {item.get('sMsg') or result.get('msg', '未知错误')}", "error")
+
+        print(f"[AutoCopyTrader] 批量下单完成: code={result.get('code')}, 请求 {result.get('requests', 0)} 次")
+
+    def get_available_margin(self):
+        """
+        获取OKX账户可用保证金（来自余额快照，TTL内不发起请求）
+
+        Returns:
+            float: 可用保证金（美元）
+        """
+        return self.balance.available()
 
-            return user_data
+    def reserve_order_margin(self, inst_id, size_in_contracts, price=None):
+        """
+        下单成功后在余额快照中预占保证金
+
+        Args:
+            inst_id: 产品ID
+            size_in_contracts: 下单张数
+            price: 委托价格（市价单不传，使用行情簿最新价）
+        """
+        try:
+            if price is None:
+                ticker = self.app.okx_ticker_book.get(inst_id)
+                price = ticker.get('last') if ticker else None
+
+            ct_val = self.instruments.contract_value(inst_id)
+            if ct_val is None:
+                ct_val = self.FALLBACK_CONTRACT_SIZES.get(inst_id.split('-')[0], 0.01)
+
+            if not price:
+                # 无法估算占用，下一次读取时直接刷新余额
+                self.balance.invalidate()
+                return
 
+            notional = float(size_in_contracts) * ct_val * float(price)
+            self.balance.reserve(notional / self.DEFAULT_LEVERAGE)
         except Exception as e:
-            print(f"[AutoCopyTrader] 获取用户数据失败: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
+            print(f"[AutoCopyTrader] 预占保证金失败: {e}")
+            self.balance.invalidate()
 
-    def fetch_user_details_sync(self, url, user_address):
+    def get_trader_url(self, trader_address):
         """
-        同步获取用户详情（不使用线程，用于跟单系统）
+        获取大户详情页URL
 
         Args:
-            url: 用户详情页URL
-            user_address: 用户地址
+            trader_address: 大户地址
 
         Returns:
-            dict: 用户详情数据
+            str: URL，无法确定时返回None
         """
-        from selenium import webdriver
-        from selenium.webdriver.chrome.service import Service
-        from selenium.webdriver.chrome.options import Options
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.support.ui import WebDriverWait
-        from webdriver_manager.chrome import ChromeDriverManager
-        import time
-        import re
+        # 从user_links中获取完整URL
+        user_links = self.app.data.get('user_links', {})
+        url = user_links.get(trader_address)
 
-        driver = None
-        try:
-            # 配置浏览器（无头模式 + 静默日志）
-            chrome_options = Options()
-            chrome_options.add_argument('--headless=new')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-            # 抑制Chrome日志输出
-            chrome_options.add_argument('--log-level=3')
-            chrome_options.add_argument('--silent')
-
-            # 将ChromeDriver日志重定向到null（抑制DevTools日志）
-            import os
-            service = Service(
-                ChromeDriverManager().install(),
-                log_path=os.devnull if os.name != 'nt' else 'NUL'
-            )
-            driver = webdriver.Chrome(service=service, options=chrome_options)
+        if not url:
+            copy_log.debug("未找到用户链接: %s", trader_address)
+            # 尝试构建URL
+            # 如果是完整地址（40位）
+            if len(trader_address.replace('0x', '')) == 40:
+                url = f"{COINGLASS_BASE_URL}/zh/hyperliquid/{trader_address}"
 
-            # 隐藏webdriver属性
-            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-                'source': '''
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined
-                    });
-                '''
-            })
-
-            # 访问页面
-            driver.get(url)
-            time.sleep(5)  # 等待页面加载
+        return url
 
-            # 初始化返回数据
-            user_details = {
-                'positions': [],
-                'open_orders': [],
-                'trades': []
-            }
-
-            # 点击标签页并提取数据的辅助函数
-            def click_tab_and_extract(tab_name, data_key):
-                try:
-                    # 查找并点击标签
-                    tab_buttons = driver.find_elements(By.CSS_SELECTOR, "button[role='tab'].MuiTab-root")
-                    for tab_btn in tab_buttons:
-                        btn_text = tab_btn.text.strip()
-                        clean_text = re.sub(r'\([0-9]+\)', '', btn_text).strip().replace(' ', '').replace('&', '')
-                        if tab_name.replace(' ', '').replace('&', '') in clean_text:
-                            driver.execute_script("arguments[0].click();", tab_btn)
-                            time.sleep(1.5)
-                            break
-
-                    # 提取表格数据
-                    all_rows = driver.find_elements(By.CLASS_NAME, "ant-table-row")
-                    visible_rows = [row for row in all_rows if row.get_attribute('aria-hidden') != 'true']
-
-                    for row in visible_rows:
-                        cells = row.find_elements(By.TAG_NAME, 'td')
-                        if len(cells) == 0:
-                            continue
-
-                        if data_key == 'positions':
-                            if len(cells) >= 7:
-                                position = {
-                                    '代币': cells[0].text.strip(),
-                                    '方向': cells[1].text.strip(),
-                                    '杠杆': cells[2].text.strip(),
-                                    '价值': cells[3].text.strip(),
-                                    '数量': cells[4].text.strip(),
-                                    '开仓价格': cells[5].text.strip(),
-                                    '盈亏(PnL)': cells[6].text.strip(),
-                                    '资金费': cells[7].text.strip() if len(cells) > 7 else '',
-                                    '爆仓价格': cells[8].text.strip() if len(cells) > 8 else ''
-                                }
-                                if position['代币'] and position['方向']:
-                                    user_details[data_key].append(position)
-
-                        elif data_key == 'trades':
-                            if len(cells) >= 4:
-                                trade = {}
-                                column_names = ['交易哈希', '方向', '时间', '盈亏', '代币', '价格', '数量']
-                                for i, cell in enumerate(cells):
-                                    col_name = column_names[i] if i < len(column_names) else f'列{i+1}'
-                                    trade[col_name] = cell.text.strip()
-                                if trade.get('交易哈希') or trade.get('时间'):
-                                    user_details[data_key].append(trade)
-
-                        elif data_key == 'open_orders':
-                            if len(cells) >= 4:
-                                order = {}
-                                column_names = ['时间', '代币', '类型', '方向', '数量', '价格', '已成交', '订单ID']
-                                for i, cell in enumerate(cells):
-                                    col_name = column_names[i] if i < len(column_names) else f'列{i+1}'
-                                    order[col_name] = cell.text.strip()
-                                if order.get('代币'):
-                                    user_details[data_key].append(order)
-
-                except Exception as e:
-                    print(f"[AutoCopyTrader] 提取{tab_name}数据失败: {e}")
-
-            # 提取各个标签页的数据
-            click_tab_and_extract('仓位', 'positions')
-            click_tab_and_extract('交易', 'trades')
-            click_tab_and_extract('当前委托', 'open_orders')
-
-            return user_details
+    def get_cached_trader_data(self, trader_address, now=None):
+        """
+        获取未过期的缓存数据
 
-        except Exception as e:
-            print(f"[AutoCopyTrader] fetch_user_details_sync异常: {e}")
-            import traceback
-            traceback.print_exc()
+        Returns:
+            dict: 缓存数据，不存在或已过期返回None
+        """
+        cache = self.trader_data_cache.get(trader_address)
+        if not cache:
             return None
 
-        finally:
-            if driver:
-                driver.quit()
+        elapsed = ((now or datetime.now()) - cache['timestamp']).total_seconds()
+        if elapsed < self.DATA_CACHE_INTERVAL:
+            return cache['data']
+        return None
 
-    def copy_trader_positions(self, trader_address, trader_data, available_margin):
+    def iter_trader_data(self, trader_addresses, force=False):
         """
-        复制大户的持仓
+        批量刷新大户数据（多标签页并发加载），每收割一个标签页立即写入缓存并产出
 
         Args:
-            trader_address: 大户地址
-            trader_data: 大户数据
-            available_margin: 可用保证金
-        """
-        positions = trader_data.get('positions', [])
-        if not positions:
-            self.app.add_message("大户当前无持仓", "info")
-            return
-
-        # 获取当前选中的币种
-        selected_coin = self.app.selected_coin.get()
-
-        for pos in positions:
-            try:
-                token = pos.get('代币', '')
-                if token != selected_coin:
-                    continue
-
-                # 解析持仓信息
-                direction = pos.get('方向', '')  # 多/空
-                size_str = pos.get('数量', '')  # "1610.93 BTC"
-                entry_price_str = pos.get('开仓价格', '')  # "$108043.9"
-                liq_price_str = pos.get('爆仓价格', '')  # "$88,061.07"
-
-                # 解析数量
-                size = self.parse_size(size_str)
-                if not size:
-                    continue
+            trader_addresses: 大户地址列表
+            force: 是否忽略缓存（由轮询调度决定抓取时机时使用）
 
-                # 计算我应该下单的数量
-                my_size = self.calculate_copy_size(
-                    size,
-                    available_margin,
-                    trader_address,
-                    trader_data  # 传入trader_data
-                )
-
-                if my_size < self.MIN_BTC_SIZE:
-                    self.app.add_message(f"⚠️ 计算的数量({my_size:.4f})低于最小值({self.MIN_BTC_SIZE})", "warning")
-                    my_size = self.MIN_BTC_SIZE
+        Yields:
+            tuple: (trader_address, 数据或None, 抓取开始时间, 抓取结束时间)，缓存未过期或没有URL的大户不产出
+        """
+        now = datetime.now()
+        targets = {}
+        for trader_address in trader_addresses:
+            if not force and self.get_cached_trader_data(trader_address, now) is not None:
+                continue
+            url = self.get_trader_url(trader_address)
+            if url:
+                targets[trader_address] = url
 
-                # 执行下单
-                self.place_copy_order(
-                    coin=token,
-                    direction=direction,
-                    size=my_size
-                )
+        if not targets:
+            return
 
-            except Exception as e:
-                self.app.add_message(f"复制持仓失败: {str(e)}", "error")
-                print(f"[AutoCopyTrader] 复制持仓失败: {e}")
-                continue
+        copy_log.debug("并行刷新 %d 个大户数据", len(targets))
+        for trader_address, user_data, started_at, ended_at in self.page_sessions.iter_fetch(targets):
+            if user_data:
+                self.trader_data_cache[trader_address] = {
+                    'data': user_data,
+                    'timestamp': datetime.now()
+                }
+            yield trader_address, user_data, started_at, ended_at
 
     def parse_size(self, size_str):
         """
@@ -7614,14 +8279,7 @@ class AutoCopyTrader:
         Returns:
             float: 数量
         """
-        try:
-            # 提取数字部分
-            parts = size_str.split()
-            if parts:
-                return float(parts[0].replace(',', ''))
-            return None
-        except:
-            return None
+        return parse_number(size_str)
 
     def calculate_copy_size(self, trader_size, available_margin, trader_address, trader_data=None):
         """
@@ -7659,19 +8317,14 @@ class AutoCopyTrader:
                 return max(my_size, self.MIN_BTC_SIZE)
 
             # 计算大户持仓总价值
-            trader_total_value = 0
-            selected_coin = self.app.selected_coin.get()
-
-            for pos in positions:
-                coin = pos.get('代币', '')
-                if selected_coin in coin:
-                    value_str = pos.get('价值', '')
-                    # 解析价值，如 "$17.46万"
-                    value = self.parse_position_value(value_str)
-                    trader_total_value += value
+            selected_coin = self.copy_coin
+            # 解析价值，如 "$17.46万"（整列批量解析）
+            trader_total_value = sum(parse_column(
+                [pos.get('价值', '') for pos in positions if selected_coin in pos.get('代币', '')], default=0
+            ))
 
             if trader_total_value <= 0:
-                print(f"[AutoCopyTrader] 无法获取大户持仓价值")
+                copy_log.warning("无法获取大户持仓价值")
                 return self.MIN_BTC_SIZE
 
             # 计算比例：(我的可用保证金 * 50%) / 大户持仓价值
@@ -7681,25 +8334,19 @@ class AutoCopyTrader:
             # 计算我应该下单的数量
             my_size = trader_size * ratio
 
-            print(f"[AutoCopyTrader] 比例计算:")
-            print(f"  大户持仓价值: ${trader_total_value:,.2f}")
-            print(f"  大户数量: {trader_size}")
-            print(f"  我的可用保证金: ${available_margin:,.2f}")
-            print(f"  最大使用保证金(50%): ${my_max_margin:,.2f}")
-            print(f"  计算比例: {ratio:.6f}")
-            print(f"  计算数量: {my_size:.6f}")
+            copy_log.debug("比例计算: 大户持仓价值 $%.2f, 大户数量 %s, 可用保证金 $%.2f, "
+                           "最大使用保证金 $%.2f, 比例 %.6f, 数量 %.6f",
+                           trader_total_value, trader_size, available_margin, my_max_margin, ratio, my_size)
 
             # 确保不低于最小值
             if my_size < self.MIN_BTC_SIZE:
-                print(f"[AutoCopyTrader] 计算数量({my_size:.6f})低于最小值({self.MIN_BTC_SIZE})，使用最小值")
+                copy_log.debug("计算数量(%.6f)低于最小值(%s)，使用最小值", my_size, self.MIN_BTC_SIZE)
                 return self.MIN_BTC_SIZE
 
             return my_size
 
         except Exception as e:
-            print(f"[AutoCopyTrader] 计算跟单数量失败: {e}")
-            import traceback
-            traceback.print_exc()
+            copy_log.exception("计算跟单数量失败: %s", e)
             return self.MIN_BTC_SIZE
 
     def parse_position_value(self, value_str):
@@ -7712,23 +8359,37 @@ class AutoCopyTrader:
         Returns:
             float: 美元价值
         """
-        try:
-            value_str = value_str.strip().replace('$', '').replace(',', '')
-
-            if '万' in value_str:
-                # 提取数字部分
-                num_str = value_str.replace('万', '')
-                return float(num_str) * 10000
-            elif '亿' in value_str:
-                num_str = value_str.replace('亿', '')
-                return float(num_str) * 100000000
-            else:
-                # 纯数字
-                return float(value_str)
+        return parse_number(value_str, default=0)
 
-        except Exception as e:
-            print(f"[AutoCopyTrader] 解析价值失败: {value_str}, 错误: {e}")
-            return 0
+    def to_contracts(self, inst_id, size):
+        """
+        币数量转换为下单张数
+
+        Args:
+            inst_id: 产品ID，如 BTC-USDT-SWAP
+            size: 币数量
+
+        Returns:
+            str: 张数（已按lotSz取整，且不低于minSz）
+        """
+        contracts = self.instruments.coin_to_contracts(inst_id, size)
+        if contracts is not None:
+            return str(contracts)
+
+        # 元数据不可用时回退到常用币种的面值，默认0.01
+        coin = inst_id.split('-')[0]
+        contract_size = self.FALLBACK_CONTRACT_SIZES.get(coin, 0.01)
+        return str(max(int(size / contract_size), 1))
+
+    def round_price(self, inst_id, price):
+        """
+        价格按产品tickSz取整
+
+        Returns:
+            str: 取整后的价格
+        """
+        rounded = self.instruments.round_price(inst_id, price)
+        return str(rounded) if rounded is not None else str(price)
 
     def place_copy_order(self, coin, direction, size):
         """
@@ -7738,6 +8399,9 @@ class AutoCopyTrader:
             coin: 币种（BTC/ETH/SOL）
             direction: 方向（多/空）
             size: 数量（BTC/ETH/SOL数量，需要转换为张数）
+
+        Returns:
+            str: 成功时返回订单ID，失败返回False
         """
         try:
             # 构建交易对
@@ -7746,29 +8410,15 @@ class AutoCopyTrader:
             # 方向转换
             side = "buy" if direction == "多" else "sell"
 
-            # 转换为张数
-            # BTC-USDT-SWAP: 1张 = 0.01 BTC
-            # ETH-USDT-SWAP: 1张 = 0.1 ETH
-            # SOL-USDT-SWAP: 1张 = 1 SOL
-            contract_size_map = {
-                'BTC': 0.01,   # 1张 = 0.01 BTC
-                'ETH': 0.1,    # 1张 = 0.1 ETH
-                'SOL': 1.0,    # 1张 = 1 SOL
-            }
-
-            contract_size = contract_size_map.get(coin, 0.01)
-            size_in_contracts = int(size / contract_size)  # 转换为张数并取整
-
-            # 确保至少1张
-            if size_in_contracts < 1:
-                size_in_contracts = 1
+            # 转换为张数（按产品元数据的面值和下单精度）
+            size_in_contracts = self.to_contracts(inst_id, size)
 
             self.app.add_message(f"📤 下单: {side.upper()} {size:.6f} {coin} ({size_in_contracts}张)", "info")
             print(f"[AutoCopyTrader] 下单: {inst_id} {side} {size:.6f} {coin} = {size_in_contracts}张")
 
             # 先设置杠杆倍数（默认10倍）
             try:
-                leverage = 10
+                leverage = self.DEFAULT_LEVERAGE
                 leverage_result = self.okx_trader.set_leverage(
                     inst_id=inst_id,
                     lever=str(leverage),
@@ -7786,7 +8436,7 @@ class AutoCopyTrader:
             result = self.okx_trader.place_market_order(
                 inst_id=inst_id,
                 side=side,
-                size=str(size_in_contracts),  # 使用张数
+                size=size_in_contracts,  # 使用张数
                 trade_mode="cross"
             )
 
@@ -7799,6 +8449,9 @@ class AutoCopyTrader:
                 # 记录已处理的订单ID，防止重复下单
                 self.processed_orders.add(order_id)
 
+                # 本地预占保证金，后续事件无需重新查询余额
+                self.reserve_order_margin(inst_id, size_in_contracts)
+
                 # 增加成功计数
                 self.successful_copies += 1
                 print(f"[AutoCopyTrader] 跟单成功计数: {self.successful_copies}")
@@ -7806,7 +8459,7 @@ class AutoCopyTrader:
                 # 保存状态
                 self.save_state()
 
-                return True
+                return order_id
             else:
                 error_code = result.get('code', 'N/A')
                 error_msg = result.get('msg', '未知错误')
@@ -7840,19 +8493,9 @@ class AutoCopyTrader:
             # 方向转换
             side = "buy" if direction == "多" else "sell"
 
-            # 转换为张数
-            contract_size_map = {
-                'BTC': 0.01,   # 1张 = 0.01 BTC
-                'ETH': 0.1,    # 1张 = 0.1 ETH
-                'SOL': 1.0,    # 1张 = 1 SOL
-            }
-
-            contract_size = contract_size_map.get(coin, 0.01)
-            size_in_contracts = int(size / contract_size)  # 转换为张数并取整
-
-            # 确保至少1张
-            if size_in_contracts < 1:
-                size_in_contracts = 1
+            # 转换为张数（按产品元数据的面值和下单精度），价格按tickSz取整
+            size_in_contracts = self.to_contracts(inst_id, size)
+            price = self.round_price(inst_id, price)
 
             order_type_str = "限价单" if is_limit else "市价单"
             self.app.add_message(
@@ -7863,7 +8506,7 @@ class AutoCopyTrader:
 
             # 先设置杠杆倍数（默认10倍）
             try:
-                leverage = 10
+                leverage = self.DEFAULT_LEVERAGE
                 leverage_result = self.okx_trader.set_leverage(
                     inst_id=inst_id,
                     lever=str(leverage),
@@ -7882,7 +8525,7 @@ class AutoCopyTrader:
                 result = self.okx_trader.place_limit_order(
                     inst_id=inst_id,
                     side=side,
-                    size=str(size_in_contracts),  # 使用张数
+                    size=size_in_contracts,  # 使用张数
                     price=str(price),
                     trade_mode="cross"
                 )
@@ -7891,7 +8534,7 @@ class AutoCopyTrader:
                 result = self.okx_trader.place_market_order(
                     inst_id=inst_id,
                     side=side,
-                    size=str(size_in_contracts),
+                    size=size_in_contracts,
                     trade_mode="cross"
                 )
 
@@ -7904,6 +8547,9 @@ class AutoCopyTrader:
                 # 记录已处理的订单ID，防止重复下单
                 self.processed_orders.add(order_id)
 
+                # 本地预占保证金，后续事件无需重新查询余额
+                self.reserve_order_margin(inst_id, size_in_contracts, price if is_limit else None)
+
                 # 增加成功计数
                 self.successful_copies += 1
                 print(f"[AutoCopyTrader] 跟单成功计数: {self.successful_copies}")
@@ -7928,88 +8574,331 @@ class AutoCopyTrader:
             return False
 
     def monitor_all_traders(self):
-        """监控所有已跟随的大户"""
+        """监控所有已跟随的大户：把到期的大户提交到跟单流水线"""
         if not self.is_running:
             return
 
-        for trader_address, info in self.followed_traders.items():
-            if info.get('active'):
-                self.monitor_trader(trader_address, info)
+        # 由轮询调度器挑出本轮到期的大户（活跃/大仓位的大户间隔更短）
+        active_traders = [addr for addr, info in self.followed_traders.items() if info.get('active')]
+        self.poll_scheduler.sync(active_traders)
+
+        # 抓取阶段积压时暂不取新的到期大户（背压）
+        if self.pipeline.is_saturated('fetch'):
+            copy_log.info("抓取队列已满，本轮跳过")
+            return
+
+        with self._inflight_lock:
+            due_traders = self.poll_scheduler.due(exclude=self._inflight_traders)
+            if not due_traders:
+                return
+            self._inflight_traders.update(due_traders)
+
+        batch = {'traders': due_traders, 'coin': self.copy_coin}
+        if not self.pipeline.submit(batch):
+            with self._inflight_lock:
+                self._inflight_traders.difference_update(due_traders)
+            copy_log.info("抓取队列已满，本轮跳过")
 
         # 注意：不再在这里调用after，由main_loop统一控制循环
 
-    def monitor_trader(self, trader_address, trader_info):
+    # ==================== 跟单流水线 ====================
+
+    def build_pipeline(self):
+        """
+        构建跟单流水线
+
+        fetch(批量抓取) → diff(比对新委托/交易) → signal(生成跟单信号)
+        → size(计算数量) → net(按产品合并净额) → execute(下单) → report(汇报)
+
+        fetch 每收割一个标签页就把该大户交给下游，不等同批其他大户抓取完；
+        net 把已到达的各大户信号一起合并净额，execute 之后按信号拆开逐条汇报
+
+        Returns:
+            CopyPipeline: 未启动的流水线
         """
-        监控单个大户的交易活动
+        pipeline = CopyPipeline('CopyPipeline')
+        pipeline.add_stage('fetch', self.stage_fetch, workers=self.BROWSERS_PER_HOST, queue_size=2)
+        pipeline.add_stage('diff', self.stage_diff, queue_size=10)
+        pipeline.add_stage('signal', self.stage_signal, queue_size=10)
+        pipeline.add_stage('size', self.stage_size, queue_size=10)
+        pipeline.add_stage('net', self.stage_net, queue_size=10, batch=True)
+        # 单个下单线程：同一产品的订单按信号顺序发送
+        pipeline.add_stage('execute', self.stage_execute, queue_size=10)
+        pipeline.add_stage('report', self.stage_report, queue_size=200)
+        return pipeline
+
+    def stage_fetch(self, batch):
+        """
+        流水线阶段：抓取到期大户的页面（生成器，每收割一个标签页立即产出该大户）
 
         Args:
-            trader_address: 大户地址
-            trader_info: 大户跟单信息
+            batch: {'traders': [大户地址], 'coin': 币种}
+
+        Yields:
+            dict: 单个大户的任务 {'coin', 'items'}，items 为 [{'trader', 'coin', 'data', 'scrape_started_at',
+            'scrape_ended_at'}]，抓取时间为该大户标签页自己的加载/收割时间，抓取失败时 data 为None
+        """
+        coin = batch['coin']
+        remaining = set(batch['traders'])
+        try:
+            for trader_address, data, started_at, ended_at in self.iter_trader_data(batch['traders'], force=True):
+                remaining.discard(trader_address)
+                yield self.fetch_cycle(trader_address, coin, data, started_at, ended_at)
+        except Exception as e:
+            copy_log.warning("批量抓取失败: %s", e)
+
+        # 抓取失败或没有URL的大户也要传给比对阶段，由其重新安排轮询
+        now = time.time()
+        for trader_address in batch['traders']:
+            if trader_address in remaining:
+                yield self.fetch_cycle(trader_address, coin, None, now, now)
+
+        # 顺便关闭空闲标签页（页面会话只在工作线程中使用，避免阻塞界面）
+        try:
+            self.page_sessions.close_idle_tabs()
+        except Exception as e:
+            copy_log.warning("关闭空闲标签页失败: %s", e)
+
+    def fetch_cycle(self, trader_address, coin, data, scrape_started_at, scrape_ended_at):
+        """单个大户抓取结果组成的流水线任务"""
+        return {
+            'coin': coin,
+            'items': [{
+                'trader': trader_address,
+                'coin': coin,
+                'data': data,
+                'scrape_started_at': scrape_started_at,
+                'scrape_ended_at': scrape_ended_at,
+            }]
+        }
+
+    @profiler.timed('copy')
+    def stage_diff(self, cycle):
+        """流水线阶段：逐个大户比对新委托/新交易（单个大户失败不影响本轮其他大户）"""
+        items = []
+        for item in cycle['items']:
+            try:
+                result = self.diff_item(item)
+            except Exception as e:
+                # diff_item 已释放在途标记；按无新事件重新安排轮询，避免该大户不再被调度
+                copy_log.exception("比对大户 %s... 失败: %s", item['trader'][:8], e)
+                self.poll_scheduler.record_poll(item['trader'], 0)
+                continue
+            if result:
+                items.append(result)
+        cycle['items'] = items
+        return cycle if items else None
+
+    def diff_item(self, item):
+        """
+        比对单个大户的新委托/新交易，并把活跃度反馈给轮询调度器
+
+        Returns:
+            dict: 附带 new_orders/new_trades 的任务，无需继续处理时返回None
         """
+        trader_address = item['trader']
         try:
-            # 获取大户最新数据
-            trader_data = self.get_trader_data(trader_address)
+            trader_info = self.followed_traders.get(trader_address)
+            if not trader_info or not trader_info.get('active'):
+                return None
+
+            trader_data = item['data']
             if not trader_data:
-                print(f"[AutoCopyTrader] ⚠️ 无法获取大户数据: {trader_address[:8]}...")
-                return
+                copy_log.info("⚠️ 无法获取大户数据: %s...", trader_address[:8])
+                self.poll_scheduler.record_poll(trader_address, 0)
+                return None
 
-            # 输出读取到的数据统计
-            positions = trader_data.get('positions', [])
-            trades = trader_data.get('trades', [])
-            open_orders = trader_data.get('open_orders', [])
-            deposits = trader_data.get('deposits', [])
-            withdrawals = trader_data.get('withdrawals', [])
-
-            print(f"[AutoCopyTrader] 📊 监控数据 {trader_address[:8]}...: "
-                  f"{len(positions)}个持仓, {len(trades)}条交易, "
-                  f"{len(open_orders)}个委托, {len(deposits)}条充值, {len(withdrawals)}条提现")
-
-            # 显示持仓详情
-            if positions:
-                print(f"[AutoCopyTrader] 📈 当前持仓:")
-                for idx, pos in enumerate(positions, 1):
-                    print(f"  [{idx}] {pos.get('代币', 'N/A')} {pos.get('方向', 'N/A')} "
-                          f"{pos.get('杠杆', 'N/A')} | 价值: {pos.get('价值', 'N/A')} | "
-                          f"数量: {pos.get('数量', 'N/A')} | 盈亏: {pos.get('盈亏(PnL)', 'N/A')}")
+            new_orders, new_trades = self.diff_trader_data(trader_address, trader_info, trader_data)
 
-            # 获取时间戳
-            start_timestamp = trader_info['start_timestamp']
+            interval = self.poll_scheduler.record_poll(
+                trader_address,
+                len(new_orders) + len(new_trades),
+                self.total_position_value(trader_data)
+            )
+            if interval is not None:
+                copy_log.debug("⏱️ %s... 下次轮询: %.0f秒后", trader_address[:8], interval)
+
+            item['new_orders'] = new_orders
+            item['new_trades'] = new_trades
+            item['detected_at'] = time.time()
+            return item
+
+        finally:
+            with self._inflight_lock:
+                self._inflight_traders.discard(trader_address)
 
-            # 1. 检查委托变化（优先处理，更快跟单）
-            new_orders = self.filter_new_orders(
-                trader_data.get('open_orders', []),
-                trader_info.get('last_orders', []),
-                start_timestamp
+    @profiler.timed('copy')
+    def stage_signal(self, cycle):
+        """
+        流水线阶段：把大户的新委托/新交易/止盈止损转换为跟单信号
+
+        Returns:
+            dict: 附带 signals 的本轮任务，没有信号时返回None
+        """
+        signals = []
+        for item in cycle['items']:
+            trader_address = item['trader']
+            coin = item['coin']
+            trader_signals = (
+                self.build_order_signals(trader_address, item['new_orders'], coin)
+                + self.build_trade_signals(trader_address, item['new_trades'], coin)
+                + self.build_tpsl_signals(trader_address, item['data'], coin)
             )
+            for signal in trader_signals:
+                signal['scrape_started_at'] = item['scrape_started_at']
+                signal['scrape_ended_at'] = item['scrape_ended_at']
+                signal['detected_at'] = item['detected_at']
+            signals.extend(trader_signals)
+
+        cycle['signals'] = signals
+        return cycle if signals else None
+
+    @profiler.timed('copy')
+    def stage_size(self, cycle):
+        """流水线阶段：按可用保证金计算跟单数量（无法计算的信号丢弃）"""
+        cycle['signals'] = [signal for signal in cycle['signals'] if self.size_signal(signal)]
+        return cycle if cycle['signals'] else None
+
+    @profiler.timed('copy')
+    def stage_net(self, cycles):
+        """
+        流水线阶段：已到达的各大户市价信号按产品合并为净额订单
 
-            if new_orders:
-                print(f"[AutoCopyTrader] 🆕 检测到 {len(new_orders)} 个新委托!")
-                self.process_new_orders(trader_address, new_orders)
-                trader_info['last_orders'] = trader_data.get('open_orders', [])
-            else:
-                print(f"[AutoCopyTrader] ✓ 暂无新委托")
+        批量阶段：cycles 是队列中已在等待的全部任务，不等待仍在抓取的大户，
+        同一时段检测到的多空信号在这里相互抵消。
+        多空完全抵消（净额低于最小下单量）的信号不下单，直接记入归因账本
 
-            # 2. 检查交易历史（只处理时间戳之后的）
-            new_trades = self.filter_new_trades(
-                trader_data.get('trades', []),
-                trader_info.get('last_trades', []),
-                start_timestamp
+        Returns:
+            dict: 合并后的任务 {'signals', 'orders', 'others'}
+        """
+        cycle = {'signals': [signal for item in cycles for signal in item['signals']]}
+        orders, crossed, others = net_signals(cycle['signals'], self.MIN_BTC_SIZE)
+
+        for order in crossed:
+            now = time.time()
+            for signal in order.members:
+                signal.update(sent_at=now, acked_at=now, ok=True, netted=True)
+            self.ledger.record(order, None, True, sent=False)
+            self.app.add_message(
+                f"⚖️ {order.coin}: {len(order.members)} 个跟单信号多空抵消，无需下单", "info"
             )
 
-            if new_trades:
-                print(f"[AutoCopyTrader] 🆕 检测到 {len(new_trades)} 笔新交易!")
-                self.process_new_trades(trader_address, new_trades)
-                trader_info['last_trades'] = trader_data.get('trades', [])
-            else:
-                print(f"[AutoCopyTrader] ✓ 暂无新交易（跟单开始时间: {trader_info['start_time_str']}）")
+        cycle['orders'] = orders
+        cycle['others'] = others
+        return cycle
 
-            # 3. 检查止盈止损设置
-            self.check_and_copy_tpsl(trader_address, trader_data)
+    @profiler.timed('copy')
+    def stage_execute(self, cycle):
+        """
+        流水线阶段：下单（先发净额市价单，再发限价单/止盈止损）
 
-        except Exception as e:
-            print(f"[AutoCopyTrader] 监控大户失败: {e}")
-            import traceback
-            traceback.print_exc()
+        Returns:
+            list: 本轮所有信号（逐条进入汇报阶段）
+        """
+        for order in cycle['orders']:
+            self.execute_net_order(order)
+        for signal in cycle['others']:
+            self.execute_signal(signal)
+        return cycle['signals']
+
+    def execute_net_order(self, order):
+        """
+        发送一笔净额市价单，并把结果写回组成它的每个信号
+
+        Args:
+            order: copy_netting.NetOrder
+        """
+        if len(order.members) > 1:
+            self.app.add_message(
+                f"⚖️ 合并 {len(order.members)} 个跟单信号({len(order.traders())} 个大户): "
+                f"总量 {order.gross_size:.6f} → 净额 {order.direction} {order.size:.6f} {order.coin}",
+                "info"
+            )
+
+        sent_at = time.time()
+        order_id = self.place_copy_order(
+            coin=order.coin,
+            direction=order.direction,
+            size=order.size
+        )
+        acked_at = time.time()
+
+        for signal in order.members:
+            signal.update(sent_at=sent_at, acked_at=acked_at, ok=bool(order_id))
+        self.ledger.record(order, order_id or None, bool(order_id))
+
+    @profiler.timed('copy')
+    def stage_report(self, signal):
+        """流水线阶段：记录延迟并汇报结果"""
+        durations = self.latency.record(signal)
+        if copy_log.isEnabledFor(logging.INFO):
+            whale_to_ack = durations.get('whale_to_ack')
+            copy_log.info("📋 跟单%s%s: %s... %s %s (检测→确认 %.0fms%s)",
+                          '成功' if signal['ok'] else '失败', '(净额抵消)' if signal.get('netted') else '',
+                          signal['trader'][:8], signal['kind'], signal['coin'], durations['detect_to_ack'],
+                          f", 大户成交→确认 {whale_to_ack / 1000:.1f}s" if whale_to_ack is not None else '')
+        return None
+
+    def event_timestamp(self, time_str):
+        """大户成交/委托时间字符串转换为epoch秒（用于延迟统计），无法解析返回None"""
+        return self.parse_trade_time(time_str) if time_str else None
+
+    def total_position_value(self, trader_data):
+        """大户持仓总价值（美元）"""
+        return sum(parse_column([pos.get('价值', '0') for pos in trader_data.get('positions', [])], default=0))
+
+    def diff_trader_data(self, trader_address, trader_info, trader_data):
+        """
+        比对大户最新数据，找出跟单开始后的新委托和新交易，并更新上次记录
+
+        Args:
+            trader_address: 大户地址
+            trader_info: 大户跟单信息
+            trader_data: 大户最新数据
+
+        Returns:
+            tuple: (new_orders, new_trades)
+        """
+        positions = trader_data.get('positions', [])
+        trades = trader_data.get('trades', [])
+        open_orders = trader_data.get('open_orders', [])
+
+        # 数据统计和持仓详情每轮都会产生，只在DEBUG级别输出
+        if copy_log.isEnabledFor(logging.DEBUG):
+            copy_log.debug("监控数据 %s...: %d个持仓, %d条交易, %d个委托, %d条充值, %d条提现",
+                           trader_address[:8], len(positions), len(trades), len(open_orders),
+                           len(trader_data.get('deposits', [])), len(trader_data.get('withdrawals', [])))
+            for idx, pos in enumerate(positions, 1):
+                copy_log.debug("  [%d] %s %s %s | 价值: %s | 数量: %s | 盈亏: %s", idx,
+                               pos.get('代币', 'N/A'), pos.get('方向', 'N/A'), pos.get('杠杆', 'N/A'),
+                               pos.get('价值', 'N/A'), pos.get('数量', 'N/A'), pos.get('盈亏(PnL)', 'N/A'))
+
+        # 获取时间戳
+        start_timestamp = trader_info['start_timestamp']
+
+        # 1. 检查委托变化
+        new_orders = self.filter_new_orders(
+            open_orders,
+            trader_info.get('last_orders', []),
+            start_timestamp
+        )
+
+        if new_orders:
+            copy_log.info("%s... 检测到 %d 个新委托", trader_address[:8], len(new_orders))
+            trader_info['last_orders'] = open_orders
+
+        # 2. 检查交易历史（只处理时间戳之后的）
+        new_trades = self.filter_new_trades(
+            trades,
+            trader_info.get('last_trades', []),
+            start_timestamp
+        )
+
+        if new_trades:
+            copy_log.info("%s... 检测到 %d 笔新交易", trader_address[:8], len(new_trades))
+            trader_info['last_trades'] = trades
+
+        return new_orders, new_trades
 
     def filter_new_trades(self, current_trades, last_trades, start_timestamp):
         """
@@ -8024,18 +8913,20 @@ class AutoCopyTrader:
             list: 新交易列表
         """
         new_trades = []
+        time_batch = TimeBatch()
+        start_ts = start_timestamp.timestamp()
 
         for trade in current_trades:
             try:
                 # 解析交易时间
                 time_str = trade.get('时间', '')
-                trade_time = self.parse_trade_time(time_str)
+                trade_time = self.parse_trade_time(time_str, time_batch)
 
                 if not trade_time:
                     continue
 
                 # 只处理时间戳之后的交易
-                if trade_time <= start_timestamp:
+                if trade_time <= start_ts:
                     continue
 
                 # 检查是否是新交易（不在上次的列表中）
@@ -8050,49 +8941,23 @@ class AutoCopyTrader:
                     new_trades.append(trade)
 
             except Exception as e:
-                print(f"[AutoCopyTrader] 过滤交易失败: {e}")
+                copy_log.warning("过滤交易失败: %s", e)
                 continue
 
         return new_trades
 
-    def parse_trade_time(self, time_str):
+    def parse_trade_time(self, time_str, batch=None):
         """
         解析交易时间字符串
 
         Args:
             time_str: 如 "10-18 08:22:53"
+            batch: 本轮共用的 TimeBatch，不传则以当前时间为参考
 
         Returns:
-            datetime: 时间对象
+            int: epoch 秒（跨年时自动取上一年），无法解析返回None
         """
-        try:
-            # 格式: "10-18 08:22:53"
-            current_year = datetime.now().year
-            parts = time_str.strip().split()
-
-            if len(parts) < 2:
-                return None
-
-            date_part = parts[0]  # "10-18"
-            time_part = parts[1]  # "08:22:53"
-
-            month_day = date_part.split('-')
-            hour_min_sec = time_part.split(':')
-
-            if len(month_day) != 2 or len(hour_min_sec) != 3:
-                return None
-
-            month = int(month_day[0])
-            day = int(month_day[1])
-            hour = int(hour_min_sec[0])
-            minute = int(hour_min_sec[1])
-            second = int(hour_min_sec[2])
-
-            return datetime(current_year, month, day, hour, minute, second)
-
-        except Exception as e:
-            print(f"[AutoCopyTrader] 解析交易时间失败: {time_str}, 错误: {e}")
-            return None
+        return (batch or TimeBatch()).trade_time(time_str)
 
     def filter_new_orders(self, current_orders, last_orders, start_timestamp):
         """
@@ -8107,12 +8972,14 @@ class AutoCopyTrader:
             list: 新委托列表
         """
         new_orders = []
+        time_batch = TimeBatch()
+        start_ts = start_timestamp.timestamp()
 
         for order in current_orders:
             try:
                 # 解析委托时间
                 time_str = order.get('时间', '')
-                order_time = self.parse_trade_time(time_str)
+                order_time = self.parse_trade_time(time_str, time_batch)
 
                 if not order_time:
                     # 如果没有时间字段或解析失败，跳过时间检查
@@ -8120,7 +8987,7 @@ class AutoCopyTrader:
                     pass
                 else:
                     # 只处理时间戳之后的委托
-                    if order_time <= start_timestamp:
+                    if order_time <= start_ts:
                         continue
 
                 # 检查是否是新委托（不在上次的列表中）
@@ -8138,27 +9005,30 @@ class AutoCopyTrader:
                     new_orders.append(order)
 
             except Exception as e:
-                print(f"[AutoCopyTrader] 过滤委托失败: {e}")
+                copy_log.warning("过滤委托失败: %s", e)
                 continue
 
         return new_orders
 
-    def process_new_trades(self, trader_address, new_trades):
+    def build_trade_signals(self, trader_address, new_trades, selected_coin):
         """
-        处理新的交易（检测买入/卖出并同步）
+        把新交易转换为市价跟单信号
 
         Args:
             trader_address: 大户地址
             new_trades: 新交易列表
+            selected_coin: 跟单币种
+
+        Returns:
+            list: 信号列表
         """
-        selected_coin = self.app.selected_coin.get()
+        signals = []
 
         for trade in new_trades:
             try:
                 direction = trade.get('方向', '')  # Buy/Sell
                 token = trade.get('代币', '')
                 size_str = trade.get('数量', '')
-                price_str = trade.get('价格', '')
 
                 # 检查是否是当前跟踪的币种
                 if selected_coin not in token:
@@ -8167,61 +9037,34 @@ class AutoCopyTrader:
                 # 解析数量
                 trader_size = self.parse_trade_size(size_str)
                 if not trader_size or trader_size <= 0:
-                    print(f"[AutoCopyTrader] 无法解析交易数量: {size_str}")
-                    continue
-
-                # 获取可用保证金
-                available_margin = self.get_available_margin()
-                if not available_margin:
-                    self.app.add_message("⚠️ 无法获取账户余额", "error")
+                    copy_log.debug("无法解析交易数量: %s", size_str)
                     continue
 
-                # 计算我应该交易的数量
-                my_size = self.calculate_copy_size(
-                    trader_size,
-                    available_margin,
-                    trader_address
-                )
-
-                # 确保不低于最小值
-                if my_size < self.MIN_BTC_SIZE:
-                    self.app.add_message(
-                        f"⚠️ 计算数量({my_size:.6f})低于最小值，使用最小值{self.MIN_BTC_SIZE}",
-                        "warning"
-                    )
-                    my_size = self.MIN_BTC_SIZE
-
-                # 执行交易
+                # 判断方向
                 if direction.lower() in ['buy', '买入', '开多']:
-                    self.app.add_message(
-                        f"🔔 检测到{direction}: {trader_size} {selected_coin}",
-                        "info"
-                    )
-                    # 同步买入
-                    self.place_copy_order(
-                        coin=selected_coin,
-                        direction="多",
-                        size=my_size
-                    )
-
+                    self.app.add_message(f"🔔 检测到{direction}: {trader_size} {selected_coin}", "info")
+                    copy_direction = "多"
                 elif direction.lower() in ['sell', '卖出', '开空', '平多', '平仓']:
-                    self.app.add_message(
-                        f"🔔 检测到{direction}: {trader_size} {selected_coin}",
-                        "warning"
-                    )
-                    # 同步卖出
-                    self.place_copy_order(
-                        coin=selected_coin,
-                        direction="空",
-                        size=my_size
-                    )
+                    self.app.add_message(f"🔔 检测到{direction}: {trader_size} {selected_coin}", "warning")
+                    copy_direction = "空"
+                else:
+                    continue
+
+                signals.append({
+                    'trader': trader_address,
+                    'kind': 'market',
+                    'coin': selected_coin,
+                    'direction': copy_direction,
+                    'trader_size': trader_size,
+                    'event_time': self.event_timestamp(trade.get('时间', '')),
+                })
 
             except Exception as e:
-                print(f"[AutoCopyTrader] 处理交易失败: {e}")
-                import traceback
-                traceback.print_exc()
+                copy_log.exception("处理交易失败: %s", e)
                 continue
 
+        return signals
+
     def parse_trade_size(self, size_str):
         """
         解析交易数量字符串
@@ -8232,28 +9075,21 @@ class AutoCopyTrader:
         Returns:
             float: 数量
         """
-        try:
-            # 移除币种名称，只保留数字
-            size_str = size_str.strip()
-            # 提取第一个数字部分
-            parts = size_str.split()
-            if parts:
-                num_str = parts[0].replace(',', '')
-                return float(num_str)
-            return None
-        except Exception as e:
-            print(f"[AutoCopyTrader] 解析交易数量失败: {size_str}, 错误: {e}")
-            return None
+        return parse_number(size_str)
 
-    def process_new_orders(self, trader_address, new_orders):
+    def build_order_signals(self, trader_address, new_orders, selected_coin):
         """
-        处理新的委托（检测开仓/平仓委托并同步下单）
+        把新委托转换为限价/市价跟单信号（止盈止损委托由 build_tpsl_signals 处理）
 
         Args:
             trader_address: 大户地址
             new_orders: 新委托列表
+            selected_coin: 跟单币种
+
+        Returns:
+            list: 信号列表
         """
-        selected_coin = self.app.selected_coin.get()
+        signals = []
 
         for order in new_orders:
             try:
@@ -8267,96 +9103,75 @@ class AutoCopyTrader:
                 if selected_coin not in token:
                     continue
 
-                # 跳过止盈止损订单（由check_and_copy_tpsl处理）
-                is_tpsl = any(keyword in order_type for keyword in ['止盈', '止损', 'TP', 'SL', 'Take Profit', 'Stop Loss'])
-                if is_tpsl:
+                # 跳过止盈止损/条件触发订单（由build_tpsl_signals处理，不能当作立即成交的市价单）
+                if tpsl_kind(order_type):
                     continue
 
                 # 解析数量
                 trader_size = self.parse_trade_size(size_str)
                 if not trader_size or trader_size <= 0:
-                    print(f"[AutoCopyTrader] 无法解析委托数量: {size_str}")
+                    copy_log.debug("无法解析委托数量: %s", size_str)
                     continue
 
                 # 解析价格
                 price = self.parse_price(price_str)
                 if not price or price <= 0:
-                    print(f"[AutoCopyTrader] 无法解析委托价格: {price_str}")
+                    copy_log.debug("无法解析委托价格: %s", price_str)
                     continue
 
-                # 获取可用保证金
-                available_margin = self.get_available_margin()
-                if not available_margin:
-                    self.app.add_message("⚠️ 无法获取账户余额", "error")
-                    continue
-
-                # 计算我应该交易的数量
-                my_size = self.calculate_copy_size(
-                    trader_size,
-                    available_margin,
-                    trader_address
-                )
-
-                # 确保不低于最小值
-                if my_size < self.MIN_BTC_SIZE:
-                    self.app.add_message(
-                        f"⚠️ 计算数量({my_size:.6f})低于最小值，使用最小值{self.MIN_BTC_SIZE}",
-                        "warning"
-                    )
-                    my_size = self.MIN_BTC_SIZE
-
                 # 判断委托方向
                 is_buy = any(keyword in direction.lower() for keyword in ['buy', '买', '开多', 'long'])
                 is_sell = any(keyword in direction.lower() for keyword in ['sell', '卖', '开空', '平', 'short', 'close'])
 
                 # 确定下单类型（限价单/市价单）
                 is_limit = '限价' in order_type or 'Limit' in order_type
-                is_market = '市价' in order_type or 'Market' in order_type
 
                 if is_buy:
                     self.app.add_message(
                         f"🔔 检测到新委托({order_type}): 买入 {trader_size} {selected_coin} @ {price}",
                         "info"
                     )
-                    # 同步下限价买单
-                    self.place_limit_order(
-                        coin=selected_coin,
-                        direction="多",
-                        size=my_size,
-                        price=price,
-                        is_limit=is_limit
-                    )
-
+                    copy_direction = "多"
                 elif is_sell:
                     self.app.add_message(
                         f"🔔 检测到新委托({order_type}): 卖出 {trader_size} {selected_coin} @ {price}",
                         "warning"
                     )
-                    # 同步下限价卖单
-                    self.place_limit_order(
-                        coin=selected_coin,
-                        direction="空",
-                        size=my_size,
-                        price=price,
-                        is_limit=is_limit
-                    )
+                    copy_direction = "空"
+                else:
+                    continue
+
+                signals.append({
+                    'trader': trader_address,
+                    'kind': 'limit',
+                    'coin': selected_coin,
+                    'direction': copy_direction,
+                    'trader_size': trader_size,
+                    'price': price,
+                    'is_limit': is_limit,
+                    'event_time': self.event_timestamp(order.get('时间', '')),
+                })
 
             except Exception as e:
-                print(f"[AutoCopyTrader] 处理委托失败: {e}")
-                import traceback
-                traceback.print_exc()
+                copy_log.exception("处理委托失败: %s", e)
                 continue
 
-    def check_and_copy_tpsl(self, trader_address, trader_data):
+        return signals
+
+    def build_tpsl_signals(self, trader_address, trader_data, selected_coin):
         """
-        检查并复制止盈止损设置
+        把大户的止盈止损委托转换为条件单信号
 
         Args:
             trader_address: 大户地址
             trader_data: 大户数据
+            selected_coin: 跟单币种
+
+        Returns:
+            list: 信号列表
         """
         open_orders = trader_data.get('open_orders', [])
-        selected_coin = self.app.selected_coin.get()
+        signals = []
 
         for order in open_orders:
             try:
@@ -8370,92 +9185,170 @@ class AutoCopyTrader:
                 if selected_coin not in token:
                     continue
 
-                # 检测止盈止损订单
-                is_tp = '止盈' in order_type or 'TP' in order_type.upper() or 'Take Profit' in order_type
-                is_sl = '止损' in order_type or 'SL' in order_type.upper() or 'Stop Loss' in order_type
-
-                if not (is_tp or is_sl):
+                # 检测止盈止损订单（含 Stop Market / Stop Limit / Trigger 等条件单）
+                tpsl_name = tpsl_kind(order_type)
+                if not tpsl_name:
                     continue
 
                 # 解析触发价格
                 trigger_price = self.parse_price(trigger_price_str)
                 if not trigger_price or trigger_price <= 0:
-                    print(f"[AutoCopyTrader] 无法解析触发价格: {trigger_price_str}")
+                    copy_log.debug("无法解析触发价格: %s", trigger_price_str)
                     continue
 
                 # 解析数量
                 trader_size = self.parse_trade_size(size_str)
                 if not trader_size or trader_size <= 0:
-                    print(f"[AutoCopyTrader] 无法解析订单数量: {size_str}")
+                    copy_log.debug("无法解析订单数量: %s", size_str)
                     continue
 
-                # 获取可用保证金
-                available_margin = self.get_available_margin()
-                if not available_margin:
-                    continue
+                signals.append({
+                    'trader': trader_address,
+                    'kind': 'tpsl',
+                    'coin': selected_coin,
+                    # 方向转换（止盈止损的方向与持仓方向相反）
+                    # 如果大户是多单，止盈/止损应该是卖出（sell）
+                    # 如果大户是空单，止盈/止损应该是买入（buy）
+                    'side': "sell" if direction in ["多", "买入", "Buy"] else "buy",
+                    'trader_size': trader_size,
+                    'price': trigger_price,
+                    'tpsl_name': tpsl_name,
+                })
 
-                # 计算我的数量
-                my_size = self.calculate_copy_size(
-                    trader_size,
-                    available_margin,
-                    trader_address
-                )
+            except Exception as e:
+                copy_log.exception("检查止盈止损失败: %s", e)
+                continue
+
+        return signals
+
+    def size_signal(self, signal):
+        """
+        按可用保证金计算信号的跟单数量（写入 signal['size']）
+
+        Args:
+            signal: 跟单信号
+
+        Returns:
+            dict: 信号，无法获取余额时返回None
+        """
+        is_tpsl = signal['kind'] == 'tpsl'
+
+        # 获取可用保证金
+        available_margin = self.get_available_margin()
+        if not available_margin:
+            if not is_tpsl:
+                self.app.add_message("⚠️ 无法获取账户余额", "error")
+            return None
 
-                if my_size < self.MIN_BTC_SIZE:
-                    my_size = self.MIN_BTC_SIZE
+        # 计算我应该交易的数量
+        my_size = self.calculate_copy_size(
+            signal['trader_size'],
+            available_margin,
+            signal['trader']
+        )
 
-                # 显示消息
-                order_type_name = "止盈" if is_tp else "止损"
+        # 确保不低于最小值
+        if my_size < self.MIN_BTC_SIZE:
+            if not is_tpsl:
                 self.app.add_message(
-                    f"🎯 检测到{order_type_name}设置: 触发价${trigger_price:,.2f}",
-                    "info"
+                    f"⚠️ 计算数量({my_size:.6f})低于最小值，使用最小值{self.MIN_BTC_SIZE}",
+                    "warning"
                 )
+            my_size = self.MIN_BTC_SIZE
 
-                # 构建交易对
-                inst_id = f"{selected_coin}-USDT-SWAP"
+        signal['size'] = my_size
+        signal['sized_at'] = time.time()
+        return signal
 
-                # 方向转换（止盈止损的方向与持仓方向相反）
-                # 如果大户是多单，止盈/止损应该是卖出（sell）
-                # 如果大户是空单，止盈/止损应该是买入（buy）
-                side = "sell" if direction in ["多", "买入", "Buy"] else "buy"
+    def execute_signal(self, signal):
+        """
+        执行跟单信号（写入 signal['ok'] 和 signal['acked_at']）
 
-                # 使用OKX API设置止盈止损
-                # 注意：OKX的止盈止损API比较复杂，这里使用简化版本
-                try:
-                    # 使用条件单（algo order）
-                    result = self.okx_trader.place_algo_order(
-                        inst_id=inst_id,
-                        side=side,
-                        size=str(my_size),
-                        trigger_price=str(trigger_price),
-                        order_type='conditional',  # 条件单
-                        trade_mode='cross'
-                    )
+        Args:
+            signal: 已计算数量的跟单信号
 
-                    if result and result.get('code') == '0':
-                        self.app.add_message(
-                            f"✅ {order_type_name}设置成功! 触发价: ${trigger_price:,.2f}",
-                            "success"
-                        )
-                    else:
-                        error_msg = result.get('msg', '未知错误') if result else '请求失败'
-                        self.app.add_message(
-                            f"❌ {order_type_name}设置失败: {error_msg}",
-                            "error"
-                        )
+        Returns:
+            dict: 信号
+        """
+        kind = signal['kind']
+        signal['sent_at'] = time.time()
+        if kind == 'market':
+            ok = self.place_copy_order(
+                coin=signal['coin'],
+                direction=signal['direction'],
+                size=signal['size']
+            )
+        elif kind == 'limit':
+            ok = self.place_limit_order(
+                coin=signal['coin'],
+                direction=signal['direction'],
+                size=signal['size'],
+                price=signal['price'],
+                is_limit=signal['is_limit']
+            )
+        else:
+            ok = self.place_tpsl_order(signal)
 
-                except Exception as e:
-                    print(f"[AutoCopyTrader] 设置止盈止损异常: {e}")
-                    self.app.add_message(
-                        f"❌ {order_type_name}设置异常: {str(e)}",
-                        "error"
-                    )
+        signal['ok'] = bool(ok)
+        signal['acked_at'] = time.time()
+        return signal
 
-            except Exception as e:
-                print(f"[AutoCopyTrader] 检查止盈止损失败: {e}")
-                import traceback
-                traceback.print_exc()
-                continue
+    def place_tpsl_order(self, signal):
+        """
+        按信号设置止盈止损条件单
+
+        Args:
+            signal: tpsl 信号
+
+        Returns:
+            bool: 是否成功
+        """
+        order_type_name = signal['tpsl_name']
+        trigger_price = signal['price']
+
+        # 显示消息
+        self.app.add_message(
+            f"🎯 检测到{order_type_name}设置: 触发价${trigger_price:,.2f}",
+            "info"
+        )
+
+        # 构建交易对
+        inst_id = f"{signal['coin']}-USDT-SWAP"
+
+        # 使用OKX API设置止盈止损
+        # 注意：OKX的止盈止损API比较复杂，这里使用简化版本
+        try:
+            # 使用条件单（algo order）
+            result = self.okx_trader.place_algo_order(
+                inst_id=inst_id,
+                side=signal['side'],
+                size=self.to_contracts(inst_id, signal['size']),
+                trigger_price=self.round_price(inst_id, trigger_price),
+                order_type='conditional',  # 条件单
+                trade_mode='cross'
+            )
+
+            if result and result.get('code') == '0':
+                self.app.add_message(
+                    f"✅ {order_type_name}设置成功! 触发价: ${trigger_price:,.2f}",
+                    "success"
+                )
+                return True
+
+            error_msg = result.get('msg', '未知错误') if result else '请求失败'
+            self.app.add_message(
+                f"❌ {order_type_name}设置失败: {error_msg}",
+                "error"
+            )
+            return False
+
+        except Exception as e:
+            print(f"[AutoCopyTrader] 设置止盈止损异常: {e}")
+            self.app.add_message(
+                f"❌ {order_type_name}设置异常: {str(e)}",
+                "error"
+            )
+            return False
 
     def parse_price(self, price_str):
         """
@@ -8467,12 +9360,7 @@ class AutoCopyTrader:
         Returns:
             float: 价格
         """
-        try:
-            price_str = price_str.strip().replace('$', '').replace(',', '')
-            return float(price_str)
-        except Exception as e:
-            print(f"[AutoCopyTrader] 解析价格失败: {price_str}, 错误: {e}")
-            return None
+        return parse_number(price_str)
 
 
 def main():
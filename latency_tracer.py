@@ -0,0 +1,160 @@
+"""
+跟单延迟追踪
+记录每个跟单事件从大户成交到OKX确认的各阶段时间戳，
+计算分段延迟的分位数（监控页显示），并追加写入CSV供离线分析
+"""
+
+import csv
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+
+# 各阶段时间戳字段（epoch秒）
+TIMESTAMP_FIELDS = (
+    'event_time',         # 大户成交/委托时间（页面显示的时间）
+    'scrape_started_at',  # 开始抓取大户页面
+    'scrape_ended_at',    # 抓取完成
+    'detected_at',        # 比对出新事件
+    'sized_at',           # 计算完跟单数量
+    'sent_at',            # 开始下单
+    'acked_at',           # OKX返回结果
+)
+
+# 分段延迟: 名称 -> (起点字段, 终点字段)
+SEGMENTS = {
+    'whale_to_detect': ('event_time', 'detected_at'),
+    'scrape': ('scrape_started_at', 'scrape_ended_at'),
+    'detect_to_size': ('detected_at', 'sized_at'),
+    'size_to_send': ('sized_at', 'sent_at'),
+    'send_to_ack': ('sent_at', 'acked_at'),
+    'detect_to_ack': ('detected_at', 'acked_at'),
+    'whale_to_ack': ('event_time', 'acked_at'),
+}
+
+SEGMENT_LABELS = {
+    'whale_to_detect': '大户成交→检测',
+    'scrape': '页面抓取',
+    'detect_to_size': '检测→计算数量',
+    'size_to_send': '计算→下单',
+    'send_to_ack': '下单→确认',
+    'detect_to_ack': '检测→确认',
+    'whale_to_ack': '大户成交→确认',
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩法分位数（sorted_values 需已排序且非空）"""
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class LatencyTracer:
+    """
+    跟单延迟追踪器
+
+    - record(event): 传入带时间戳字段的跟单事件（流水线信号字典），计算分段延迟
+    - percentiles(): 最近 window 个事件各分段的 P50/P90/P99/最大值（毫秒）
+    - 每个事件追加一行到 CSV 文件
+    """
+
+    def __init__(self, csv_file: Optional[str] = 'copy_latency.csv', window: int = 1000):
+        """
+        初始化追踪器
+
+        Args:
+            csv_file: CSV 文件路径，None 表示不写文件
+            window: 参与分位数计算的最近事件数
+        """
+        self.csv_file = csv_file
+        self._segments = {name: deque(maxlen=window) for name in SEGMENTS}
+        self._lock = threading.Lock()
+        self.total_events = 0
+
+    def record(self, event: Dict) -> Dict[str, float]:
+        """
+        记录一个跟单事件
+
+        Args:
+            event: 包含 TIMESTAMP_FIELDS 中部分字段的字典（缺失的字段对应分段不统计），
+                   以及 trader/kind/coin/ok 等描述字段
+
+        Returns:
+            {分段名: 毫秒}
+        """
+        durations = {}
+        for name, (start_field, end_field) in SEGMENTS.items():
+            start, end = event.get(start_field), event.get(end_field)
+            if start is not None and end is not None:
+                durations[name] = (end - start) * 1000
+
+        with self._lock:
+            self.total_events += 1
+            for name, value in durations.items():
+                self._segments[name].append(value)
+            self._write_csv(event, durations)
+
+        return durations
+
+    def percentiles(self) -> Dict[str, Dict[str, float]]:
+        """
+        各分段延迟分位数
+
+        Returns:
+            {分段名: {'count', 'p50', 'p90', 'p99', 'max'}}，没有样本的分段不返回
+        """
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._segments.items() if values}
+
+        return {
+            name: {
+                'count': len(values),
+                'p50': percentile(values, 50),
+                'p90': percentile(values, 90),
+                'p99': percentile(values, 99),
+                'max': values[-1],
+            }
+            for name, values in samples.items()
+        }
+
+    def summary_lines(self) -> List[str]:
+        """格式化的分位数表（用于界面显示）"""
+        stats = self.percentiles()
+        if not stats:
+            return ['暂无跟单事件']
+
+        lines = [f"{'阶段':<10} {'次数':>5} {'P50':>9} {'P90':>9} {'P99':>9}"]
+        for name in SEGMENTS:
+            if name not in stats:
+                continue
+            s = stats[name]
+            lines.append(f"{SEGMENT_LABELS[name]:<10} {s['count']:>5} "
+                         f"{self._fmt_ms(s['p50']):>9} {self._fmt_ms(s['p90']):>9} {self._fmt_ms(s['p99']):>9}")
+        return lines
+
+    @staticmethod
+    def _fmt_ms(value: float) -> str:
+        return f"{value / 1000:.1f}s" if abs(value) >= 10000 else f"{value:.0f}ms"
+
+    def _write_csv(self, event: Dict, durations: Dict[str, float]):
+        """追加一行到CSV（调用方需持有锁）"""
+        if not self.csv_file:
+            return
+        try:
+            is_new = not os.path.exists(self.csv_file)
+            with open(self.csv_file, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if is_new:
+                    writer.writerow(['logged_at', 'trader', 'kind', 'coin', 'ok']
+                                    + list(TIMESTAMP_FIELDS) + [f"{name}_ms" for name in SEGMENTS])
+                writer.writerow(
+                    [f"{time.time():.3f}", event.get('trader', ''), event.get('kind', ''),
+                     event.get('coin', ''), int(bool(event.get('ok')))]
+                    + [f"{event[field]:.3f}" if event.get(field) is not None else '' for field in TIMESTAMP_FIELDS]
+                    + [f"{durations[name]:.1f}" if name in durations else '' for name in SEGMENTS]
+                )
+        except Exception as e:
+            print(f"[Latency] 写入CSV失败: {e}")
@@ -0,0 +1,107 @@
+"""
+OKX 账户余额快照
+短TTL缓存可用保证金，并在本地扣减刚下单占用的保证金，
+避免每个跟单事件都发起一次签名的余额请求
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class BalanceSnapshot:
+    """
+    可用保证金快照
+
+    - available(): 快照未过期时直接返回内存值（扣除本地预占），过期或被标记失效时才请求API
+    - reserve(): 下单成功后预占保证金，下一次快照刷新后自动释放
+    - invalidate(): 成交/持仓变化时调用，下一次读取强制刷新
+    """
+
+    DEFAULT_TTL = 5.0  # 秒
+
+    def __init__(self, trader, ttl: float = DEFAULT_TTL):
+        """
+        初始化余额快照
+
+        Args:
+            trader: OKXTrader 实例
+            ttl: 快照有效期（秒）
+        """
+        self.trader = trader
+        self.ttl = ttl
+
+        self._avail_eq = None  # 最近一次API返回的可用保证金
+        self._fetched_at = 0.0  # 最近一次请求发起时间
+        self._dirty = True
+        self._reservations = []  # [(预占时间, 金额)]
+        self._lock = threading.Lock()
+
+        self.api_calls = 0  # 累计余额请求次数
+
+    def available(self) -> Optional[float]:
+        """
+        获取可用保证金（美元）
+
+        Returns:
+            扣除本地预占后的可用保证金，从未成功获取过时返回None
+        """
+        with self._lock:
+            if self._dirty or time.time() - self._fetched_at >= self.ttl:
+                self._refresh_locked()
+
+            if self._avail_eq is None:
+                return None
+
+            reserved = sum(amount for _, amount in self._reservations)
+            return max(self._avail_eq - reserved, 0.0)
+
+    def refresh(self) -> bool:
+        """强制刷新快照"""
+        with self._lock:
+            return self._refresh_locked()
+
+    def reserve(self, amount: float):
+        """
+        预占保证金（下单成功后调用）
+
+        Args:
+            amount: 本次订单占用的保证金（美元）
+        """
+        if amount <= 0:
+            return
+        with self._lock:
+            self._reservations.append((time.time(), amount))
+
+    def invalidate(self):
+        """标记快照失效（成交或持仓变化时调用）"""
+        with self._lock:
+            self._dirty = True
+
+    def _refresh_locked(self) -> bool:
+        """请求API刷新（调用方需持有锁）"""
+        started_at = time.time()
+        self.api_calls += 1
+
+        try:
+            result = self.trader.get_account_balance()
+            if result.get('code') == '0' and result.get('data'):
+                balance_data = result['data'][0]
+                details = balance_data.get('details', [{}])[0]
+                self._avail_eq = float(details.get('availEq', '0'))
+                self._fetched_at = started_at
+                self._dirty = False
+
+                # 请求发起前的预占已经反映在交易所余额中，释放掉
+                self._reservations = [r for r in self._reservations if r[0] >= started_at]
+                return True
+
+            print(f"[Balance] 获取账户余额失败: {result.get('msg', '未知错误')}")
+        except Exception as e:
+            print(f"[Balance] 获取账户余额异常: {e}")
+
+        # 失败时保留旧值，但推迟下一次重试，避免每个事件都重试
+        self._fetched_at = started_at
+        if self._avail_eq is not None:
+            self._dirty = False
+        return False
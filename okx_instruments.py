@@ -0,0 +1,230 @@
+"""
+OKX 产品元数据缓存
+从 /api/v5/public/instruments 一次性加载合约面值、下单精度、价格精度，
+持久化到本地文件并按 TTL 刷新，下单时无需额外请求
+"""
+
+import json
+import os
+import threading
+import time
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+from typing import Dict, Optional
+
+
+class InstrumentMetaCache:
+    """
+    产品元数据缓存
+
+    每个产品保存:
+        ct_val:  合约面值（1张 = ct_val 个币）
+        lot_sz:  下单数量精度（张）
+        min_sz:  最小下单数量（张）
+        tick_sz: 价格精度
+    """
+
+    DEFAULT_TTL = 24 * 60 * 60  # 24小时刷新一次
+    RETRY_INTERVAL = 60  # 加载失败后的重试间隔（秒）
+
+    def __init__(self, trader, cache_file: str = 'okx_instruments_cache.json',
+                 ttl: int = DEFAULT_TTL, inst_type: str = "SWAP"):
+        """
+        初始化元数据缓存
+
+        Args:
+            trader: OKXTrader 实例（用于调用 get_instruments）
+            cache_file: 本地缓存文件路径
+            ttl: 缓存有效期（秒）
+            inst_type: 产品类型
+        """
+        self.trader = trader
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.inst_type = inst_type
+
+        self._meta = {}  # {instId: 元数据字典}
+        self._loaded_at = 0.0  # 数据获取时间（time.time()）
+        self._last_attempt = 0.0
+        self._lock = threading.Lock()
+
+    # ==================== 加载与持久化 ====================
+
+    def ensure_loaded(self) -> bool:
+        """
+        确保缓存可用：内存为空或过期时依次尝试本地文件、API
+
+        Returns:
+            是否有可用数据（过期数据也算可用）
+        """
+        if self._meta and not self._is_expired():
+            return True
+
+        # 加载失败后限制重试频率，避免每笔下单都打一次API
+        if self._meta and time.time() - self._last_attempt < self.RETRY_INTERVAL:
+            return True
+
+        with self._lock:
+            if self._meta and not self._is_expired():
+                return True
+
+            self._last_attempt = time.time()
+
+            if not self._meta:
+                self._load_file()
+                if self._meta and not self._is_expired():
+                    return True
+
+            if self._fetch():
+                self._save_file()
+
+            return bool(self._meta)
+
+    def refresh(self) -> bool:
+        """强制从API刷新"""
+        with self._lock:
+            self._last_attempt = time.time()
+            if self._fetch():
+                self._save_file()
+                return True
+            return False
+
+    def _is_expired(self) -> bool:
+        return time.time() - self._loaded_at >= self.ttl
+
+    def _fetch(self) -> bool:
+        """从API获取产品列表"""
+        try:
+            result = self.trader.get_instruments(inst_type=self.inst_type)
+            if result.get('code') != '0':
+                print(f"[Instruments] 获取产品列表失败: {result.get('msg', '未知错误')}")
+                return False
+
+            meta = {}
+            for inst in result.get('data', []):
+                parsed = self._parse_instrument(inst)
+                if parsed:
+                    meta[inst['instId']] = parsed
+
+            if not meta:
+                return False
+
+            self._meta = meta
+            self._loaded_at = time.time()
+            print(f"[Instruments] 已加载 {len(meta)} 个{self.inst_type}产品元数据")
+            return True
+
+        except Exception as e:
+            print(f"[Instruments] 获取产品列表异常: {e}")
+            return False
+
+    @staticmethod
+    def _parse_instrument(inst: Dict) -> Optional[Dict]:
+        """解析单个产品（保留原始字符串，用于精确的Decimal取整）"""
+        try:
+            if not inst.get('instId'):
+                return None
+            return {
+                'ct_val': inst.get('ctVal') or '1',
+                'lot_sz': inst.get('lotSz') or '1',
+                'min_sz': inst.get('minSz') or inst.get('lotSz') or '1',
+                'tick_sz': inst.get('tickSz') or '0.01',
+                'state': inst.get('state', ''),
+            }
+        except Exception:
+            return None
+
+    def _load_file(self):
+        """从本地文件加载（即使已过期也加载，作为API失败时的兜底）"""
+        try:
+            if not os.path.exists(self.cache_file):
+                return
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('inst_type') != self.inst_type:
+                return
+            self._meta = cache.get('instruments', {})
+            self._loaded_at = cache.get('loaded_at', 0)
+            print(f"[Instruments] 从本地缓存加载 {len(self._meta)} 个产品元数据")
+        except Exception as e:
+            print(f"[Instruments] 读取本地缓存失败: {e}")
+
+    def _save_file(self):
+        """保存到本地文件"""
+        try:
+            cache = {
+                'inst_type': self.inst_type,
+                'loaded_at': self._loaded_at,
+                'instruments': self._meta,
+            }
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"[Instruments] 保存本地缓存失败: {e}")
+
+    # ==================== 查询 ====================
+
+    def get(self, inst_id: str) -> Optional[Dict]:
+        """
+        获取产品元数据
+
+        Args:
+            inst_id: 产品ID，如 BTC-USDT-SWAP
+
+        Returns:
+            元数据字典，找不到时返回None
+        """
+        self.ensure_loaded()
+        return self._meta.get(inst_id)
+
+    def contract_value(self, inst_id: str) -> Optional[float]:
+        """合约面值（1张 = ? 个币）"""
+        meta = self.get(inst_id)
+        return float(meta['ct_val']) if meta else None
+
+    def coin_to_contracts(self, inst_id: str, coin_qty: float) -> Optional[Decimal]:
+        """
+        币数量转换为张数：按 lotSz 向下取整，且不低于 minSz
+
+        Args:
+            inst_id: 产品ID
+            coin_qty: 币数量
+
+        Returns:
+            张数（Decimal），找不到元数据时返回None
+        """
+        meta = self.get(inst_id)
+        if not meta:
+            return None
+
+        ct_val = Decimal(meta['ct_val'])
+        lot_sz = Decimal(meta['lot_sz'])
+        min_sz = Decimal(meta['min_sz'])
+
+        contracts = Decimal(str(coin_qty)) / ct_val
+        contracts = (contracts / lot_sz).to_integral_value(rounding=ROUND_DOWN) * lot_sz
+
+        if contracts < min_sz:
+            contracts = min_sz
+        return contracts.quantize(lot_sz)
+
+    def round_price(self, inst_id: str, price: float) -> Optional[Decimal]:
+        """
+        价格按 tickSz 四舍五入
+
+        Args:
+            inst_id: 产品ID
+            price: 原始价格
+
+        Returns:
+            取整后的价格（Decimal），找不到元数据时返回None
+        """
+        meta = self.get(inst_id)
+        if not meta:
+            return None
+
+        tick_sz = Decimal(meta['tick_sz'])
+        steps = (Decimal(str(price)) / tick_sz).to_integral_value(rounding=ROUND_HALF_UP)
+        return (steps * tick_sz).quantize(tick_sz)
+
+    def __len__(self):
+        return len(self._meta)
@@ -0,0 +1,450 @@
+"""
+OKX 行情推送模块
+通过公共 WebSocket 订阅 tickers 频道，维护增量更新的内存行情簿，
+并提供按产品索引的增量行情解析
+"""
+
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    import websocket  # websocket-client
+except ImportError:  # 未安装时回退到REST轮询
+    websocket = None
+
+
+# OKX 公共频道地址（行情推送不需要登录）
+OKX_PUBLIC_WS_URL = "wss://ws.okx.com:8443/ws/v5/public"
+
+
+class TickerBook:
+    """
+    线程安全的行情簿
+
+    WebSocket 线程写入，Tk 主线程读取；每次写入递增 version，
+    UI 只需比较 version 即可判断是否需要重绘。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tickers = {}  # {instId: 原始ticker字典}
+        self.version = 0
+        self.last_update = 0.0  # 最后一次写入的时间（time.time()）
+
+    def update(self, tickers: Iterable[Dict]) -> int:
+        """
+        增量写入行情
+
+        Args:
+            tickers: OKX ticker 字典列表（REST 或 WebSocket 推送格式相同）
+
+        Returns:
+            本次写入的条数
+        """
+        count = 0
+        with self._lock:
+            for ticker in tickers:
+                inst_id = ticker.get('instId')
+                if not inst_id:
+                    continue
+                self._tickers[inst_id] = ticker
+                count += 1
+            if count:
+                self.version += 1
+                self.last_update = time.time()
+        return count
+
+    def snapshot(self) -> List[Dict]:
+        """返回当前所有行情的浅拷贝列表"""
+        with self._lock:
+            return list(self._tickers.values())
+
+    def get(self, inst_id: str) -> Optional[Dict]:
+        """获取单个产品的最新行情"""
+        with self._lock:
+            return self._tickers.get(inst_id)
+
+    def clear(self):
+        """清空行情簿"""
+        with self._lock:
+            self._tickers.clear()
+            self.version += 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._tickers)
+
+
+class InstrumentIndex:
+    """
+    产品索引（预计算，避免每次刷新对列表做线性查找）
+
+    - members: frozenset，O(1) 成员判断
+    - rank: {instId: 排名}，排名从1开始，按传入顺序
+    - symbols: {instId: 币种名}，如 BTC-USDT-SWAP -> BTC
+    """
+
+    def __init__(self, inst_ids: Iterable[str]):
+        self.inst_ids = tuple(inst_ids)
+        self.members = frozenset(self.inst_ids)
+        self.rank = {inst_id: idx for idx, inst_id in enumerate(self.inst_ids, 1)}
+        self.symbols = {
+            inst_id: inst_id.split('-')[0] if '-' in inst_id else inst_id
+            for inst_id in self.inst_ids
+        }
+
+    def __contains__(self, inst_id) -> bool:
+        return inst_id in self.members
+
+    def __len__(self):
+        return len(self.inst_ids)
+
+    def top(self, n: int) -> tuple:
+        """按排名返回前n个产品ID"""
+        return self.inst_ids[:n]
+
+
+class TickerParser:
+    """
+    增量行情解析器
+
+    为每个产品保存一份解析后的记录，只有 ts/last 变化的产品才会重新 float() 解析；
+    未变化的记录原样复用，返回结果按索引排名排序。
+    """
+
+    def __init__(self, index: InstrumentIndex):
+        self.index = index
+        self._records = {}  # {instId: 解析后的记录}
+        self._versions = {}  # {instId: (ts, last)} 用于判断是否变化
+        self._lock = threading.Lock()
+        self.last_reparsed = 0  # 最近一次 parse 实际重新解析的条数
+
+    @staticmethod
+    def parse_one(ticker: Dict, symbol: str, rank: int) -> Dict:
+        """
+        解析单条ticker
+
+        Args:
+            ticker: OKX 原始ticker
+            symbol: 币种名称
+            rank: 市值排名
+
+        Returns:
+            格式化后的记录
+        """
+        last_price = float(ticker.get('last', 0))
+        sod_utc8 = float(ticker.get('sodUtc8', 0))  # UTC+8 0点开盘价
+
+        # 计算24H涨跌幅: (当前价 - 开盘价) / 开盘价 * 100
+        if sod_utc8 > 0:
+            change_24h = (last_price - sod_utc8) / sod_utc8 * 100
+        else:
+            change_24h = 0
+
+        return {
+            'symbol': symbol,
+            'inst_id': ticker.get('instId'),
+            'price': last_price,
+            'change': change_24h,
+            'high': float(ticker.get('high24h', 0)),
+            'low': float(ticker.get('low24h', 0)),
+            'volume': float(ticker.get('vol24h', 0)),  # 币的数量
+            'volume_usd': float(ticker.get('volCcy24h', 0)),  # USDT金额
+            'timestamp': ticker.get('ts', ''),
+            'market_cap_rank': rank  # 市值排名
+        }
+
+    def parse(self, tickers: Iterable[Dict], top_n: int = 50) -> List[Dict]:
+        """
+        增量解析行情
+
+        Args:
+            tickers: 原始行情列表（REST全量或行情簿快照）
+            top_n: 返回排名前N的产品
+
+        Returns:
+            按排名排序的记录列表
+        """
+        members = self.index.members
+        rank = self.index.rank
+        symbols = self.index.symbols
+        reparsed = 0
+
+        with self._lock:
+            records = self._records
+            versions = self._versions
+
+            for ticker in tickers:
+                inst_id = ticker.get('instId')
+                if inst_id not in members:
+                    continue
+
+                version = (ticker.get('ts'), ticker.get('last'))
+                if version[0] is not None and versions.get(inst_id) == version:
+                    continue  # 未变化，复用上次的记录
+
+                try:
+                    records[inst_id] = self.parse_one(ticker, symbols[inst_id], rank[inst_id])
+                    versions[inst_id] = version
+                    reparsed += 1
+                except (TypeError, ValueError):
+                    continue
+
+            self.last_reparsed = reparsed
+            return [records[inst_id] for inst_id in self.index.top(top_n) if inst_id in records]
+
+    def reset(self):
+        """清空缓存的解析记录"""
+        with self._lock:
+            self._records.clear()
+            self._versions.clear()
+
+
+class OKXTickerStream:
+    """
+    OKX tickers 频道订阅（后台线程）
+
+    只订阅指定的产品列表，断线后指数退避重连。
+    OKX 要求30秒内有数据往来，否则断开连接，因此空闲时发送文本 'ping'。
+    """
+
+    PING_INTERVAL = 25  # 秒，recv 超时后发送 ping
+    MAX_BACKOFF = 30  # 秒，最大重连间隔
+
+    def __init__(
+        self,
+        inst_ids: List[str],
+        book: Optional[TickerBook] = None,
+        url: str = OKX_PUBLIC_WS_URL,
+        on_update: Optional[Callable[[int], None]] = None
+    ):
+        """
+        初始化行情订阅
+
+        Args:
+            inst_ids: 需要订阅的产品ID列表，如 ['BTC-USDT-SWAP', ...]
+            book: 行情簿（不传则新建）
+            url: WebSocket 地址
+            on_update: 每次写入行情簿后的回调（在WebSocket线程中调用），参数为写入条数
+        """
+        self.inst_ids = list(inst_ids)
+        self.book = book if book is not None else TickerBook()
+        self.url = url
+        self.on_update = on_update
+
+        self.connected = False
+        self.messages_received = 0
+        self.bytes_received = 0
+
+        self._ws = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def is_available() -> bool:
+        """是否安装了 websocket-client"""
+        return websocket is not None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """
+        启动后台订阅线程
+
+        Returns:
+            是否成功启动（未安装 websocket-client 时返回False）
+        """
+        if not self.is_available():
+            print("[OKX WS] 未安装 websocket-client，无法使用行情推送")
+            return False
+
+        if self.is_running:
+            return True
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="okx-ticker-stream")
+        self._thread.daemon = True
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """停止订阅并关闭连接"""
+        self._stop_event.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        self.connected = False
+
+    def _subscribe_message(self) -> str:
+        """构建订阅消息"""
+        args = [{'channel': 'tickers', 'instId': inst_id} for inst_id in self.inst_ids]
+        return json.dumps({'op': 'subscribe', 'args': args})
+
+    def _run(self):
+        """订阅主循环（含断线重连）"""
+        backoff = 1
+
+        while not self._stop_event.is_set():
+            ws = None
+            try:
+                ws = websocket.create_connection(self.url, timeout=10)
+                self._ws = ws
+                ws.send(self._subscribe_message())
+                ws.settimeout(self.PING_INTERVAL)
+                self.connected = True
+                backoff = 1
+                print(f"[OKX WS] 已连接，订阅 {len(self.inst_ids)} 个产品")
+
+                while not self._stop_event.is_set():
+                    try:
+                        message = ws.recv()
+                    except websocket.WebSocketTimeoutException:
+                        # 长时间无推送，发送心跳保持连接
+                        ws.send('ping')
+                        continue
+
+                    if not message or message == 'pong':
+                        continue
+
+                    self._handle_message(message)
+
+            except Exception as e:
+                if not self._stop_event.is_set():
+                    print(f"[OKX WS] 连接异常: {e}")
+            finally:
+                self.connected = False
+                self._ws = None
+                if ws is not None:
+                    try:
+                        ws.close()
+                    except Exception:
+                        pass
+
+            if self._stop_event.is_set():
+                break
+
+            print(f"[OKX WS] {backoff}秒后重连...")
+            self._stop_event.wait(backoff)
+            backoff = min(backoff * 2, self.MAX_BACKOFF)
+
+        print("[OKX WS] 订阅已停止")
+
+    def _handle_message(self, message: str):
+        """处理一条推送消息"""
+        self.messages_received += 1
+        self.bytes_received += len(message)
+
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            return
+
+        event = payload.get('event')
+        if event:
+            if event == 'error':
+                print(f"[OKX WS] 订阅错误: {payload.get('code')} {payload.get('msg')}")
+            return
+
+        arg = payload.get('arg', {})
+        if arg.get('channel') != 'tickers':
+            return
+
+        count = self.book.update(payload.get('data', []))
+        if count and self.on_update:
+            try:
+                self.on_update(count)
+            except Exception as e:
+                print(f"[OKX WS] 回调异常: {e}")
+
+
+def _legacy_parse(tickers, inst_ids, top_n=50):
+    """旧版解析逻辑（列表线性查找 + index() + 每次全量float解析），仅用于基准对比"""
+    main_tickers = [t for t in tickers if t.get('instId', '') in inst_ids]
+    ticker_dict = {t.get('instId'): t for t in main_tickers}
+    parsed = []
+    for inst_id in inst_ids[:top_n]:
+        if inst_id not in ticker_dict:
+            continue
+        ticker = ticker_dict[inst_id]
+        record = TickerParser.parse_one(ticker, inst_id.split('-')[0], inst_ids.index(inst_id) + 1)
+        parsed.append(record)
+    return parsed
+
+
+def benchmark_ticker_parsing(inst_ids: List[str], total_instruments: int = 300,
+                             rounds: int = 200, changed_ratio: float = 0.2) -> Dict:
+    """
+    行情解析微基准：对比旧版全量解析与增量解析每次刷新的耗时
+
+    Args:
+        inst_ids: 关注的产品列表（如 MAIN_COINS）
+        total_instruments: 模拟的全市场SWAP产品数量
+        rounds: 刷新次数
+        changed_ratio: 每次刷新中发生变化的产品比例
+
+    Returns:
+        {'legacy_us': 每次刷新微秒, 'full_us': ..., 'incremental_us': ...}
+    """
+    import random
+
+    rng = random.Random(42)
+    universe = list(inst_ids) + [f"COIN{i}-USDT-SWAP" for i in range(max(0, total_instruments - len(inst_ids)))]
+    rng.shuffle(universe)
+
+    def make_ticker(inst_id, ts):
+        price = rng.uniform(0.1, 100000)
+        return {
+            'instId': inst_id, 'last': str(price), 'sodUtc8': str(price * 0.99),
+            'high24h': str(price * 1.02), 'low24h': str(price * 0.97),
+            'vol24h': str(rng.uniform(1, 1e6)), 'volCcy24h': str(rng.uniform(1e3, 1e9)),
+            'ts': str(ts),
+        }
+
+    # 预先生成每一轮的行情（只有部分产品的 ts 变化）
+    current = {inst_id: make_ticker(inst_id, 0) for inst_id in universe}
+    snapshots = []
+    for r in range(1, rounds + 1):
+        for inst_id in rng.sample(universe, int(len(universe) * changed_ratio)):
+            current[inst_id] = make_ticker(inst_id, r)
+        snapshots.append(list(current.values()))
+
+    index = InstrumentIndex(inst_ids)
+    results = {}
+
+    start = time.perf_counter()
+    for tickers in snapshots:
+        _legacy_parse(tickers, list(inst_ids))
+    results['legacy_us'] = (time.perf_counter() - start) / rounds * 1e6
+
+    start = time.perf_counter()
+    for tickers in snapshots:
+        parser = TickerParser(index)  # 每轮新建 = 全量解析
+        parser.parse(tickers)
+    results['full_us'] = (time.perf_counter() - start) / rounds * 1e6
+
+    parser = TickerParser(index)
+    start = time.perf_counter()
+    for tickers in snapshots:
+        parser.parse(tickers)
+    results['incremental_us'] = (time.perf_counter() - start) / rounds * 1e6
+
+    return results
+
+
+if __name__ == "__main__":
+    # 行情解析微基准
+    demo_inst_ids = [f"{coin}-USDT-SWAP" for coin in (
+        'BTC ETH BNB SOL XRP ADA DOGE AVAX DOT MATIC LINK UNI LTC ATOM BCH ETC FIL APT ARB OP '
+        'SUI INJ TIA HBAR IMX RUNE STX NEAR FTM ALGO XLM VET GRT SAND MANA AAVE AXS THETA XTZ EOS '
+        'FLOW ICP APE CHZ QNT EGLD LDO CFX CRV MKR'
+    ).split()]
+    print("OKX行情解析微基准（300个SWAP产品，关注50个，每次刷新20%变化）")
+    for name, cost in benchmark_ticker_parsing(demo_inst_ids).items():
+        print(f"  {name:<16} {cost:10.1f} 微秒/次刷新")
@@ -0,0 +1,686 @@
+"""
+本地模拟 OKX 交易所
+实现 OKXTrader 用到的接口（余额、持仓、下单/批量下单/撤单、策略委托、行情、产品、杠杆），
+带撮合引擎和可注入的请求延迟，用于在没有网络和API密钥时离线测试、压测跟单引擎
+
+用法:
+    from okx_simulator import SimulatedOKXExchange, SimulatedOKXTrader
+
+    exchange = SimulatedOKXExchange(balance=10000, latency=(0.02, 0.08), seed=1)
+    trader = SimulatedOKXTrader(exchange)        # 进程内调用，接口与 OKXTrader 相同
+    trader.place_market_order('BTC-USDT-SWAP', 'buy', '1')
+    exchange.set_price('BTC-USDT-SWAP', 101000)  # 行情变化时撮合挂单、触发条件单
+
+    server = OKXSimulatorServer(exchange)        # 或者启动本地HTTP服务
+    server.start()
+    trader = OKXTrader(base_url=server.base_url)
+
+命令行运行本文件执行跟单下单路径的基准测试（逐笔下单 vs 净额合并）
+"""
+
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from okx_trader import OKXTrader
+
+
+# 默认产品（面值/下单精度与OKX永续合约一致）
+DEFAULT_INSTRUMENTS = {
+    'BTC-USDT-SWAP': {'ctVal': '0.01', 'lotSz': '0.01', 'minSz': '0.01', 'tickSz': '0.1'},
+    'ETH-USDT-SWAP': {'ctVal': '0.1', 'lotSz': '0.01', 'minSz': '0.01', 'tickSz': '0.01'},
+    'SOL-USDT-SWAP': {'ctVal': '1', 'lotSz': '0.01', 'minSz': '0.01', 'tickSz': '0.01'},
+}
+
+DEFAULT_PRICES = {
+    'BTC-USDT-SWAP': 100000.0,
+    'ETH-USDT-SWAP': 3500.0,
+    'SOL-USDT-SWAP': 180.0,
+}
+
+
+def _ok(data: List[Dict]) -> Dict:
+    return {'code': '0', 'msg': '', 'data': data}
+
+
+def _error(code: str, msg: str) -> Dict:
+    return {'code': code, 'msg': msg, 'data': []}
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.8f}".rstrip('0').rstrip('.') or '0'
+
+
+class SimulatedOKXExchange:
+    """
+    模拟交易所（单币种 USDT 全仓，单向持仓模式）
+
+    - 市价单按 买一/卖一 加滑点成交；限价单能立即成交时按对手价成交，否则挂单
+    - set_price() 更新行情后撮合挂单，并触发价格穿越触发价的策略委托
+    - 每个请求按 latency 区间注入延迟（随机数由 seed 固定，结果可复现）
+    """
+
+    def __init__(
+        self,
+        balance: float = 10000.0,
+        instruments: Optional[Dict[str, Dict]] = None,
+        prices: Optional[Dict[str, float]] = None,
+        latency: Tuple[float, float] = (0.0, 0.0),
+        spread_bps: float = 1.0,
+        slippage_bps: float = 2.0,
+        fee_rate: float = 0.0005,
+        default_leverage: int = 10,
+        seed: int = 0
+    ):
+        """
+        初始化模拟交易所
+
+        Args:
+            balance: 初始USDT余额
+            instruments: {instId: {'ctVal', 'lotSz', 'minSz', 'tickSz'}}，默认 BTC/ETH/SOL 永续
+            prices: {instId: 初始价格}
+            latency: 每个请求的延迟区间（秒）
+            spread_bps: 买卖价差（基点）
+            slippage_bps: 市价单滑点（基点）
+            fee_rate: 手续费率
+            default_leverage: 默认杠杆
+            seed: 延迟随机数种子
+        """
+        self.instruments = {inst_id: dict(meta) for inst_id, meta in (instruments or DEFAULT_INSTRUMENTS).items()}
+        self.prices = dict(prices or DEFAULT_PRICES)
+        self.latency = latency
+        self.spread_bps = spread_bps
+        self.slippage_bps = slippage_bps
+        self.fee_rate = fee_rate
+        self.default_leverage = default_leverage
+
+        self._cash = float(balance)
+        self._positions = {}  # {instId: {'pos': 带符号张数, 'avgPx', 'cTime'}}
+        self._leverage = {}  # {instId: 杠杆}
+        self._orders = {}  # {ordId: 订单}
+        self._algos = {}  # {algoId: 策略委托}
+        self._ids = itertools.count(1)
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+
+        self.request_counts = {}  # {endpoint: 次数}
+        self.fills = []  # [(ts, instId, side, sz, px)]
+
+        self._routes = {
+            ('GET', '/api/v5/account/balance'): self._balance,
+            ('GET', '/api/v5/account/positions'): self._get_positions,
+            ('POST', '/api/v5/account/set-leverage'): self._set_leverage,
+            ('POST', '/api/v5/trade/order'): self._place_order,
+            ('POST', '/api/v5/trade/batch-orders'): self._batch_orders,
+            ('POST', '/api/v5/trade/cancel-order'): self._cancel_order,
+            ('GET', '/api/v5/trade/order'): self._get_order,
+            ('GET', '/api/v5/trade/orders-pending'): self._orders_pending,
+            ('POST', '/api/v5/trade/order-algo'): self._place_algo,
+            ('GET', '/api/v5/trade/orders-algo-pending'): self._algos_pending,
+            ('POST', '/api/v5/trade/cancel-algos'): self._cancel_algos,
+            ('GET', '/api/v5/market/ticker'): self._ticker,
+            ('GET', '/api/v5/market/tickers'): self._tickers,
+            ('GET', '/api/v5/public/instruments'): self._get_instruments,
+        }
+
+    # ==================== 请求入口 ====================
+
+    def handle(self, method: str, endpoint: str, params: Optional[Dict] = None, data=None) -> Dict:
+        """
+        处理一个API请求
+
+        Args:
+            method: GET / POST
+            endpoint: 如 /api/v5/trade/order
+            params: URL参数
+            data: 请求体（已解析的JSON）
+
+        Returns:
+            与OKX相同结构的响应 {'code', 'msg', 'data'}
+        """
+        handler = self._routes.get((method.upper(), endpoint))
+        if handler is None:
+            return _error('50014', f'Unsupported endpoint: {method} {endpoint}')
+
+        with self._lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+            delay = self._rng.uniform(*self.latency) if self.latency[1] > 0 else 0.0
+
+        if delay:
+            time.sleep(delay)
+
+        with self._lock:
+            return handler(params or {}, data)
+
+    def set_price(self, inst_id: str, price: float):
+        """更新最新价，撮合可成交的挂单并触发策略委托"""
+        with self._lock:
+            previous = self.prices.get(inst_id, price)
+            self.prices[inst_id] = float(price)
+            self._match_resting(inst_id)
+            self._trigger_algos(inst_id, previous, float(price))
+
+    # ==================== 价格/保证金 ====================
+
+    def _bid_ask(self, inst_id) -> Tuple[float, float]:
+        price = self.prices[inst_id]
+        half = price * self.spread_bps / 20000
+        return price - half, price + half
+
+    def _ct_val(self, inst_id) -> float:
+        return float(self.instruments[inst_id]['ctVal'])
+
+    def _lever(self, inst_id) -> float:
+        return float(self._leverage.get(inst_id, self.default_leverage))
+
+    def _upl(self, inst_id, position) -> float:
+        return position['pos'] * self._ct_val(inst_id) * (self.prices[inst_id] - position['avgPx'])
+
+    def _position_margin(self, inst_id, position) -> float:
+        return abs(position['pos']) * self._ct_val(inst_id) * self.prices[inst_id] / self._lever(inst_id)
+
+    def _order_margin(self, order) -> float:
+        inst_id = order['instId']
+        remaining = float(order['sz']) - float(order['accFillSz'])
+        return remaining * self._ct_val(inst_id) * float(order['px']) / self._lever(inst_id)
+
+    def _equity(self) -> float:
+        return self._cash + sum(self._upl(inst_id, pos) for inst_id, pos in self._positions.items())
+
+    def _available(self) -> float:
+        used = sum(self._position_margin(inst_id, pos) for inst_id, pos in self._positions.items())
+        frozen = sum(self._order_margin(order) for order in self._orders.values() if order['state'] == 'live')
+        return self._equity() - used - frozen
+
+    # ==================== 撮合 ====================
+
+    def _validate_size(self, inst_id, sz) -> Optional[str]:
+        meta = self.instruments.get(inst_id)
+        if meta is None:
+            return 'Instrument ID does not exist'
+        try:
+            size = float(sz)
+        except (TypeError, ValueError):
+            return 'Parameter sz error'
+        lot_sz, min_sz = float(meta['lotSz']), float(meta['minSz'])
+        if size < min_sz or abs(round(size / lot_sz) * lot_sz - size) > 1e-9:
+            return 'Parameter sz error'
+        return None
+
+    def _fill(self, inst_id, side, size, price):
+        """成交：更新持仓均价、已实现盈亏和手续费"""
+        ct_val = self._ct_val(inst_id)
+        signed = size if side == 'buy' else -size
+        position = self._positions.get(inst_id)
+        now_ms = str(int(time.time() * 1000))
+
+        if position is None or position['pos'] == 0:
+            position = {'pos': 0.0, 'avgPx': price, 'cTime': now_ms}
+            self._positions[inst_id] = position
+
+        current = position['pos']
+        if current == 0 or (current > 0) == (signed > 0):
+            # 开仓/加仓：加权均价
+            total = current + signed
+            position['avgPx'] = (abs(current) * position['avgPx'] + size * price) / abs(total)
+            position['pos'] = total
+        else:
+            # 减仓/反手：平掉部分按均价结算盈亏
+            closed = min(abs(current), size)
+            direction = 1 if current > 0 else -1
+            self._cash += closed * ct_val * (price - position['avgPx']) * direction
+            remaining = current + signed
+            if abs(remaining) < 1e-12:
+                del self._positions[inst_id]
+            elif (remaining > 0) != (current > 0):
+                position.update(pos=remaining, avgPx=price, cTime=now_ms)
+            else:
+                position['pos'] = remaining
+
+        self._cash -= size * ct_val * price * self.fee_rate
+        self.fills.append((time.time(), inst_id, side, size, price))
+
+    def _execute(self, order) -> Tuple[str, str]:
+        """
+        新订单撮合
+
+        Returns:
+            (sCode, sMsg)
+        """
+        inst_id, side = order['instId'], order['side']
+        size = float(order['sz'])
+        bid, ask = self._bid_ask(inst_id)
+
+        if order['reduceOnly'] == 'true':
+            position = self._positions.get(inst_id, {'pos': 0.0})['pos']
+            if position == 0 or (position > 0) == (side == 'buy'):
+                return '51169', 'Order failed because you do not have any positions in this direction'
+            size = min(size, abs(position))
+            order['sz'] = _fmt(size)
+
+        if order['ordType'] == 'market':
+            slip = self.slippage_bps / 10000
+            price = ask * (1 + slip) if side == 'buy' else bid * (1 - slip)
+        else:
+            price = float(order['px'])
+
+        # 只有开仓部分需要保证金
+        position = self._positions.get(inst_id, {'pos': 0.0})['pos']
+        signed = size if side == 'buy' else -size
+        opening = max(abs(signed) - abs(position), 0.0) if position * signed < 0 else size
+        if opening * self._ct_val(inst_id) * price / self._lever(inst_id) > self._available():
+            return '51008', 'Order failed. Insufficient USDT margin in account'
+
+        crosses = order['ordType'] == 'market' or (side == 'buy' and price >= ask) or (side == 'sell' and price <= bid)
+        if crosses:
+            fill_px = price if order['ordType'] == 'market' else (ask if side == 'buy' else bid)
+            self._fill(inst_id, side, size, fill_px)
+            order.update(state='filled', accFillSz=order['sz'], avgPx=_fmt(fill_px), fillPx=_fmt(fill_px))
+        else:
+            order['state'] = 'live'
+        return '0', 'Order placed'
+
+    def _match_resting(self, inst_id):
+        bid, ask = self._bid_ask(inst_id)
+        for order in list(self._orders.values()):
+            if order['instId'] != inst_id or order['state'] != 'live':
+                continue
+            price = float(order['px'])
+            if (order['side'] == 'buy' and ask <= price) or (order['side'] == 'sell' and bid >= price):
+                self._fill(inst_id, order['side'], float(order['sz']), price)
+                order.update(state='filled', accFillSz=order['sz'], avgPx=order['px'], fillPx=order['px'],
+                             uTime=str(int(time.time() * 1000)))
+
+    def _trigger_algos(self, inst_id, previous, price):
+        for algo in list(self._algos.values()):
+            if algo['instId'] != inst_id or algo['state'] != 'live':
+                continue
+            for trigger_key, ord_px_key in (('triggerPx', 'orderPx'), ('tpTriggerPx', 'tpOrdPx'), ('slTriggerPx', 'slOrdPx')):
+                trigger = algo.get(trigger_key)
+                if not trigger:
+                    continue
+                trigger = float(trigger)
+                if min(previous, price) <= trigger <= max(previous, price) and previous != price:
+                    ord_px = algo.get(ord_px_key) or '-1'
+                    order = self._new_order({
+                        'instId': inst_id, 'tdMode': algo['tdMode'], 'side': algo['side'], 'sz': algo['sz'],
+                        'ordType': 'market' if ord_px == '-1' else 'limit',
+                        'px': '' if ord_px == '-1' else ord_px,
+                        'reduceOnly': algo.get('reduceOnly', 'false'),
+                    })
+                    s_code, _ = self._execute(order)
+                    algo.update(state='effective' if s_code == '0' else 'order_failed',
+                                ordId=order['ordId'], actualPx=_fmt(price))
+                    break
+
+    # ==================== 账户接口 ====================
+
+    def _balance(self, params, data):
+        equity = self._equity()
+        available = self._available()
+        upl = equity - self._cash
+        return _ok([{
+            'totalEq': _fmt(equity),
+            'uTime': str(int(time.time() * 1000)),
+            'details': [{
+                'ccy': 'USDT',
+                'eq': _fmt(equity),
+                'cashBal': _fmt(self._cash),
+                'availEq': _fmt(available),
+                'availBal': _fmt(available),
+                'frozenBal': _fmt(equity - available),
+                'upl': _fmt(upl),
+            }]
+        }])
+
+    def _get_positions(self, params, data):
+        result = []
+        for inst_id, position in self._positions.items():
+            if params.get('instId') and params['instId'] != inst_id:
+                continue
+            price = self.prices[inst_id]
+            upl = self._upl(inst_id, position)
+            margin = self._position_margin(inst_id, position)
+            result.append({
+                'instId': inst_id,
+                'instType': 'SWAP',
+                'mgnMode': 'cross',
+                'posSide': 'net',
+                'pos': _fmt(position['pos']),
+                'avgPx': _fmt(position['avgPx']),
+                'markPx': _fmt(price),
+                'last': _fmt(price),
+                'upl': _fmt(upl),
+                'uplRatio': _fmt(upl / margin) if margin else '0',
+                'lever': _fmt(self._lever(inst_id)),
+                'margin': _fmt(margin),
+                'imr': _fmt(margin),
+                'notionalUsd': _fmt(abs(position['pos']) * self._ct_val(inst_id) * price),
+                'liqPx': '',
+                'cTime': position['cTime'],
+                'uTime': str(int(time.time() * 1000)),
+            })
+        return _ok(result)
+
+    def _set_leverage(self, params, data):
+        data = data or {}
+        inst_id = data.get('instId', '')
+        if inst_id not in self.instruments:
+            return _error('51001', 'Instrument ID does not exist')
+        self._leverage[inst_id] = int(float(data.get('lever', self.default_leverage)))
+        return _ok([{'instId': inst_id, 'lever': data.get('lever'), 'mgnMode': data.get('mgnMode', 'cross'),
+                     'posSide': data.get('posSide', 'net')}])
+
+    # ==================== 交易接口 ====================
+
+    def _new_order(self, data) -> Dict:
+        ord_id = str(next(self._ids))
+        now_ms = str(int(time.time() * 1000))
+        order = {
+            'ordId': ord_id,
+            'clOrdId': data.get('clOrdId', ''),
+            'instId': data.get('instId', ''),
+            'instType': 'SWAP',
+            'tdMode': data.get('tdMode', 'cross'),
+            'side': data.get('side', ''),
+            'posSide': data.get('posSide', 'net'),
+            'ordType': data.get('ordType', ''),
+            'sz': str(data.get('sz', '')),
+            'px': str(data.get('px', '')),
+            'reduceOnly': str(data.get('reduceOnly', 'false')).lower(),
+            'state': 'created',  # 撮合后变为 live（挂单）或 filled
+            'accFillSz': '0',
+            'avgPx': '',
+            'fillPx': '',
+            'lever': _fmt(self._lever(data.get('instId', ''))) if data.get('instId') in self.instruments else '',
+            'cTime': now_ms,
+            'uTime': now_ms,
+        }
+        self._orders[ord_id] = order
+        return order
+
+    def _submit(self, data) -> Dict:
+        """下单一笔，返回单个订单的结果项"""
+        inst_id = data.get('instId', '')
+        error = self._validate_size(inst_id, data.get('sz'))
+        if error is None and data.get('side') not in ('buy', 'sell'):
+            error = 'Parameter side error'
+        if error is None and data.get('ordType') not in ('market', 'limit', 'post_only'):
+            error = 'Parameter ordType error'
+        if error is None and data.get('ordType') != 'market' and not data.get('px'):
+            error = 'Parameter px error'
+        if error:
+            return {'ordId': '', 'clOrdId': data.get('clOrdId', ''), 'tag': '', 'sCode': '51000', 'sMsg': error}
+
+        order = self._new_order(data)
+        s_code, s_msg = self._execute(order)
+        if s_code != '0':
+            del self._orders[order['ordId']]
+            return {'ordId': '', 'clOrdId': order['clOrdId'], 'tag': '', 'sCode': s_code, 'sMsg': s_msg}
+        return {'ordId': order['ordId'], 'clOrdId': order['clOrdId'], 'tag': '', 'sCode': '0', 'sMsg': s_msg}
+
+    def _place_order(self, params, data):
+        item = self._submit(data or {})
+        if item['sCode'] != '0':
+            return {'code': '1', 'msg': 'All operations failed', 'data': [item]}
+        return _ok([item])
+
+    def _batch_orders(self, params, data):
+        if not isinstance(data, list) or not data or len(data) > OKXTrader.BATCH_ORDER_LIMIT:
+            return _error('51000', 'Parameter error')
+        items = [self._submit(order) for order in data]
+        succeeded = sum(1 for item in items if item['sCode'] == '0')
+        if succeeded == len(items):
+            return _ok(items)
+        code = '2' if succeeded == 0 else '1'
+        return {'code': code, 'msg': 'All operations failed' if succeeded == 0 else 'Partially successful', 'data': items}
+
+    def _cancel_order(self, params, data):
+        data = data or {}
+        order = self._orders.get(data.get('ordId', ''))
+        if order is None or order['state'] != 'live':
+            return {'code': '1', 'msg': 'All operations failed', 'data': [
+                {'ordId': data.get('ordId', ''), 'clOrdId': '', 'sCode': '51400',
+                 'sMsg': 'Cancellation failed as the order has been filled, canceled or does not exist'}]}
+        order.update(state='canceled', uTime=str(int(time.time() * 1000)))
+        return _ok([{'ordId': order['ordId'], 'clOrdId': order['clOrdId'], 'sCode': '0', 'sMsg': ''}])
+
+    def _get_order(self, params, data):
+        order = self._orders.get(params.get('ordId', ''))
+        if order is None:
+            return _error('51603', 'Order does not exist')
+        return _ok([dict(order)])
+
+    def _orders_pending(self, params, data):
+        return _ok([
+            dict(order) for order in sorted(self._orders.values(), key=lambda o: -int(o['ordId']))
+            if order['state'] == 'live' and (not params.get('instId') or order['instId'] == params['instId'])
+        ])
+
+    # ==================== 策略委托 ====================
+
+    def _place_algo(self, params, data):
+        data = data or {}
+        inst_id = data.get('instId', '')
+        error = self._validate_size(inst_id, data.get('sz'))
+        if error is None and not any(data.get(key) for key in ('triggerPx', 'tpTriggerPx', 'slTriggerPx')):
+            error = 'Parameter triggerPx error'
+        if error:
+            return {'code': '1', 'msg': 'All operations failed', 'data': [{'algoId': '', 'sCode': '51000', 'sMsg': error}]}
+
+        algo_id = str(next(self._ids))
+        algo = {key: str(value) for key, value in data.items()}
+        algo.update(algoId=algo_id, instType='SWAP', state='live', cTime=str(int(time.time() * 1000)))
+        algo.setdefault('tdMode', 'cross')
+        self._algos[algo_id] = algo
+        return _ok([{'algoId': algo_id, 'clOrdId': '', 'sCode': '0', 'sMsg': ''}])
+
+    def _algos_pending(self, params, data):
+        if not params.get('ordType'):
+            return _error('51000', 'Parameter ordType error')
+        limit = int(params.get('limit', 100))
+        after = params.get('after')
+        matched = [
+            dict(algo) for algo in sorted(self._algos.values(), key=lambda a: -int(a['algoId']))
+            if algo['state'] == 'live'
+            and algo.get('ordType') == params['ordType']
+            and (not params.get('instId') or algo['instId'] == params['instId'])
+            and (not after or int(algo['algoId']) < int(after))
+        ]
+        return _ok(matched[:limit])
+
+    def _cancel_algos(self, params, data):
+        results = []
+        for entry in data or []:
+            algo = self._algos.get(entry.get('algoId', ''))
+            if algo is None or algo['state'] != 'live':
+                results.append({'algoId': entry.get('algoId', ''), 'sCode': '51400', 'sMsg': 'Cancellation failed'})
+                continue
+            algo['state'] = 'canceled'
+            results.append({'algoId': algo['algoId'], 'sCode': '0', 'sMsg': ''})
+        if results and all(item['sCode'] == '0' for item in results):
+            return _ok(results)
+        return {'code': '1', 'msg': 'Operation failed', 'data': results}
+
+    # ==================== 行情/产品 ====================
+
+    def _ticker_data(self, inst_id) -> Dict:
+        price = self.prices[inst_id]
+        bid, ask = self._bid_ask(inst_id)
+        return {
+            'instType': 'SWAP',
+            'instId': inst_id,
+            'last': _fmt(price),
+            'askPx': _fmt(ask),
+            'bidPx': _fmt(bid),
+            'open24h': _fmt(price),
+            'high24h': _fmt(price),
+            'low24h': _fmt(price),
+            'sodUtc8': _fmt(price),
+            'vol24h': '0',
+            'volCcy24h': '0',
+            'ts': str(int(time.time() * 1000)),
+        }
+
+    def _ticker(self, params, data):
+        inst_id = params.get('instId', '')
+        if inst_id not in self.prices:
+            return _error('51001', 'Instrument ID does not exist')
+        return _ok([self._ticker_data(inst_id)])
+
+    def _tickers(self, params, data):
+        return _ok([self._ticker_data(inst_id) for inst_id in self.prices])
+
+    def _get_instruments(self, params, data):
+        return _ok([
+            dict(meta, instId=inst_id, instType='SWAP', state='live', settleCcy='USDT',
+                 ctValCcy=inst_id.split('-')[0], uly='-'.join(inst_id.split('-')[:2]))
+            for inst_id, meta in self.instruments.items()
+        ])
+
+
+class SimulatedOKXTrader(OKXTrader):
+    """进程内连接模拟交易所的 OKXTrader（签名、统计与真实客户端一致，只替换网络发送）"""
+
+    def __init__(self, exchange: SimulatedOKXExchange):
+        super().__init__('simulator', 'simulator', 'simulator', is_demo=True, base_url='http://simulator')
+        self.exchange = exchange
+
+    def _send(self, method: str, endpoint: str, headers: Dict, params: Optional[Dict], body: str) -> Dict:
+        return self.exchange.handle(method, endpoint, params, json.loads(body) if body else None)
+
+
+class OKXSimulatorServer:
+    """本地HTTP服务（供真实 OKXTrader / 行情客户端通过 base_url 连接）"""
+
+    def __init__(self, exchange: SimulatedOKXExchange, host: str = '127.0.0.1', port: int = 0):
+        """
+        Args:
+            exchange: 模拟交易所
+            host: 监听地址
+            port: 端口，0 表示自动分配
+        """
+        self.exchange = exchange
+        simulator = exchange
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self, method):
+                parts = urlsplit(self.path)
+                params = dict(parse_qsl(parts.query))
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length).decode('utf-8') if length else ''
+                try:
+                    data = json.loads(body) if body else None
+                except ValueError:
+                    data = None
+                payload = json.dumps(simulator.handle(method, parts.path, params, data)).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._respond('GET')
+
+            def do_POST(self):
+                self._respond('POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='OKXSimulatorServer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# ==================== 基准测试 ====================
+
+def benchmark_copy_orders(cycles: int = 50, traders: int = 10, latency: Tuple[float, float] = (0.02, 0.06),
+                          netting: bool = True, seed: int = 1) -> Dict:
+    """
+    跟单下单路径基准：每轮 traders 个大户各产生一个随机方向的BTC市价跟单信号，
+    按逐笔下单或净额合并后下单，统计订单数、吞吐量和下单延迟分位数
+
+    Args:
+        cycles: 轮数
+        traders: 每轮的大户（信号）数
+        latency: 模拟交易所请求延迟区间（秒）
+        netting: 是否按产品合并净额
+        seed: 随机数种子（信号与延迟都可复现）
+
+    Returns:
+        {'signals', 'orders', 'elapsed', 'signals_per_sec', 'p50_ms', 'p90_ms', 'p99_ms'}
+    """
+    from copy_netting import net_signals
+    from latency_tracer import percentile
+
+    exchange = SimulatedOKXExchange(balance=1_000_000, latency=latency, seed=seed)
+    trader = SimulatedOKXTrader(exchange)
+    rng = random.Random(seed)
+
+    order_latencies = []
+    signal_count = 0
+    order_count = 0
+    started = time.perf_counter()
+
+    for _ in range(cycles):
+        signals = [{
+            'trader': f"trader{index}",
+            'kind': 'market',
+            'coin': 'BTC',
+            'direction': rng.choice(['多', '空']),
+            'size': rng.choice([0.01, 0.02, 0.05]),
+        } for index in range(traders)]
+        signal_count += len(signals)
+
+        if netting:
+            orders, _, _ = net_signals(signals, min_size=0.01)
+            batch = [(f"{order.coin}-USDT-SWAP", order.direction, order.size) for order in orders]
+        else:
+            batch = [(f"{s['coin']}-USDT-SWAP", s['direction'], s['size']) for s in signals]
+
+        for inst_id, direction, size in batch:
+            contracts = _fmt(round(size / exchange._ct_val(inst_id), 2))
+            sent = time.perf_counter()
+            trader.place_market_order(inst_id, 'buy' if direction == '多' else 'sell', contracts)
+            order_latencies.append((time.perf_counter() - sent) * 1000)
+            order_count += 1
+
+    elapsed = time.perf_counter() - started
+    order_latencies.sort()
+    return {
+        'signals': signal_count,
+        'orders': order_count,
+        'elapsed': elapsed,
+        'signals_per_sec': signal_count / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(order_latencies, 50) if order_latencies else 0.0,
+        'p90_ms': percentile(order_latencies, 90) if order_latencies else 0.0,
+        'p99_ms': percentile(order_latencies, 99) if order_latencies else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    for use_netting in (False, True):
+        result = benchmark_copy_orders(netting=use_netting)
+        print(f"{'净额合并' if use_netting else '逐笔下单'}: {result['signals']} 个信号 → {result['orders']} 笔订单, "
+              f"耗时 {result['elapsed']:.2f}s ({result['signals_per_sec']:.0f} 信号/秒), "
+              f"下单延迟 P50 {result['p50_ms']:.0f}ms / P90 {result['p90_ms']:.0f}ms / P99 {result['p99_ms']:.0f}ms")
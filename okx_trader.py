@@ -4,18 +4,99 @@ OKX API 交易模块
 """
 
 import hmac
+import hashlib
 import base64
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import requests
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Union
+from profiling import profiler
+from app_logging import get_logger
+
+log = get_logger('okx_api')
+
+
+class OKXRequestSigner:
+    """
+    OKX请求签名器
+
+    - 密钥只编码一次，缓存带密钥的HMAC状态，每次签名copy()后只需update消息
+    - 静态请求头（KEY/PASSPHRASE/Content-Type/模拟盘标记）预先构建
+    - 时间戳直接由 time.time() 格式化，不经过 datetime 对象
+    """
+
+    def __init__(self, api_key: str = "", secret_key: str = "", passphrase: str = "", is_demo: bool = True):
+        self._keyed_hmac = hmac.new(secret_key.encode('utf-8'), digestmod=hashlib.sha256) if secret_key else None
+
+        self._static_headers = {
+            'OK-ACCESS-KEY': api_key,
+            'OK-ACCESS-PASSPHRASE': passphrase,
+            'Content-Type': 'application/json'
+        }
+        # 模拟盘需要添加特殊header
+        if is_demo:
+            self._static_headers['x-simulated-trading'] = '1'
+
+    @staticmethod
+    def timestamp() -> str:
+        """获取ISO 8601格式的UTC时间戳（毫秒精度），如 2024-01-01T00:00:00.000Z"""
+        now = time.time()
+        return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(now)) + '.%03dZ' % int(now % 1 * 1000)
+
+    def sign(self, timestamp: str, method: str, request_path: str, body: str = "") -> str:
+        """
+        生成签名
+
+        Args:
+            timestamp: 时间戳
+            method: HTTP方法（大写）
+            request_path: 请求路径
+            body: 请求体
+
+        Returns:
+            签名字符串
+        """
+        if self._keyed_hmac is None:
+            return ""
+
+        mac = self._keyed_hmac.copy()
+        mac.update((timestamp + method + request_path + body).encode('utf-8'))
+        return base64.b64encode(mac.digest()).decode()
+
+    def headers(self, method: str, request_path: str, body: str = "") -> Dict:
+        """
+        生成请求头
+
+        Args:
+            method: HTTP方法（大写）
+            request_path: 请求路径（含查询字符串）
+            body: 请求体
+
+        Returns:
+            请求头字典
+        """
+        timestamp = self.timestamp()
+        headers = self._static_headers.copy()
+        headers['OK-ACCESS-SIGN'] = self.sign(timestamp, method, request_path, body)
+        headers['OK-ACCESS-TIMESTAMP'] = timestamp
+        return headers
 
 
 class OKXTrader:
     """OKX交易类"""
 
-    def __init__(self, api_key: str = "", secret_key: str = "", passphrase: str = "", is_demo: bool = True):
+    # 策略委托类型（不指定ordType时全部查询）
+    ALGO_ORDER_TYPES = ['conditional', 'oco', 'trigger', 'move_order_stop', 'iceberg', 'twap']
+    ALGO_PAGE_LIMIT = 100  # 每页最大条数（OKX上限）
+    ALGO_MAX_PAGES = 10  # 单个类型最多翻页次数
+    ALGO_IDLE_POLL_INTERVAL = 30  # 秒，账户未使用的策略类型降频查询
+    BATCH_ORDER_LIMIT = 20  # 批量下单每次最多订单数（OKX上限）
+
+    def __init__(self, api_key: str = "", secret_key: str = "", passphrase: str = "", is_demo: bool = True,
+                 base_url: Optional[str] = None):
         """
         初始化OKX交易客户端
 
@@ -24,6 +105,7 @@ class OKXTrader:
             secret_key: Secret Key
             passphrase: Passphrase
             is_demo: 是否使用模拟盘（True=模拟盘, False=实盘）
+            base_url: 自定义API地址（如本地模拟交易所 okx_simulator），None 使用OKX官方地址
         """
         self.api_key = api_key
         self.secret_key = secret_key
@@ -35,12 +117,24 @@ class OKXTrader:
             self.base_url = "https://www.okx.com"  # 模拟盘也使用同一个URL，通过header区分
         else:
             self.base_url = "https://www.okx.com"
+        if base_url:
+            self.base_url = base_url.rstrip('/')
 
         self.timeout = 10
 
+        # 请求签名器（缓存HMAC密钥状态和静态请求头）
+        self.signer = OKXRequestSigner(api_key, secret_key, passphrase, is_demo)
+
+        # 策略委托查询状态：账户实际使用的ordType每次都查，其余类型降频
+        self._algo_active_types = set()
+        self._algo_type_polled_at = {}  # {ordType: 上次查询时间}
+        self._algo_lock = threading.Lock()
+        self._algo_pool = None  # 按类型并发查询的线程池（首次查询时创建，后续复用）
+        self.last_algo_request_count = 0  # 最近一次 get_algo_orders 的请求次数
+
     def _get_timestamp(self) -> str:
         """获取ISO 8601格式的时间戳"""
-        return datetime.utcnow().isoformat(timespec='milliseconds') + 'Z'
+        return self.signer.timestamp()
 
     def _sign(self, timestamp: str, method: str, request_path: str, body: str = "") -> str:
         """
@@ -55,16 +149,7 @@ class OKXTrader:
         Returns:
             签名字符串
         """
-        if not self.secret_key:
-            return ""
-
-        message = timestamp + method.upper() + request_path + body
-        mac = hmac.new(
-            bytes(self.secret_key, encoding='utf8'),
-            bytes(message, encoding='utf-8'),
-            digestmod='sha256'
-        )
-        return base64.b64encode(mac.digest()).decode()
+        return self.signer.sign(timestamp, method.upper(), request_path, body)
 
     def _get_headers(self, method: str, request_path: str, body: str = "") -> Dict:
         """
@@ -78,24 +163,10 @@ class OKXTrader:
         Returns:
             请求头字典
         """
-        timestamp = self._get_timestamp()
-        sign = self._sign(timestamp, method, request_path, body)
+        return self.signer.headers(method.upper(), request_path, body)
 
-        headers = {
-            'OK-ACCESS-KEY': self.api_key,
-            'OK-ACCESS-SIGN': sign,
-            'OK-ACCESS-TIMESTAMP': timestamp,
-            'OK-ACCESS-PASSPHRASE': self.passphrase,
-            'Content-Type': 'application/json'
-        }
-
-        # 模拟盘需要添加特殊header
-        if self.is_demo:
-            headers['x-simulated-trading'] = '1'
-
-        return headers
-
-    def _request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None) -> Dict:
+    def _request(self, method: str, endpoint: str, params: Optional[Dict] = None,
+                 data: Optional[Union[Dict, List[Dict]]] = None) -> Dict:
         """
         发送HTTP请求
 
@@ -103,13 +174,11 @@ class OKXTrader:
             method: HTTP方法
             endpoint: API端点
             params: URL参数
-            data: 请求体数据
+            data: 请求体数据（批量接口为列表）
 
         Returns:
             响应JSON
         """
-        url = self.base_url + endpoint
-
         # 构建请求路径（用于签名）
         request_path = endpoint
         if params:
@@ -124,20 +193,12 @@ class OKXTrader:
         # 生成请求头
         headers = self._get_headers(method, request_path, body)
 
+        profiler.count('okx_api', 'requests')
         try:
-            if method.upper() == 'GET':
-                response = requests.get(url, headers=headers, params=params, timeout=self.timeout)
-            elif method.upper() == 'POST':
-                response = requests.post(url, headers=headers, json=data, timeout=self.timeout)
-            else:
-                raise ValueError(f"不支持的HTTP方法: {method}")
-
-            response.raise_for_status()
-            result = response.json()
-
-            return result
-
+            with profiler.span('okx_api', endpoint):
+                return self._send(method.upper(), endpoint, headers, params, body)
         except requests.exceptions.RequestException as e:
+            profiler.count('okx_api', 'failures')
             return {
                 'code': '-1',
                 'msg': f'请求失败: {str(e)}',
@@ -150,6 +211,31 @@ class OKXTrader:
                 'data': []
             }
 
+    def _send(self, method: str, endpoint: str, headers: Dict, params: Optional[Dict], body: str) -> Dict:
+        """
+        发送已签名的请求（网络传输层，模拟交易所在进程内替换此方法）
+
+        Args:
+            method: HTTP方法（大写）
+            endpoint: API端点
+            headers: 已签名的请求头
+            params: URL参数
+            body: 请求体JSON字符串（与签名一致）
+
+        Returns:
+            响应JSON
+        """
+        url = self.base_url + endpoint
+        if method == 'GET':
+            response = requests.get(url, headers=headers, params=params, timeout=self.timeout)
+        elif method == 'POST':
+            response = requests.post(url, headers=headers, data=body, timeout=self.timeout)
+        else:
+            raise ValueError(f"不支持的HTTP方法: {method}")
+
+        response.raise_for_status()
+        return response.json()
+
     # ==================== 账户相关API ====================
 
     def get_account_balance(self) -> Dict:
@@ -327,6 +413,47 @@ class OKXTrader:
             reduce_only=reduce_only
         )
 
+    def place_batch_orders(self, orders: List[Dict]) -> Dict:
+        """
+        批量下单（每次请求最多 BATCH_ORDER_LIMIT 个，超出时分多次请求）
+
+        Args:
+            orders: 订单参数列表，字段同 place_order 的请求体，如
+                    {'instId': 'BTC-USDT-SWAP', 'tdMode': 'cross', 'side': 'buy', 'ordType': 'market', 'sz': '1'}
+
+        Returns:
+            {'code', 'msg', 'data', 'requests'}，data 与 orders 一一对应，
+            每项包含 ordId/clOrdId/sCode/sMsg（sCode 为 '0' 表示该订单成功）；
+            code: '0' 全部成功，'1' 部分成功，'2' 全部失败
+        """
+        endpoint = '/api/v5/trade/batch-orders'
+        results = []
+        messages = []
+        request_count = 0
+
+        for start in range(0, len(orders), self.BATCH_ORDER_LIMIT):
+            chunk = orders[start:start + self.BATCH_ORDER_LIMIT]
+            result = self._request('POST', endpoint, data=chunk)
+            request_count += 1
+
+            data = result.get('data') or []
+            if len(data) != len(chunk):
+                # 整个请求失败（网络错误/参数错误），该批订单都记为失败
+                data = [{'ordId': '', 'clOrdId': order.get('clOrdId', ''),
+                         'sCode': result.get('code', '-1'), 'sMsg': result.get('msg', '')} for order in chunk]
+            if result.get('msg'):
+                messages.append(result['msg'])
+            results.extend(data)
+
+        succeeded = sum(1 for item in results if item.get('sCode') == '0')
+        code = '0' if succeeded == len(results) else ('2' if succeeded == 0 else '1')
+        return {
+            'code': code,
+            'msg': '; '.join(messages),
+            'data': results,
+            'requests': request_count
+        }
+
     def cancel_order(self, inst_id: str, order_id: str = "", client_order_id: str = "") -> Dict:
         """
         撤销订单
@@ -450,7 +577,14 @@ class OKXTrader:
 
         data.update(kwargs)
 
-        return self._request('POST', endpoint, data=data)
+        result = self._request('POST', endpoint, data=data)
+
+        # 新下的策略类型立即纳入每次刷新的查询范围
+        if result.get('code') == '0':
+            with self._algo_lock:
+                self._algo_active_types.add(order_type)
+
+        return result
 
     def place_tp_sl_order(
         self,
@@ -492,50 +626,127 @@ class OKXTrader:
             pos_side=pos_side
         )
 
-    def get_algo_orders(self, inst_type: str = "SWAP", inst_id: str = "", order_type: str = "") -> Dict:
+    def get_algo_orders(self, inst_type: str = "SWAP", inst_id: str = "", order_type: str = "",
+                        poll_all: bool = False) -> Dict:
         """
         获取策略委托单列表
 
+        不指定order_type时，各类型并发查询；账户当前有委托的类型每次都查，
+        没有委托的类型每 ALGO_IDLE_POLL_INTERVAL 秒才查一次。单个类型超过一页时用 after 游标翻页。
+
         Args:
             inst_type: 产品类型
             inst_id: 产品ID
             order_type: 订单类型 conditional, oco, trigger, etc.
+            poll_all: 是否忽略降频，查询全部类型
 
         Returns:
-            策略委托单列表
+            策略委托单列表，额外包含 requests（本次请求次数）
         """
-        endpoint = '/api/v5/trade/orders-algo-pending'
+        if order_type:
+            # 查询指定类型
+            ok, orders, request_count, msg = self._get_algo_orders_by_type(inst_type, inst_id, order_type)
+            self.last_algo_request_count = request_count
+            return {
+                'code': '0' if ok else '-1',
+                'msg': msg,
+                'data': orders,
+                'requests': request_count
+            }
 
-        # 如果没有指定order_type，则查询所有类型
-        if not order_type:
-            # 查询所有策略委托类型
-            all_orders = []
-            order_types = ['conditional', 'oco', 'trigger', 'move_order_stop', 'iceberg', 'twap']
-
-            for ot in order_types:
-                params = {'instType': inst_type, 'ordType': ot}
-                if inst_id:
-                    params['instId'] = inst_id
-
-                result = self._request('GET', endpoint, params=params)
-                print(f"[OKX API] Query {ot}: code={result.get('code')}, count={len(result.get('data', []))}")
-                if result.get('code') == '0':
-                    orders = result.get('data', [])
+        # 查询所有策略委托类型
+        now = time.time()
+        with self._algo_lock:
+            order_types = [
+                ot for ot in self.ALGO_ORDER_TYPES
+                if poll_all
+                or ot in self._algo_active_types
+                or now - self._algo_type_polled_at.get(ot, 0) >= self.ALGO_IDLE_POLL_INTERVAL
+            ]
+
+        all_orders = []
+        total_requests = 0
+        failed_types = []
+
+        if order_types:
+            pool = self._get_algo_pool()
+            results = list(pool.map(
+                lambda ot: (ot, self._get_algo_orders_by_type(inst_type, inst_id, ot)),
+                order_types
+            ))
+
+            with self._algo_lock:
+                for ot, (ok, orders, request_count, msg) in results:
+                    total_requests += request_count
+                    if not ok:
+                        failed_types.append(ot)
+                        log.warning("%s 策略委托查询失败: %s", ot, msg or 'Unknown')
+                        continue
+
+                    self._algo_type_polled_at[ot] = now
                     all_orders.extend(orders)
-                else:
-                    print(f"[OKX API] {ot} failed: {result.get('msg', 'Unknown')}")
+                    if orders:
+                        self._algo_active_types.add(ot)
+                    else:
+                        self._algo_active_types.discard(ot)
+
+        self.last_algo_request_count = total_requests
+        log.debug("策略委托: %d/%d 类型, %d 次请求, count=%d",
+                  len(order_types), len(self.ALGO_ORDER_TYPES), total_requests, len(all_orders))
+
+        return {
+            'code': '0',
+            'msg': '',
+            'data': all_orders,
+            'requests': total_requests,
+            'failed_types': failed_types
+        }
 
-            return {
-                'code': '0',
-                'msg': '',
-                'data': all_orders
-            }
-        else:
-            # 查询指定类型
-            params = {'instType': inst_type, 'ordType': order_type}
+    def _get_algo_pool(self) -> ThreadPoolExecutor:
+        """策略委托查询线程池（每种类型一个线程，惰性创建）"""
+        with self._algo_lock:
+            if self._algo_pool is None:
+                self._algo_pool = ThreadPoolExecutor(max_workers=len(self.ALGO_ORDER_TYPES),
+                                                     thread_name_prefix='okx-algo')
+            return self._algo_pool
+
+    def _get_algo_orders_by_type(self, inst_type: str, inst_id: str, order_type: str) -> tuple:
+        """
+        查询单个类型的全部策略委托（按 after 游标翻页）
+
+        Returns:
+            (是否成功, 委托列表, 请求次数, 错误信息)
+        """
+        endpoint = '/api/v5/trade/orders-algo-pending'
+        orders = []
+        after = ''
+        request_count = 0
+
+        while request_count < self.ALGO_MAX_PAGES:
+            params = {'instType': inst_type, 'ordType': order_type, 'limit': str(self.ALGO_PAGE_LIMIT)}
             if inst_id:
                 params['instId'] = inst_id
-            return self._request('GET', endpoint, params=params)
+            if after:
+                params['after'] = after
+
+            result = self._request('GET', endpoint, params=params)
+            request_count += 1
+
+            if result.get('code') != '0':
+                return (False, orders, request_count, result.get('msg', ''))
+
+            page = result.get('data', [])
+            orders.extend(page)
+
+            # 不满一页说明已取完
+            if len(page) < self.ALGO_PAGE_LIMIT:
+                break
+
+            after = page[-1].get('algoId', '')
+            if not after:
+                break
+
+        return (True, orders, request_count, '')
 
     def cancel_algo_order(self, algo_ids: List[Dict]) -> Dict:
         """
@@ -628,7 +839,59 @@ class OKXTrader:
         return f"{inst_id}: {pos}张 @ {avg_px} | 盈亏: {upl} ({upl_ratio_str})"
 
 
+def benchmark_signing(iterations: int = 20000) -> Dict:
+    """
+    签名微基准：对比旧版（每次编码密钥 + datetime时间戳）与签名器的吞吐量
+
+    Args:
+        iterations: 签名次数
+
+    Returns:
+        {'legacy_per_sec': ..., 'signer_per_sec': ...}
+    """
+    api_key, secret_key, passphrase = 'bench-key', 'bench-secret-0123456789abcdef', 'bench-pass'
+    request_path = '/api/v5/trade/order'
+    body = json.dumps({'instId': 'BTC-USDT-SWAP', 'tdMode': 'cross', 'side': 'buy', 'ordType': 'market', 'sz': '1'})
+
+    def legacy_headers():
+        timestamp = datetime.utcnow().isoformat(timespec='milliseconds') + 'Z'
+        message = timestamp + 'POST' + request_path + body
+        mac = hmac.new(bytes(secret_key, encoding='utf8'), bytes(message, encoding='utf-8'), digestmod='sha256')
+        headers = {
+            'OK-ACCESS-KEY': api_key,
+            'OK-ACCESS-SIGN': base64.b64encode(mac.digest()).decode(),
+            'OK-ACCESS-TIMESTAMP': timestamp,
+            'OK-ACCESS-PASSPHRASE': passphrase,
+            'Content-Type': 'application/json'
+        }
+        headers['x-simulated-trading'] = '1'
+        return headers
+
+    signer = OKXRequestSigner(api_key, secret_key, passphrase, is_demo=True)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        legacy_headers()
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        signer.headers('POST', request_path, body)
+    signer_elapsed = time.perf_counter() - start
+
+    return {
+        'legacy_per_sec': iterations / legacy_elapsed,
+        'signer_per_sec': iterations / signer_elapsed,
+    }
+
+
 if __name__ == "__main__":
     # 测试代码
     print("OKX交易模块")
     print("请在主程序中配置API Key使用")
+
+    # 签名吞吐量微基准
+    result = benchmark_signing()
+    print(f"签名吞吐量: 旧版 {result['legacy_per_sec']:,.0f} 次/秒, "
+          f"签名器 {result['signer_per_sec']:,.0f} 次/秒 "
+          f"({result['signer_per_sec'] / result['legacy_per_sec']:.2f}x)")
@@ -0,0 +1,356 @@
+"""
+页面数据捕获
+在页面脚本执行前注入 fetch/XHR 钩子，把 JSON 响应缓存到 window.__cgCaptured，
+再把捕获到的 Hyperliquid 数据（持仓/成交/委托/充值提现）映射为与表格抓取相同的字段，
+无需依次点击各个标签页
+"""
+
+import json
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+# 注入脚本：拦截 fetch 和 XMLHttpRequest，只保留最近 CAPTURE_LIMIT 个 JSON 响应（原始文本）
+CAPTURE_LIMIT = 60
+
+CAPTURE_HOOK_JS = '''
+(function () {
+    if (window.__cgCaptureInstalled) { return; }
+    window.__cgCaptureInstalled = true;
+    window.__cgCaptured = [];
+
+    function keep(url, text) {
+        if (!text || (text[0] !== '{' && text[0] !== '[')) { return; }
+        window.__cgCaptured.push({url: String(url), t: Date.now(), body: text});
+        if (window.__cgCaptured.length > %d) { window.__cgCaptured.shift(); }
+    }
+
+    var originalFetch = window.fetch;
+    if (originalFetch) {
+        window.fetch = function () {
+            var url = arguments[0] && arguments[0].url ? arguments[0].url : arguments[0];
+            return originalFetch.apply(this, arguments).then(function (response) {
+                try {
+                    response.clone().text().then(function (text) { keep(url, text); }, function () {});
+                } catch (e) {}
+                return response;
+            });
+        };
+    }
+
+    var originalOpen = XMLHttpRequest.prototype.open;
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.__cgUrl = url;
+        return originalOpen.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.send = function () {
+        var xhr = this;
+        xhr.addEventListener('load', function () {
+            try {
+                if (!xhr.responseType || xhr.responseType === 'text') { keep(xhr.__cgUrl, xhr.responseText); }
+            } catch (e) {}
+        });
+        return originalSend.apply(this, arguments);
+    };
+})();
+''' % CAPTURE_LIMIT
+
+# 读取捕获内容（以及 Next.js 页面初始数据），一次往返取回
+READ_CAPTURED_JS = '''
+var payloads = (window.__cgCaptured || []).slice();
+var nextData = document.getElementById('__NEXT_DATA__');
+if (nextData && nextData.textContent) {
+    payloads.unshift({url: '__NEXT_DATA__', t: 0, body: nextData.textContent});
+}
+return payloads;
+'''
+
+def install_capture_hook(driver):
+    """
+    给浏览器注入捕获钩子（对之后加载的所有文档生效）
+
+    Args:
+        driver: webdriver 实例
+    """
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': CAPTURE_HOOK_JS})
+
+
+def read_captured_entries(driver) -> List[Dict]:
+    """
+    读取页面已捕获的原始响应
+
+    Returns:
+        [{'url', 't', 'body'}, ...]，body 为响应原文；Next.js 初始数据的 url 为 __NEXT_DATA__
+    """
+    return driver.execute_script(READ_CAPTURED_JS) or []
+
+
+def read_captured_payloads(driver) -> List:
+    """
+    读取页面已捕获的 JSON 响应
+
+    Returns:
+        [解析后的JSON对象, ...]，按捕获时间先后排列
+    """
+    payloads = []
+    for entry in read_captured_entries(driver):
+        try:
+            payloads.append(json.loads(entry.get('body', '')))
+        except (ValueError, TypeError, AttributeError):
+            continue
+    return payloads
+
+
+# ==================== 字段格式化（与表格文本格式保持一致） ====================
+
+def _num(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _fmt_number(value) -> str:
+    number = _num(value)
+    if number is None:
+        return ''
+    return f"{number:,.6f}".rstrip('0').rstrip('.')
+
+
+def _fmt_usd(value) -> str:
+    number = _num(value)
+    if number is None:
+        return ''
+    return f"-${abs(number):,.2f}" if number < 0 else f"${number:,.2f}"
+
+
+def _fmt_time(value) -> str:
+    """毫秒时间戳 -> "MM-DD HH:MM:SS"（本地时间，与交易表格相同）"""
+    number = _num(value)
+    if number is None:
+        return str(value or '')
+    if number > 1e11:
+        number /= 1000
+    return datetime.fromtimestamp(number).strftime('%m-%d %H:%M:%S')
+
+
+def _side_text(side) -> str:
+    return {'B': '买入', 'A': '卖出'}.get(side, side or '')
+
+
+_TP_PATTERN = re.compile(r'止盈|TAKE\s*PROFIT|\bTP\b')
+_SL_PATTERN = re.compile(r'止损|STOP|TRIGGER|\bSL\b')
+
+
+def tpsl_kind(order_type) -> Optional[str]:
+    """
+    委托类型是否为止盈/止损（条件触发）单
+
+    同时识别表格中的中文类型和 Hyperliquid 原始 orderType（"Stop Market" / "Take Profit Limit" / "Trigger"）
+
+    Returns:
+        '止盈' / '止损'，普通限价/市价委托返回None
+    """
+    text = str(order_type or '').upper()
+    if _TP_PATTERN.search(text):
+        return '止盈'
+    if _SL_PATTERN.search(text):
+        return '止损'
+    return None
+
+
+def _order_type_text(item) -> str:
+    """Hyperliquid 委托 -> 表格中的类型（止盈/止损/限价/市价）"""
+    order_type = str(item.get('orderType') or '')
+    tpsl = str(item.get('tpsl') or '').lower()
+    if tpsl in ('tp', 'sl'):
+        return '止盈' if tpsl == 'tp' else '止损'
+
+    kind = tpsl_kind(order_type)
+    if kind and 'TRIGGER' not in order_type.upper():
+        return kind  # Stop Market / Stop Limit / Take Profit Market / Take Profit Limit
+    if kind or item.get('isTrigger'):
+        # 通用触发单按触发条件判断：卖出单向上触发为止盈、向下触发为止损，买入单相反
+        condition = str(item.get('triggerCondition') or '').lower()
+        above = 'above' in condition or '>' in condition
+        below = 'below' in condition or '<' in condition
+        if above != below:
+            return '止盈' if above == (item.get('side') == 'A') else '止损'
+        return '止损'
+    return '市价' if 'MARKET' in order_type.upper() else '限价'
+
+
+_FILL_DIRECTIONS = {
+    'Open Long': '开多',
+    'Close Long': '平多',
+    'Open Short': '开空',
+    'Close Short': '平空',
+}
+
+
+# ==================== 识别与映射 ====================
+
+def _is_position(item) -> bool:
+    position = item.get('position') if isinstance(item.get('position'), dict) else item
+    return 'szi' in position and 'entryPx' in position
+
+
+def _is_fill(item) -> bool:
+    return {'coin', 'px', 'sz', 'time'} <= item.keys() and ('hash' in item or 'tid' in item)
+
+
+def _is_open_order(item) -> bool:
+    return 'oid' in item and 'coin' in item and ('limitPx' in item or 'triggerPx' in item)
+
+
+def _is_ledger(item) -> bool:
+    delta = item.get('delta')
+    return isinstance(delta, dict) and delta.get('type') in ('deposit', 'withdraw')
+
+
+def _map_position(item) -> Optional[Dict]:
+    position = item.get('position') if isinstance(item.get('position'), dict) else item
+    size = _num(position.get('szi'))
+    if not size:
+        return None
+
+    coin = position.get('coin', '')
+    leverage = position.get('leverage')
+    if isinstance(leverage, dict):
+        leverage = leverage.get('value')
+    funding = position.get('cumFunding')
+    if isinstance(funding, dict):
+        funding = funding.get('sinceOpen')
+
+    return {
+        '代币': coin,
+        '方向': '多' if size > 0 else '空',
+        '杠杆': f"{leverage}x" if leverage not in (None, '') else '',
+        '价值': _fmt_usd(position.get('positionValue')),
+        '数量': f"{_fmt_number(abs(size))} {coin}",
+        '开仓价格': _fmt_usd(position.get('entryPx')),
+        '盈亏(PnL)': _fmt_usd(position.get('unrealizedPnl')),
+        '资金费': _fmt_usd(funding),
+        '爆仓价格': _fmt_usd(position.get('liquidationPx')),
+    }
+
+
+def _map_fill(item) -> Dict:
+    return {
+        '交易哈希': item.get('hash') or str(item.get('tid', '')),
+        '方向': _FILL_DIRECTIONS.get(item.get('dir'), _side_text(item.get('side'))),
+        '时间': _fmt_time(item.get('time')),
+        '盈亏': _fmt_usd(item.get('closedPnl')),
+        '代币': item.get('coin', ''),
+        '价格': _fmt_usd(item.get('px')),
+        '数量': _fmt_number(item.get('sz')),
+        '手续费': _fmt_usd(item.get('fee')),
+    }
+
+
+def _map_open_order(item) -> Dict:
+    order_type = _order_type_text(item)
+    is_trigger = tpsl_kind(order_type) is not None and _num(item.get('triggerPx'))
+    size = item.get('sz')
+    orig_size = _num(item.get('origSz'))
+    filled = orig_size - _num(size) if orig_size is not None and _num(size) is not None else None
+    # 止盈止损单的方向与表格一致，写被保护的持仓方向（卖出平多 -> 多，买入平空 -> 空）
+    if tpsl_kind(order_type):
+        direction = {'A': '多', 'B': '空'}.get(item.get('side'), _side_text(item.get('side')))
+    else:
+        direction = _side_text(item.get('side'))
+    return {
+        '时间': _fmt_time(item.get('timestamp')),
+        '代币': item.get('coin', ''),
+        '类型': order_type,
+        '方向': direction,
+        '数量': _fmt_number(size),
+        '价格': _fmt_usd(item.get('triggerPx') if is_trigger else item.get('limitPx')),
+        '已成交': _fmt_number(filled) if filled is not None else '',
+        '订单ID': str(item.get('oid', '')),
+    }
+
+
+def _map_ledger(item) -> Dict:
+    delta = item['delta']
+    return {
+        '时间': _fmt_time(item.get('time')),
+        '类型': '充值' if delta.get('type') == 'deposit' else '提现',
+        '金额': _fmt_usd(delta.get('usdc') or delta.get('amount')),
+        '代币': delta.get('token', 'USDC'),
+        '交易哈希': item.get('hash', ''),
+        '状态': '',
+    }
+
+
+def _iter_lists(obj, key=None, depth=0):
+    """递归遍历JSON，产出 (父键名, 字典列表)"""
+    if depth > 8:
+        return
+    if isinstance(obj, list):
+        if not obj or isinstance(obj[0], dict):
+            yield key, obj
+        for value in obj:
+            if isinstance(value, (dict, list)):
+                yield from _iter_lists(value, None, depth + 1)
+    elif isinstance(obj, dict):
+        for child_key, value in obj.items():
+            if isinstance(value, (dict, list)):
+                yield from _iter_lists(value, child_key, depth + 1)
+
+
+def map_captured_payloads(payloads: List) -> Dict[str, List[Dict]]:
+    """
+    从捕获的JSON中识别各类数据（同一类以最后捕获的为准）
+
+    Args:
+        payloads: read_captured_payloads 的返回值
+
+    Returns:
+        {data_key: 行列表}，只包含识别到的数据类型
+        data_key 为 positions / trades / open_orders / deposits_withdrawals
+    """
+    found = {}
+
+    for payload in payloads:
+        for key, items in _iter_lists(payload):
+            if not items:
+                # 空持仓列表也是有效数据（大户当前无持仓）
+                if key == 'assetPositions':
+                    found['positions'] = []
+                continue
+
+            sample = items[0]
+            if _is_position(sample):
+                found['positions'] = [row for row in map(_map_position, items) if row]
+            elif _is_fill(sample):
+                found['trades'] = [_map_fill(item) for item in items if _is_fill(item)]
+            elif _is_open_order(sample):
+                found['open_orders'] = [_map_open_order(item) for item in items if _is_open_order(item)]
+            elif _is_ledger(sample):
+                found['deposits_withdrawals'] = [_map_ledger(item) for item in items if _is_ledger(item)]
+
+    return found
+
+
+def extract_captured_tables(driver) -> Dict[str, List[Dict]]:
+    """
+    读取并映射页面捕获的数据
+
+    Returns:
+        {data_key: 行列表}；读取失败或没有识别到数据时返回空字典
+    """
+    start = time.perf_counter()
+    try:
+        found = map_captured_payloads(read_captured_payloads(driver))
+    except Exception as e:
+        print(f"[PageCapture] 读取捕获数据失败: {e}")
+        return {}
+
+    if found:
+        summary = ', '.join(f"{key}={len(rows)}" for key, rows in found.items())
+        print(f"[PageCapture] 捕获数据映射完成 ({summary}), 耗时 {(time.perf_counter() - start) * 1000:.0f}ms")
+    return found
@@ -0,0 +1,427 @@
+"""
+页面快照回放
+把录制的 Coinglass 页面（渲染后的HTML + 捕获的XHR JSON）通过本地HTTP服务回放，
+抓取代码可以离线运行，用于测量抓取耗时、浏览器往返次数，并对解析结果做回归比对
+
+快照目录结构:
+    snapshots/<名称>/
+        manifest.json     {"pages": {路径: html文件}, "xhr": {路径: [json文件, ...]}}
+        *.html / *.json   页面与XHR响应
+        expected/*.json   解析结果基准（bench --update-expected 生成）
+
+录制: 运行主程序时设置 HLM_RECORD_SNAPSHOTS=snapshots/<名称>，打开的列表页/详情页会自动保存
+回放: python page_replay.py serve snapshots/<名称> --port 8765
+      再以 HLM_COINGLASS_BASE_URL=http://127.0.0.1:8765 启动主程序，全部页面请求指向回放服务
+基准: python page_replay.py bench snapshots/<名称> [--repeat 3] [--update-expected]
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from page_capture import read_captured_entries
+
+
+COINGLASS_ORIGIN = 'https://www.coinglass.com'
+MANIFEST_FILE = 'manifest.json'
+XHR_PREFIX = '/__replay/xhr/'
+
+# 回放时去掉页面脚本（保留 Next.js 初始数据），只回放录制时渲染好的DOM
+_SCRIPT_PATTERN = re.compile(r'<script\b(?![^>]*id="__NEXT_DATA__")[^>]*>.*?</script>', re.S | re.I)
+_HEAD_PATTERN = re.compile(r'<head[^>]*>', re.I)
+
+# 回放页加载完成后请求录制的XHR，由页面捕获钩子照常拦截
+_REPLAY_XHR_JS = '''<script>(function () {
+    var urls = %s;
+    window.addEventListener('DOMContentLoaded', function () {
+        urls.forEach(function (url) { fetch(url); });
+    });
+})();</script>'''
+
+
+def _slug(path: str) -> str:
+    """页面路径 -> 文件名"""
+    return re.sub(r'[^A-Za-z0-9]+', '_', path).strip('_') or 'index'
+
+
+def _load_manifest(snapshot_dir: str) -> Dict:
+    try:
+        with open(os.path.join(snapshot_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {}
+    manifest.setdefault('pages', {})
+    manifest.setdefault('xhr', {})
+    return manifest
+
+
+def _save_manifest(snapshot_dir: str, manifest: Dict):
+    with open(os.path.join(snapshot_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+
+# ==================== 录制 ====================
+
+_record_lock = threading.Lock()
+
+
+def save_snapshot(driver, snapshot_dir: str) -> Optional[str]:
+    """
+    保存浏览器当前页面（HTML + 已捕获的XHR响应）到快照目录
+
+    Args:
+        driver: 已打开目标页面的 webdriver（需已注入 page_capture 钩子）
+        snapshot_dir: 快照目录
+
+    Returns:
+        页面路径，保存失败时返回None
+    """
+    try:
+        path = urlsplit(driver.current_url).path or '/'
+        html = driver.page_source
+        entries = [entry for entry in read_captured_entries(driver) if entry.get('url') != '__NEXT_DATA__']
+    except Exception as e:
+        print(f"[PageReplay] 读取页面失败: {e}")
+        return None
+
+    slug = _slug(path)
+    with _record_lock:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        manifest = _load_manifest(snapshot_dir)
+
+        html_file = f"{slug}.html"
+        with open(os.path.join(snapshot_dir, html_file), 'w', encoding='utf-8') as f:
+            f.write(html)
+
+        xhr_files = []
+        for index, entry in enumerate(entries):
+            xhr_file = f"{slug}_xhr{index}.json"
+            with open(os.path.join(snapshot_dir, xhr_file), 'w', encoding='utf-8') as f:
+                f.write(entry.get('body', ''))
+            xhr_files.append(xhr_file)
+
+        manifest['pages'][path] = html_file
+        manifest['xhr'][path] = xhr_files
+        _save_manifest(snapshot_dir, manifest)
+
+    print(f"[PageReplay] 已录制 {path} ({len(xhr_files)} 个XHR) -> {snapshot_dir}")
+    return path
+
+
+# ==================== 回放服务 ====================
+
+class PageReplayServer:
+    """
+    快照回放HTTP服务
+
+    - 录制过的页面返回去掉脚本的HTML，页面中的 Coinglass 绝对地址改写为本服务地址
+    - 页面加载后请求该页录制的XHR（/__replay/xhr/...），由捕获钩子拦截，与线上一致
+    - 未录制的路径返回与线上相同的 nginx 404 页面
+    - latency 为每个请求注入的延迟（秒），模拟网络
+    """
+
+    def __init__(self, snapshot_dir: str, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0):
+        """
+        Args:
+            snapshot_dir: 快照目录
+            host: 监听地址
+            port: 端口，0 表示自动分配
+            latency: 每个请求的延迟（秒）
+        """
+        self.snapshot_dir = snapshot_dir
+        self.manifest = _load_manifest(snapshot_dir)
+        self.latency = latency
+        self.request_counts = Counter()  # {路径: 次数}
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                replay.request_counts[path] += 1
+                if replay.latency:
+                    time.sleep(replay.latency)
+                status, content_type, payload = replay.render(path)
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def pages(self) -> List[str]:
+        return list(self.manifest['pages'])
+
+    def render(self, path: str):
+        """
+        生成响应
+
+        Returns:
+            (状态码, Content-Type, 内容)
+        """
+        if path.startswith(XHR_PREFIX):
+            xhr_file = os.path.basename(path[len(XHR_PREFIX):])
+            try:
+                with open(os.path.join(self.snapshot_dir, xhr_file), 'rb') as f:
+                    return 200, 'application/json', f.read()
+            except OSError:
+                return 404, 'application/json', b'{}'
+
+        html_file = self.manifest['pages'].get(path) or self.manifest['pages'].get(path.rstrip('/'))
+        if not html_file:
+            return 404, 'text/html', b'<html><body><h1>404 Not Found</h1><hr><center>nginx</center></body></html>'
+
+        with open(os.path.join(self.snapshot_dir, html_file), 'r', encoding='utf-8') as f:
+            html = f.read()
+        html = _SCRIPT_PATTERN.sub('', html).replace(COINGLASS_ORIGIN, self.base_url)
+
+        xhr_urls = [XHR_PREFIX + name for name in self.manifest['xhr'].get(path, [])]
+        if xhr_urls:
+            script = _REPLAY_XHR_JS % json.dumps(xhr_urls)
+            html, replaced = _HEAD_PATTERN.subn(lambda m: m.group(0) + script, html, count=1)
+            if not replaced:
+                html = script + html
+        return 200, 'text/html; charset=utf-8', html.encode('utf-8')
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='PageReplayServer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# ==================== 浏览器往返计数 ====================
+
+class CountingElement:
+    """WebElement 代理：每次属性读取/方法调用计为一次浏览器往返"""
+
+    ROUND_TRIP_PROPERTIES = {'text', 'tag_name', 'location', 'size', 'rect'}
+
+    def __init__(self, element, counter: 'CountingDriver'):
+        self._element = element
+        self._counter = counter
+
+    def __getattr__(self, name):
+        value = getattr(self._element, name)
+        if callable(value):
+            def call(*args, **kwargs):
+                self._counter.count(f"element.{name}")
+                return self._counter.wrap(value(*_unwrap(args), **kwargs))
+            return call
+        if name in self.ROUND_TRIP_PROPERTIES:
+            self._counter.count(f"element.{name}")
+        return value
+
+
+class CountingDriver:
+    """
+    WebDriver 代理：统计抓取代码发出的浏览器命令（每条命令是一次 WebDriver 往返）
+
+    查找到的元素同样被代理，元素上的 .text / get_attribute / find_element 等也会计数
+    """
+
+    ROUND_TRIP_PROPERTIES = {'page_source', 'title', 'current_url', 'window_handles', 'current_window_handle'}
+
+    def __init__(self, driver):
+        self._driver = driver
+        self._lock = threading.Lock()
+        self.calls = Counter()  # {命令: 次数}
+
+    @property
+    def round_trips(self) -> int:
+        return sum(self.calls.values())
+
+    def count(self, name: str):
+        with self._lock:
+            self.calls[name] += 1
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+
+    def wrap(self, value):
+        """把返回的 WebElement（或列表）包装为计数代理"""
+        if isinstance(value, list):
+            return [self.wrap(item) for item in value]
+        if hasattr(value, 'find_element') and hasattr(value, 'get_attribute') and not isinstance(value, CountingElement):
+            return CountingElement(value, self)
+        return value
+
+    def __getattr__(self, name):
+        value = getattr(self._driver, name)
+        if callable(value):
+            def call(*args, **kwargs):
+                self.count(name)
+                return self.wrap(value(*_unwrap(args), **kwargs))
+            return call
+        if name in self.ROUND_TRIP_PROPERTIES:
+            self.count(name)
+        return value
+
+
+def _unwrap(args):
+    """传给浏览器的参数（如 execute_script 的元素参数）还原为原始 WebElement"""
+    return tuple(arg._element if isinstance(arg, CountingElement) else arg for arg in args)
+
+
+# ==================== 基准与回归 ====================
+
+def _default_extractor() -> Callable:
+    from hyperliquid_monitor import HyperliquidMonitor
+    # extract_table_data 不依赖实例状态
+    return lambda driver: HyperliquidMonitor.extract_table_data(None, driver)
+
+
+def _wait_for_page(driver, timeout: float = 10.0):
+    from selenium.webdriver.common.by import By
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if driver.find_elements(By.TAG_NAME, 'table') or driver.find_elements(By.CLASS_NAME, 'ant-table-row'):
+            break
+        time.sleep(0.1)
+    time.sleep(0.3)  # 等待回放的XHR被捕获
+
+
+def benchmark_snapshot(
+    snapshot_dir: str,
+    extractor: Optional[Callable] = None,
+    repeat: int = 3,
+    latency: float = 0.0,
+    headless: bool = True,
+    update_expected: bool = False
+) -> List[Dict]:
+    """
+    在回放服务上运行详情页提取，统计耗时和浏览器往返次数，并与解析结果基准比对
+
+    Args:
+        snapshot_dir: 快照目录
+        extractor: 提取函数 extractor(driver) -> dict，默认 HyperliquidMonitor.extract_table_data
+        repeat: 每个页面重复次数
+        latency: 回放服务每个请求的延迟（秒）
+        headless: 是否无头模式
+        update_expected: 把本次解析结果写为新的基准
+
+    Returns:
+        [{'path', 'runs', 'best_ms', 'avg_ms', 'round_trips', 'calls', 'rows', 'mismatches'}]
+        mismatches 为与基准不一致的数据类型列表，None 表示没有基准
+    """
+    from browser_sessions import create_chrome_driver
+
+    extractor = extractor or _default_extractor()
+    server = PageReplayServer(snapshot_dir, latency=latency)
+    server.start()
+    driver = create_chrome_driver(headless=headless)
+    counting = CountingDriver(driver)
+    expected_dir = os.path.join(snapshot_dir, 'expected')
+    results = []
+
+    try:
+        # 只对详情页（地址页面）做提取
+        for path in [p for p in server.pages() if re.search(r'0x[a-fA-F0-9]{40}', p)]:
+            durations = []
+            data = {}
+            for _ in range(repeat):
+                driver.get(server.base_url + path)
+                _wait_for_page(driver)
+                counting.reset()
+                start = time.perf_counter()
+                data = extractor(counting)
+                durations.append((time.perf_counter() - start) * 1000)
+
+            expected_file = os.path.join(expected_dir, f"{_slug(path)}.json")
+            mismatches = None
+            if update_expected:
+                os.makedirs(expected_dir, exist_ok=True)
+                with open(expected_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+            elif os.path.exists(expected_file):
+                with open(expected_file, 'r', encoding='utf-8') as f:
+                    expected = json.load(f)
+                mismatches = [key for key in sorted(set(expected) | set(data)) if expected.get(key) != data.get(key)]
+
+            results.append({
+                'path': path,
+                'runs': repeat,
+                'best_ms': min(durations),
+                'avg_ms': sum(durations) / len(durations),
+                'round_trips': counting.round_trips,
+                'calls': dict(counting.calls),
+                'rows': {key: len(rows) for key, rows in data.items()},
+                'mismatches': mismatches,
+            })
+    finally:
+        driver.quit()
+        server.stop()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coinglass 页面快照回放")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve = sub.add_parser('serve', help="启动回放服务")
+    serve.add_argument('snapshot_dir')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency', type=float, default=0.0, help="每个请求的延迟（秒）")
+
+    bench = sub.add_parser('bench', help="详情页提取基准与回归比对")
+    bench.add_argument('snapshot_dir')
+    bench.add_argument('--repeat', type=int, default=3)
+    bench.add_argument('--latency', type=float, default=0.0)
+    bench.add_argument('--show', action='store_true', help="显示浏览器窗口")
+    bench.add_argument('--update-expected', action='store_true', help="把本次解析结果写为基准")
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server = PageReplayServer(args.snapshot_dir, port=args.port, latency=args.latency)
+        server.start()
+        print(f"回放服务: {server.base_url} ({len(server.pages())} 个页面)")
+        print(f"启动主程序前设置 HLM_COINGLASS_BASE_URL={server.base_url}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.stop()
+        return
+
+    results = benchmark_snapshot(args.snapshot_dir, repeat=args.repeat, latency=args.latency,
+                                 headless=not args.show, update_expected=args.update_expected)
+    failed = False
+    for result in results:
+        if result['mismatches'] is None:
+            check = "已更新基准" if args.update_expected else "无基准"
+        elif result['mismatches']:
+            check = "✗ 不一致: " + ", ".join(result['mismatches'])
+            failed = True
+        else:
+            check = "✓ 与基准一致"
+        rows = ", ".join(f"{key}={count}" for key, count in result['rows'].items())
+        print(f"{result['path']}\n  耗时 最佳 {result['best_ms']:.0f}ms / 平均 {result['avg_ms']:.0f}ms, "
+              f"浏览器往返 {result['round_trips']} 次, {rows}\n  {check}")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+大户轮询调度
+按每个大户的交易/委托活跃度和持仓规模自适应调整轮询间隔，
+并限制全局每分钟的抓取次数：活跃大户检查更频繁，总浏览器负载不变
+"""
+
+import heapq
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+
+class TraderPollScheduler:
+    """
+    大户轮询调度器
+
+    - 优先队列保存每个大户的下次轮询时间（堆 + 版本号惰性删除）
+    - record_poll(): 每次抓取后根据新事件数和持仓价值计算下次间隔
+        活跃度：每分钟新事件数的指数移动平均，越活跃间隔越短
+        持仓规模：持仓价值越大间隔越短（$1000万为基准）
+        无新事件时间隔逐步放大（IDLE_BACKOFF），直到 max_interval（同样按持仓规模缩短）
+    - due(): 取出已到期的大户，受每分钟抓取预算限制，超出预算的留到下一轮（仍按到期先后）
+
+    线程安全：主循环调用 sync/due，流水线工作线程调用 record_poll
+    """
+
+    IDLE_BACKOFF = 1.5  # 无新事件时的间隔放大倍数
+    ACTIVITY_WEIGHT = 1.0  # 活跃度权重（每分钟1个事件 -> 间隔减半）
+    EWMA_ALPHA = 0.3  # 活跃度平滑系数
+    SIZE_BASELINE = 10_000_000  # 持仓价值基准（美元）
+
+    def __init__(
+        self,
+        base_interval: float = 60,
+        min_interval: float = 10,
+        max_interval: float = 300,
+        max_scrapes_per_minute: int = 30
+    ):
+        """
+        初始化调度器
+
+        Args:
+            base_interval: 基准轮询间隔（秒），新加入的大户立即轮询一次，之后从该间隔开始调整
+            min_interval: 最短轮询间隔（秒）
+            max_interval: 最长轮询间隔（秒）
+            max_scrapes_per_minute: 全局每分钟最多抓取次数
+        """
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_scrapes_per_minute = max_scrapes_per_minute
+
+        self._heap = []  # [(next_poll_at, version, trader_address)]
+        self._state = {}  # {trader_address: {'next_poll_at', 'interval', 'rate', 'last_poll_at', 'version'}}
+        self._scrape_times = deque()  # 最近60秒内的抓取时间
+        self._lock = threading.RLock()
+
+    # ==================== 大户集合 ====================
+
+    def add(self, trader_address: str, now: Optional[float] = None):
+        """加入大户（立即到期）"""
+        with self._lock:
+            if trader_address in self._state:
+                return
+            now = time.time() if now is None else now
+            self._state[trader_address] = {
+                'next_poll_at': now,
+                'interval': self.base_interval,
+                'rate': 0.0,
+                'last_poll_at': None,
+                'version': 0,
+            }
+            heapq.heappush(self._heap, (now, 0, trader_address))
+
+    def remove(self, trader_address: str):
+        """移除大户（堆中的旧条目在弹出时丢弃）"""
+        with self._lock:
+            self._state.pop(trader_address, None)
+
+    def sync(self, trader_addresses: Iterable[str], now: Optional[float] = None):
+        """
+        与当前跟随的大户集合同步
+
+        Args:
+            trader_addresses: 当前活跃的大户地址
+        """
+        wanted = set(trader_addresses)
+        with self._lock:
+            for trader_address in list(self._state):
+                if trader_address not in wanted:
+                    self.remove(trader_address)
+            for trader_address in wanted:
+                self.add(trader_address, now)
+
+    def __len__(self):
+        return len(self._state)
+
+    # ==================== 调度 ====================
+
+    def _schedule(self, trader_address, next_poll_at):
+        state = self._state[trader_address]
+        state['version'] += 1
+        state['next_poll_at'] = next_poll_at
+        heapq.heappush(self._heap, (next_poll_at, state['version'], trader_address))
+
+    def _budget_left(self, now) -> int:
+        while self._scrape_times and now - self._scrape_times[0] >= 60:
+            self._scrape_times.popleft()
+        return self.max_scrapes_per_minute - len(self._scrape_times)
+
+    def due(self, now: Optional[float] = None, exclude: Iterable[str] = ()) -> List[str]:
+        """
+        取出已到期且在抓取预算内的大户（按到期先后）
+
+        Args:
+            exclude: 仍在处理中的大户（本轮跳过，顺延一个间隔）
+
+        Returns:
+            本轮应抓取的大户地址列表
+        """
+        with self._lock:
+            return self._due_locked(time.time() if now is None else now, set(exclude))
+
+    def _due_locked(self, now, exclude):
+        budget = self._budget_left(now)
+        selected = []
+        deferred = []
+
+        while self._heap and self._heap[0][0] <= now:
+            next_poll_at, version, trader_address = self._heap[0]
+            state = self._state.get(trader_address)
+            if state is None or state['version'] != version:
+                heapq.heappop(self._heap)  # 已移除/已重新调度的旧条目
+                continue
+            if trader_address in exclude:
+                heapq.heappop(self._heap)  # 仍在处理中，循环结束后顺延
+                deferred.append(trader_address)
+                continue
+            if len(selected) >= budget:
+                break
+            heapq.heappop(self._heap)
+            selected.append(trader_address)
+            self._scrape_times.append(now)
+
+        # 被选中的大户在 record_poll 之前不会再次到期；处理中的大户顺延一个间隔。
+        # 不只依赖 record_poll：任务在流水线中丢失时，大户到期后仍会被重新选中
+        for trader_address in selected + deferred:
+            self._schedule(trader_address, now + self._state[trader_address]['interval'])
+
+        if self._heap and self._heap[0][0] <= now and len(selected) >= budget:
+            waiting = sum(1 for state in self._state.values() if state['next_poll_at'] <= now)
+            print(f"[PollScheduler] 已达抓取预算({self.max_scrapes_per_minute}/分钟)，{waiting} 个大户顺延")
+
+        return selected
+
+    def record_poll(self, trader_address: str, new_events: int, position_value: float = 0,
+                    now: Optional[float] = None) -> Optional[float]:
+        """
+        记录一次抓取结果并安排下次轮询
+
+        Args:
+            trader_address: 大户地址
+            new_events: 本次检测到的新委托+新交易数量
+            position_value: 大户持仓总价值（美元）
+
+        Returns:
+            新的轮询间隔（秒），大户不在调度中时返回None
+        """
+        with self._lock:
+            state = self._state.get(trader_address)
+            if state is None:
+                return None
+            return self._record_poll_locked(state, trader_address, new_events, position_value,
+                                            time.time() if now is None else now)
+
+    def _record_poll_locked(self, state, trader_address, new_events, position_value, now):
+        elapsed_min = max((now - state['last_poll_at']) / 60, 1 / 60) if state['last_poll_at'] else self.base_interval / 60
+        rate = new_events / elapsed_min
+        state['rate'] = self.EWMA_ALPHA * rate + (1 - self.EWMA_ALPHA) * state['rate']
+        state['last_poll_at'] = now
+
+        size_factor = 1 + 0.5 * max(0.0, math.log10(max(position_value, 1) / self.SIZE_BASELINE))
+        target = self.base_interval / (1 + self.ACTIVITY_WEIGHT * state['rate']) / size_factor
+
+        if new_events == 0:
+            # 安静的大户逐步放慢（不短于活跃度算出的目标间隔）
+            target = max(target, state['interval'] * self.IDLE_BACKOFF)
+
+        # 持仓越大，最长间隔也越短
+        interval = min(max(target, self.min_interval), self.max_interval / size_factor)
+        state['interval'] = interval
+        self._schedule(trader_address, now + interval)
+        return interval
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """各大户当前的间隔、活跃度和下次轮询时间（用于显示/调试）"""
+        with self._lock:
+            return {addr: {'interval': state['interval'], 'rate': state['rate'],
+                           'next_poll_at': state['next_poll_at']}
+                    for addr, state in self._state.items()}
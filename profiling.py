@@ -0,0 +1,237 @@
+"""
+轻量性能分析
+按子系统记录耗时（上下文管理器 / 装饰器）和计数器，最近的耗时片段保存在环形缓冲区，
+可汇总最近 N 分钟各子系统的耗时分布；可选开启 cProfile 做函数级分析
+
+用法:
+    from profiling import profiler
+
+    with profiler.span('scrape', 'extract_table_data'):
+        ...
+
+    @profiler.timed('okx')
+    def refresh_okx_orders(self): ...
+
+    profiler.count('okx', 'requests')
+"""
+
+import cProfile
+import functools
+import io
+import math
+import pstats
+import threading
+import time
+from collections import deque, defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class Profiler:
+    """
+    子系统耗时/计数器
+
+    - span(): 上下文管理器，记录 (子系统, 名称, 开始时间, 耗时, 线程名, 是否异常)
+    - timed(): 装饰器，名称默认取函数的 __qualname__
+    - count(): 累加计数器
+    - summary(window): 最近 window 秒内按 (子系统, 名称) 汇总次数/总耗时/平均/P90/最大
+    - start_cprofile() / stop_cprofile(): 开关 cProfile（分析调用开关的线程）
+    """
+
+    def __init__(self, capacity: int = 20000, enabled: bool = True):
+        """
+        初始化
+
+        Args:
+            capacity: 环形缓冲区保存的最近片段数
+            enabled: 是否记录（关闭时 span/timed 几乎无开销）
+        """
+        self.enabled = enabled
+        self._spans = deque(maxlen=capacity)  # [(subsystem, name, started_at, duration, thread, failed)]
+        self._counters = defaultdict(int)  # {(subsystem, name): 次数}
+        self._lock = threading.Lock()
+        self._cprofile = None
+
+    # ==================== 记录 ====================
+
+    @contextmanager
+    def span(self, subsystem: str, name: str):
+        """
+        记录一段代码的耗时
+
+        Args:
+            subsystem: 子系统，如 scrape / okx / copy / ui
+            name: 片段名称
+        """
+        if not self.enabled:
+            yield
+            return
+
+        started_at = time.time()
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._spans.append((subsystem, name, started_at, time.perf_counter() - start,
+                                threading.current_thread().name, failed))
+
+    def timed(self, subsystem: str, name: Optional[str] = None):
+        """
+        耗时记录装饰器
+
+        Args:
+            subsystem: 子系统
+            name: 片段名称，默认函数的 __qualname__
+        """
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(subsystem, span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, subsystem: str, name: str, n: int = 1):
+        """累加计数器"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[(subsystem, name)] += n
+
+    def counters(self) -> Dict[tuple, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        """清空片段和计数器"""
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    # ==================== 汇总 ====================
+
+    def summary(self, window: float = 600) -> List[Dict]:
+        """
+        汇总最近 window 秒内的耗时
+
+        Returns:
+            按总耗时降序的列表:
+            [{'subsystem', 'name', 'count', 'errors', 'total', 'avg', 'p90', 'max'}]（时间单位: 秒）
+        """
+        since = time.time() - window
+        groups = defaultdict(list)
+        errors = defaultdict(int)
+        for subsystem, name, started_at, duration, _, failed in list(self._spans):
+            if started_at < since:
+                continue
+            groups[(subsystem, name)].append(duration)
+            if failed:
+                errors[(subsystem, name)] += 1
+
+        rows = []
+        for (subsystem, name), durations in groups.items():
+            durations.sort()
+            total = sum(durations)
+            rows.append({
+                'subsystem': subsystem,
+                'name': name,
+                'count': len(durations),
+                'errors': errors[(subsystem, name)],
+                'total': total,
+                'avg': total / len(durations),
+                'p90': durations[max(math.ceil(0.9 * len(durations)), 1) - 1],
+                'max': durations[-1],
+            })
+        rows.sort(key=lambda row: row['total'], reverse=True)
+        return rows
+
+    def subsystem_totals(self, window: float = 600) -> Dict[str, float]:
+        """最近 window 秒内各子系统的总耗时（秒）"""
+        totals = defaultdict(float)
+        for row in self.summary(window):
+            totals[row['subsystem']] += row['total']
+        return dict(totals)
+
+    def report(self, window: float = 600) -> str:
+        """
+        文本报告（用于界面面板或日志）
+
+        Args:
+            window: 统计窗口（秒）
+        """
+        lines = [f"===== 最近 {window / 60:.0f} 分钟耗时 ====="]
+
+        totals = self.subsystem_totals(window)
+        if totals:
+            lines.append("子系统合计: " + ", ".join(
+                f"{subsystem} {total:.1f}s" for subsystem, total in sorted(totals.items(), key=lambda x: -x[1])))
+        lines.append("")
+        lines.append(f"{'子系统':<8} {'名称':<42} {'次数':>6} {'总计':>8} {'平均':>8} {'P90':>8} {'最大':>8}")
+
+        for row in self.summary(window):
+            lines.append(
+                f"{row['subsystem']:<8} {row['name'][:42]:<42} {row['count']:>6} "
+                f"{row['total']:>7.2f}s {row['avg'] * 1000:>6.0f}ms {row['p90'] * 1000:>6.0f}ms "
+                f"{row['max'] * 1000:>6.0f}ms" + (f"  (失败 {row['errors']})" if row['errors'] else "")
+            )
+
+        counters = self.counters()
+        if counters:
+            lines.append("")
+            lines.append("计数器:")
+            for (subsystem, name), value in sorted(counters.items()):
+                lines.append(f"  {subsystem}.{name}: {value}")
+
+        if self.cprofile_running:
+            lines.append("")
+            lines.append("cProfile: 运行中")
+
+        return "\n".join(lines)
+
+    # ==================== cProfile ====================
+
+    @property
+    def cprofile_running(self) -> bool:
+        return self._cprofile is not None
+
+    def start_cprofile(self):
+        """开启 cProfile（只分析调用该方法的线程，通常是Tk主线程）"""
+        if self._cprofile is not None:
+            return
+        self._cprofile = cProfile.Profile()
+        self._cprofile.enable()
+
+    def stop_cprofile(self, output_file: Optional[str] = None, top: int = 40) -> str:
+        """
+        停止 cProfile
+
+        Args:
+            output_file: 保存原始统计数据的文件（可用 snakeviz 等工具查看），None 不保存
+            top: 文本报告中列出的函数数量
+
+        Returns:
+            按累计耗时排序的文本报告
+        """
+        if self._cprofile is None:
+            return ""
+        self._cprofile.disable()
+        profile, self._cprofile = self._cprofile, None
+
+        if output_file:
+            profile.dump_stats(output_file)
+
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(top)
+        return stream.getvalue()
+
+
+# 全局实例
+profiler = Profiler()
@@ -0,0 +1,219 @@
+"""
+刷新任务调度（single-flight）
+同一名称的刷新任务同时只运行一个：新请求与进行中的任务条件相同时加入（不再启动新线程），
+条件不同或要求最新数据时取代（取消旧任务），超时的任务被取消并释放名额。
+
+任务函数的第一个参数是 CancelToken，应在耗时步骤之间检查 token.cancelled
+（或调用 token.check()），取消后不再更新界面；阻塞在外部资源上的任务可以用
+token.on_cancel() 注册清理回调（如关闭浏览器）使阻塞调用尽快返回
+
+用法:
+    from refresh_jobs import RefreshJobs
+
+    jobs = RefreshJobs()
+    jobs.submit('okx_positions', fetch_positions, timeout=30)                  # 进行中则加入
+    jobs.submit('okx_positions', fetch_positions, timeout=30, supersede=True)  # 取消旧任务，重新获取
+"""
+
+import threading
+import time
+from typing import Callable, Hashable, Optional
+
+from app_logging import get_logger
+
+
+log = get_logger('jobs')
+
+
+class JobCancelled(Exception):
+    """任务已被取消（被新请求取代或超时）"""
+
+
+class CancelToken:
+    """一次刷新任务的取消令牌"""
+
+    def __init__(self, name: str, key: Hashable = None, timeout: Optional[float] = None):
+        """
+        Args:
+            name: 任务名称
+            key: 请求条件（相同条件的请求加入进行中的任务）
+            timeout: 超时秒数，None 表示不超时
+        """
+        self.name = name
+        self.key = key
+        self.started_at = time.monotonic()
+        self.deadline = None if timeout is None else self.started_at + timeout
+        self.reason = None  # 取消原因: 'superseded' / 'timeout' / 'shutdown'
+        self.joined = 0  # 加入本任务的后续请求数
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._callbacks = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def cancel(self, reason: str = 'cancelled'):
+        """
+        取消任务（任意线程可调用，重复调用无效）
+
+        清理回调在单独的线程执行，不阻塞调用方（如Tk线程）
+        """
+        with self._lock:
+            if self._cancelled.is_set() or self._done.is_set():
+                return
+            self.reason = reason
+            self._cancelled.set()
+            callbacks, self._callbacks = self._callbacks, []
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        if callbacks:
+            thread = threading.Thread(target=self._run_callbacks, args=(callbacks,), name=f"cancel-{self.name}")
+            thread.daemon = True
+            thread.start()
+
+    def _run_callbacks(self, callbacks):
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                log.warning("任务 %s 取消回调失败: %s", self.name, e)
+
+    def _finish(self):
+        """任务结束: 不再执行清理回调，停止超时定时器"""
+        with self._lock:
+            self._done.set()
+            self._callbacks = []
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def on_cancel(self, callback: Callable[[], None]):
+        """注册取消时执行的回调（已取消则立即执行）"""
+        with self._lock:
+            if self._done.is_set():
+                return
+            if not self._cancelled.is_set():
+                self._callbacks.append(callback)
+                return
+        self._run_callbacks([callback])
+
+    def check(self):
+        """已取消时抛出 JobCancelled"""
+        if self._cancelled.is_set():
+            raise JobCancelled(f"{self.name}: {self.reason}")
+
+    def wait(self, seconds: float) -> bool:
+        """
+        可取消的 sleep
+
+        Returns:
+            True 表示等待期间被取消
+        """
+        return self._cancelled.wait(seconds)
+
+
+class RefreshJobs:
+    """按名称 single-flight 的后台刷新任务"""
+
+    def __init__(self):
+        self._jobs = {}  # {名称: CancelToken} 进行中的任务
+        self._lock = threading.Lock()
+        self.stats = {'started': 0, 'joined': 0, 'superseded': 0, 'timed_out': 0}
+
+    def running(self, name: str) -> Optional[CancelToken]:
+        """进行中（未取消）的任务令牌，没有则返回None"""
+        with self._lock:
+            token = self._jobs.get(name)
+        return token if token is not None and not token.cancelled else None
+
+    def submit(self, name: str, func: Callable, *args, key: Hashable = None, supersede: bool = False,
+               timeout: Optional[float] = None, **kwargs) -> CancelToken:
+        """
+        请求运行任务 func(token, *args, **kwargs)
+
+        Args:
+            name: 任务名称（同名任务同时只运行一个）
+            func: 任务函数（在后台线程执行）
+            key: 请求条件，与进行中任务的 key 不同时取代旧任务
+            supersede: 总是取消进行中的任务并重新运行（需要最新数据时使用）
+            timeout: 超时秒数，超时后取消令牌并释放名额
+
+        Returns:
+            本次请求对应的令牌（加入时为进行中任务的令牌）
+        """
+        with self._lock:
+            current = self._jobs.get(name)
+            if current is not None and not current.cancelled:
+                if current.expired:
+                    self._expire(current)
+                elif supersede or current.key != key:
+                    self.stats['superseded'] += 1
+                    current.cancel('superseded')
+                else:
+                    current.joined += 1
+                    self.stats['joined'] += 1
+                    return current
+
+            token = CancelToken(name, key, timeout)
+            self._jobs[name] = token
+            self.stats['started'] += 1
+
+        if timeout is not None:
+            timer = threading.Timer(timeout, self._on_timeout, args=(token,))
+            timer.daemon = True
+            token._timer = timer
+            timer.start()
+
+        thread = threading.Thread(target=self._run, args=(token, func, args, kwargs), name=f"job-{name}")
+        thread.daemon = True
+        thread.start()
+        return token
+
+    def cancel(self, name: str, reason: str = 'cancelled'):
+        token = self.running(name)
+        if token is not None:
+            token.cancel(reason)
+
+    def shutdown(self):
+        """取消所有进行中的任务"""
+        with self._lock:
+            tokens = list(self._jobs.values())
+        for token in tokens:
+            token.cancel('shutdown')
+
+    def _run(self, token: CancelToken, func: Callable, args, kwargs):
+        try:
+            func(token, *args, **kwargs)
+        except JobCancelled:
+            log.info("任务 %s 已取消（%s）", token.name, token.reason)
+        except Exception as e:
+            log.exception("任务 %s 失败: %s", token.name, e)
+        finally:
+            token._finish()
+            with self._lock:
+                if self._jobs.get(token.name) is token:
+                    del self._jobs[token.name]
+
+    def _on_timeout(self, token: CancelToken):
+        with self._lock:
+            if not token.done and not token.cancelled:
+                self._expire(token)
+
+    def _expire(self, token: CancelToken):
+        """调用方持有 self._lock"""
+        self.stats['timed_out'] += 1
+        elapsed = time.monotonic() - token.started_at
+        log.warning("任务 %s 运行 %.0f 秒超时，已取消", token.name, elapsed)
+        token.cancel('timeout')
@@ -0,0 +1,127 @@
+"""
+主表格增量比对
+每次抓取后按 (大户地址, 币种) 把表格行与上一次快照比对，得到新增/移除/变化的行，
+下游（表格显示、新大户发现）只处理变化的部分
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+# 主表格列索引（与 HyperliquidMonitor.filter_table_rows 一致）
+ADDRESS_COLUMN = 2
+COIN_COLUMN = 3
+
+RowKey = Tuple[str, str, int]  # (地址, 币种, 同一地址同一币种的序号)
+
+
+def row_identity(row: List[str]) -> Optional[Tuple[str, str]]:
+    """
+    行的身份（地址, 币种），不是数据行时返回None
+
+    Args:
+        row: 表格行（单元格文本列表）
+    """
+    if len(row) <= COIN_COLUMN:
+        return None
+    address = str(row[ADDRESS_COLUMN]).split('\n')[0].strip()
+    if not address:
+        return None
+    coin_parts = str(row[COIN_COLUMN]).split()
+    return address, coin_parts[0].upper() if coin_parts else ''
+
+
+def index_rows(tables_data: List[List[List[str]]]) -> Dict[RowKey, Tuple[str, ...]]:
+    """
+    按 key 索引所有表格的数据行（跳过各表格的表头）
+
+    Returns:
+        {(地址, 币种, 序号): 行}，保持表格中的顺序
+    """
+    rows = {}
+    seen = {}
+    for table in tables_data or []:
+        for row in table[1:]:
+            identity = row_identity(row)
+            if identity is None:
+                continue
+            occurrence = seen.get(identity, 0)
+            seen[identity] = occurrence + 1
+            rows[identity + (occurrence,)] = tuple(row)
+    return rows
+
+
+class TableDelta:
+    """一次抓取相对上一次快照的变化"""
+
+    def __init__(self, added: Dict, removed: Dict, changed: Dict, unchanged: int, initial: bool = False):
+        """
+        Args:
+            added: {key: 行} 新出现的行
+            removed: {key: 行} 消失的行
+            changed: {key: 行} 内容变化的行（新内容）
+            unchanged: 未变化的行数
+            initial: 是否是第一次快照（此时所有行都是新增）
+        """
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.unchanged = unchanged
+        self.initial = initial
+
+    @property
+    def change_count(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def __bool__(self) -> bool:
+        return self.change_count > 0
+
+    def added_addresses(self) -> List[str]:
+        """新出现的地址（按表格顺序去重）"""
+        return list(dict.fromkeys(key[0] for key in self.added))
+
+    def summary(self) -> str:
+        return (f"新增 {len(self.added)}, 移除 {len(self.removed)}, "
+                f"变化 {len(self.changed)}, 未变 {self.unchanged}")
+
+
+class TableDiffer:
+    """保存上一次的表格快照，每次抓取后计算增量"""
+
+    def __init__(self):
+        self._rows = {}  # {key: 行}
+        self._has_snapshot = False
+
+    @property
+    def rows(self) -> Dict[RowKey, Tuple[str, ...]]:
+        return self._rows
+
+    def update(self, tables_data: List[List[List[str]]]) -> TableDelta:
+        """
+        用新抓取的表格替换快照，返回变化
+
+        Args:
+            tables_data: 本次抓取的表格数据
+        """
+        current = index_rows(tables_data)
+        previous = self._rows
+
+        added, changed = {}, {}
+        unchanged = 0
+        for key, row in current.items():
+            old = previous.get(key)
+            if old is None:
+                added[key] = row
+            elif old != row:
+                changed[key] = row
+            else:
+                unchanged += 1
+        removed = {key: row for key, row in previous.items() if key not in current}
+
+        delta = TableDelta(added, removed, changed, unchanged, initial=not self._has_snapshot)
+        self._rows = current
+        self._has_snapshot = True
+        return delta
+
+    def reset(self):
+        self._rows = {}
+        self._has_snapshot = False
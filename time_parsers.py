@@ -0,0 +1,125 @@
+"""
+页面时间解析
+Coinglass 页面上的时间没有年份：开仓时间 "HH:MM MM-DD"、成交/委托时间 "MM-DD HH:MM:SS"。
+这里统一解析为 epoch 秒（整数，比较成本低）：
+
+- 同一批数据共用一个参考时间（TimeBatch），不再每行调用 datetime.now()
+- 年份取不晚于参考时间的最近一次（允许 FUTURE_TOLERANCE 秒的时钟偏差），跨年时正确回到上一年
+- 解析结果按 (文本, 参考年份) 缓存，同一文本每轮只解析一次
+
+用法:
+    from time_parsers import TimeBatch
+
+    batch = TimeBatch()                        # 一轮数据一个
+    opened = batch.open_time("08:18 05-09")    # epoch 秒，无法解析返回None
+    days = batch.days_ago(opened)
+"""
+
+import re
+import time
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+# 允许页面时间比本机时间超前的秒数（超过则认为是上一年的时间）
+FUTURE_TOLERANCE = 86400
+
+CACHE_SIZE = 8192
+
+# "HH:MM MM-DD"
+_OPEN_TIME_PATTERN = re.compile(r'(\d{1,2}):(\d{2})\s+(\d{1,2})-(\d{1,2})')
+# "MM-DD HH:MM:SS"（秒可省略）
+_TRADE_TIME_PATTERN = re.compile(r'(\d{1,2})-(\d{1,2})\s+(\d{1,2}):(\d{2})(?::(\d{2}))?')
+
+
+def _local_epoch(year: int, month: int, day: int, hour: int, minute: int, second: int) -> Optional[int]:
+    """本地时间 -> epoch 秒，日期无效（如非闰年的2月29日）返回None"""
+    try:
+        struct = time.struct_time((year, month, day, hour, minute, second, 0, 0, -1))
+        epoch = int(time.mktime(struct))
+    except (OverflowError, ValueError):
+        return None
+    # mktime 会把无效日期顺延（2-30 -> 3-2），顺延后的视为无效
+    parsed = time.localtime(epoch)
+    if (parsed.tm_mon, parsed.tm_mday) != (month, day):
+        return None
+    return epoch
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _candidates(text: str, is_open_time: bool, year: int) -> Tuple[int, ...]:
+    """
+    文本在 year+1 / year / year-1 三个年份下的 epoch（从新到旧，跳过无效日期）
+    """
+    if is_open_time:
+        match = _OPEN_TIME_PATTERN.search(text)
+        if not match:
+            return ()
+        hour, minute, month, day = (int(group) for group in match.groups())
+        second = 0
+    else:
+        match = _TRADE_TIME_PATTERN.search(text)
+        if not match:
+            return ()
+        month, day, hour, minute = (int(group) for group in match.groups()[:4])
+        second = int(match.group(5) or 0)
+
+    if not (1 <= month <= 12 and 1 <= day <= 31 and hour < 24 and minute < 60 and second < 60):
+        return ()
+
+    epochs = (_local_epoch(y, month, day, hour, minute, second) for y in (year + 1, year, year - 1))
+    return tuple(epoch for epoch in epochs if epoch is not None)
+
+
+class TimeBatch:
+    """一批时间解析共用的参考时间（一轮刷新/一次比对创建一个）"""
+
+    def __init__(self, now: Optional[float] = None):
+        """
+        Args:
+            now: 参考时间（epoch 秒），默认当前时间
+        """
+        self.now = int(time.time() if now is None else now)
+        self.year = time.localtime(self.now).tm_year
+        self._latest = self.now + FUTURE_TOLERANCE
+
+    def _resolve(self, text, is_open_time: bool) -> Optional[int]:
+        if not text or not isinstance(text, str):
+            return None
+        for epoch in _candidates(text, is_open_time, self.year):
+            if epoch <= self._latest:
+                return epoch
+        return None
+
+    def open_time(self, text: str) -> Optional[int]:
+        """开仓时间 "HH:MM MM-DD" -> epoch 秒"""
+        return self._resolve(text, True)
+
+    def trade_time(self, text: str) -> Optional[int]:
+        """成交/委托时间 "MM-DD HH:MM:SS" -> epoch 秒"""
+        return self._resolve(text, False)
+
+    def days_ago(self, epoch: Optional[int], default: int = 999) -> int:
+        """距参考时间的整天数（epoch 为None时返回 default）"""
+        if epoch is None:
+            return default
+        return (self.now - epoch) // 86400
+
+
+def parse_open_time(text: str, now: Optional[float] = None) -> Optional[int]:
+    """单条开仓时间解析（批量解析请使用 TimeBatch）"""
+    return TimeBatch(now).open_time(text)
+
+
+def parse_trade_time(text: str, now: Optional[float] = None) -> Optional[int]:
+    """单条成交/委托时间解析（批量解析请使用 TimeBatch）"""
+    return TimeBatch(now).trade_time(text)
+
+
+def cache_info():
+    """解析缓存命中统计"""
+    return _candidates.cache_info()
+
+
+def clear_cache():
+    _candidates.cache_clear()
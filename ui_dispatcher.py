@@ -0,0 +1,126 @@
+"""
+Tk界面调度器
+Tk 不是线程安全的：工作线程不能直接修改控件，也不应调用 root.update_idletasks()。
+工作线程通过 post()/post_latest() 把界面更新放入线程安全队列，
+由Tk主循环按固定间隔批量执行；状态栏这类只关心最新值的更新按 key 合并，
+连续刷新时队列不会堆积，界面保持响应
+
+用法:
+    from ui_dispatcher import UIDispatcher
+
+    ui = UIDispatcher(root)                           # 在Tk线程创建并启动
+    ui.post(self.update_display)                      # 工作线程: 按顺序执行
+    ui.post_latest('status', label.config, text=msg)  # 工作线程: 同一key只执行最新一次
+"""
+
+import queue
+import threading
+from typing import Callable, Hashable, Optional
+
+from app_logging import get_logger
+
+
+log = get_logger('ui')
+
+
+class UIDispatcher:
+    """工作线程 -> Tk主循环的界面更新队列"""
+
+    def __init__(self, root, interval_ms: int = 50, max_per_tick: int = 200, autostart: bool = True):
+        """
+        Args:
+            root: Tk根窗口
+            interval_ms: 队列排空间隔（毫秒）
+            max_per_tick: 每次最多执行的更新数（超出部分留到下一次，避免长时间占用Tk线程）
+            autostart: 是否立即开始排空队列（需在Tk线程创建）
+        """
+        self.root = root
+        self.interval_ms = interval_ms
+        self.max_per_tick = max_per_tick
+        self._queue = queue.SimpleQueue()
+        self._latest = {}  # {key: (func, args, kwargs)} 合并中的最新更新
+        self._latest_lock = threading.Lock()
+        self._ui_thread = threading.current_thread()
+        self._after_id = None
+        self.coalesced = 0  # 被合并掉的更新数
+        if autostart:
+            self.start()
+
+    def is_ui_thread(self) -> bool:
+        return threading.current_thread() is self._ui_thread
+
+    def post(self, func: Callable, *args, **kwargs):
+        """在Tk线程按提交顺序执行 func(*args, **kwargs)（任意线程可调用）"""
+        self._queue.put((None, func, args, kwargs))
+
+    def post_latest(self, key: Hashable, func: Callable, *args, **kwargs):
+        """
+        合并提交: 执行前同一 key 的多次提交只保留最后一次
+
+        在队列中的位置以第一次提交为准，执行的是最新的参数
+        """
+        with self._latest_lock:
+            pending = key in self._latest
+            if pending:
+                self.coalesced += 1
+            self._latest[key] = (func, args, kwargs)
+        if not pending:
+            self._queue.put((key, None, None, None))
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Tk线程中直接执行，其他线程转为 post()"""
+        if self.is_ui_thread():
+            return func(*args, **kwargs)
+        self.post(func, *args, **kwargs)
+        return None
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def drain(self, limit: Optional[int] = None) -> int:
+        """
+        执行队列中的更新（Tk线程调用）
+
+        Args:
+            limit: 最多执行的数量，默认不限
+
+        Returns:
+            执行的更新数
+        """
+        executed = 0
+        while limit is None or executed < limit:
+            try:
+                key, func, args, kwargs = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if key is not None:
+                with self._latest_lock:
+                    entry = self._latest.pop(key, None)
+                if entry is None:
+                    continue
+                func, args, kwargs = entry
+            executed += 1
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                log.exception("界面更新失败 %s: %s", getattr(func, '__name__', func), e)
+        return executed
+
+    def _tick(self):
+        # 先安排下一次排空再执行：回调中弹出的模态对话框（messagebox）运行嵌套事件循环，
+        # 对话框打开期间后续的状态/消息/表格更新仍按间隔执行
+        self._after_id = None
+        self.start()
+        self.drain(self.max_per_tick)
@@ -0,0 +1,99 @@
+"""
+页面数值解析
+Coinglass 页面上的金额/价格/数量文本（如 "$1.86亿 1747.18 BTC"、"-$5,231.5万"、"$108,043.9"、
+"1610.93 BTC"、"1.2M"）统一由这里解析：正则预编译，相同文本的结果缓存，整列数据可批量解析
+
+用法:
+    from value_parsers import parse_number, parse_column
+
+    parse_number("$1.86亿 1747.18 BTC")          # 186000000.0
+    parse_number("N/A", default=0)               # 0
+    parse_column([pos['价值'] for pos in positions], default=0)
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+
+# 单位倍数（中文万/亿，英文 K/M/B）
+UNIT_MULTIPLIERS = {
+    '万': 1e4,
+    '亿': 1e8,
+    'K': 1e3,
+    'M': 1e6,
+    'B': 1e9,
+}
+
+# 第一个数字: 可选负号（$前或$后）、可选$、千分位逗号、小数、紧跟的单位
+# 英文单位后面不能再跟字母（避免把 "10 BTC" / "10BTC" 的 B 当成十亿）
+_NUMBER_PATTERN = re.compile(
+    r'([-−])?\s*\$?\s*([-−])?\s*(\d[\d,]*(?:\.\d+)?|\.\d+)(万|亿|[KMBkmb](?![A-Za-z]))?'
+)
+
+CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_text(text: str) -> Optional[float]:
+    match = _NUMBER_PATTERN.search(text)
+    if not match:
+        return None
+
+    sign_before, sign_after, digits, unit = match.groups()
+    value = float(digits.replace(',', ''))
+    if unit:
+        value *= UNIT_MULTIPLIERS[unit.upper()]
+    return -value if (sign_before or sign_after) else value
+
+
+def parse_number(value, default: Optional[float] = None) -> Optional[float]:
+    """
+    解析文本中的第一个数值（带单位换算）
+
+    Args:
+        value: 文本，如 "$1.86亿 1747.18 BTC" / "-$1,234.5万" / "10.5 BTC"；数字原样返回
+        default: 解析失败时的返回值
+
+    Returns:
+        float，失败时返回 default
+    """
+    if isinstance(value, str):
+        result = _parse_text(value)
+        return default if result is None else result
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return default
+
+
+def parse_column(values: Iterable, default: Optional[float] = None) -> List[Optional[float]]:
+    """
+    批量解析一整列（同一批中重复的文本只解析一次）
+
+    Args:
+        values: 文本列表
+        default: 解析失败时的值
+
+    Returns:
+        与输入顺序一致的数值列表
+    """
+    seen = {}
+    result = []
+    for value in values:
+        if isinstance(value, str):
+            parsed = seen.get(value)
+            if parsed is None and value not in seen:
+                parsed = seen[value] = _parse_text(value)
+            result.append(default if parsed is None else parsed)
+        else:
+            result.append(parse_number(value, default))
+    return result
+
+
+def cache_info():
+    """解析缓存命中统计"""
+    return _parse_text.cache_info()
+
+
+def clear_cache():
+    _parse_text.cache_clear()